@@ -0,0 +1,96 @@
+#!/usr/bin/env -S python3
+"""Compares the memory and garbage collection cost of object trees and arenas.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_arena --terms 500000
+
+A function returning a chain of `--terms` subtractions is parsed into a tree of
+node objects, and into an `ASTArena` by the parser. The peak and retained memory
+of parsing are compared, and a full garbage collection is timed with either of
+them alive, but not both. Both are then walked in pre-order, reading the
+attributes of every node, and checked to hold the same nodes: a walk of the
+arena creates its façades as it goes, and drops them once visited.
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from compiler.lexer.token_stream import TokenStream
+from compiler.parser.parser import generate_parse_arena, generate_parse_tree
+from lib.ast.ast import ASTNode
+from lib.tree.traversal import walk
+from lib.tree.tree import Tree
+
+
+def time_collect() -> float:
+    start = time.perf_counter()
+    gc.collect()
+    return time.perf_counter() - start
+
+
+def describe(tree: Tree) -> list[tuple]:
+    """Returns the repr, field name and parent repr of every node, in pre-order."""
+    return [
+        (repr(node), node.field_name, repr(node.parent))
+        for node in walk(tree.root)
+        if isinstance(node, ASTNode)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, default=100_000)
+    args = parser.parse_args()
+
+    body = " - ".join(str(i % 100) for i in range(args.terms))
+    code = f"int main(void) {{ return {body}; }}"
+    tokens = TokenStream.from_code(code)
+
+    gc.collect()
+    baseline = time_collect()
+
+    tracemalloc.start()
+    tree = generate_parse_tree(tokens)
+    tree_bytes, tree_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tree_collect = time_collect()
+    # Nodes link to their parents, so the tree is only freed by a collection
+    del tree
+    gc.collect()
+
+    tracemalloc.start()
+    arena = generate_parse_arena(tokens)
+    arena_bytes, arena_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arena_collect = time_collect()
+    count = len(arena)
+
+    tree = generate_parse_tree(tokens)
+    start = time.perf_counter()
+    expected = describe(tree)
+    tree_walk = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = describe(arena.to_tree())
+    arena_walk = time.perf_counter() - start
+    assert actual == expected, "the arena holds different nodes"
+
+    print(
+        f"{'layout':>7} {'nodes':>9} {'bytes/node':>11} {'peak/node':>10} "
+        f"{'gc (s)':>8} {'walk (s)':>9}"
+    )
+    for layout, retained, peak, collect, walk_time in (
+        ("objects", tree_bytes, tree_peak, tree_collect, tree_walk),
+        ("arena", arena_bytes, arena_peak, arena_collect, arena_walk),
+    ):
+        print(
+            f"{layout:>7} {count:>9} {retained / count:>11.1f} {peak / count:>10.1f} "
+            f"{collect - baseline:>8.4f} {walk_time:>9.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env -S python3
+"""Compares assembling programs with GCC and with the built-in assembler.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_assembler --programs 50
+
+The assembly trees of `--programs` small programs are turned into object files
+one at a time: by piping their assembly code to `gcc -c`, and by encoding their
+machine code and writing the object files in process. The code of the object
+files is checked to be the same.
+"""
+
+import argparse
+import io
+import os
+import subprocess
+import tempfile
+import time
+
+from compiler.assembly_generation.assembly_generation import generate_assembly_ast
+from compiler.code_emission.code_emission import emit_assembly_code
+from compiler.code_emission.elf_object import write_object_file
+from compiler.code_emission.machine_code import encode_machine_code
+from compiler.lexer.lexer import tokenize_code
+from compiler.parser.parser import generate_parse_tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--programs", type=int, default=50)
+    args = parser.parse_args()
+
+    trees = [
+        generate_assembly_ast(
+            generate_parse_tree(tokenize_code(f"int main(void) {{ return {i}; }}"))
+        )
+        for i in range(args.programs)
+    ]
+    print(f"{'assembler':>10} {'programs':>9} {'ms/program':>11}")
+
+    def report(variant: str, elapsed: float) -> None:
+        print(f"{variant:>10} {len(trees):>9} {elapsed * 1000 / len(trees):>11.3f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        gcc_files = [os.path.join(directory, f"gcc{i}.o") for i in range(len(trees))]
+        command = ["gcc", "-c", "-masm=intel", "-x", "assembler", "-", "-o"]
+        start = time.perf_counter()
+        for tree, object_file in zip(trees, gcc_files, strict=True):
+            subprocess.run(
+                [*command, object_file],
+                input=emit_assembly_code(tree),
+                text=True,
+                check=True,
+            )
+        report("gcc", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for i, tree in enumerate(trees):
+            with open(os.path.join(directory, f"builtin{i}.o"), "wb") as f:
+                write_object_file(tree, f)
+        report("builtin", time.perf_counter() - start)
+
+        text_file = os.path.join(directory, "text.bin")
+        for tree, object_file in zip(trees, gcc_files, strict=True):
+            subprocess.run(
+                ["objcopy", "-O", "binary", "-j", ".text", object_file, text_file],
+                check=True,
+            )
+            with open(text_file, "rb") as f:
+                assert f.read() == encode_machine_code(tree).text
+
+    start = time.perf_counter()
+    for tree in trees:
+        write_object_file(tree, io.BytesIO())
+    report("in memory", time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
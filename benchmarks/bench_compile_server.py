@@ -0,0 +1,89 @@
+#!/usr/bin/env -S python3
+"""Compares the latency of compiling files with the driver and the compile server.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_compile_server --files 20
+
+A compile server is started on a temporary socket, then each of `--files` small
+C source files is compiled up to the code generation, one at a time: by a new
+process running the driver, by a new process running the client of the server,
+and by the client called in this process, which leaves out the startup of the
+interpreter.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from compiler import compile_client
+from compiler.compile_client import SOCKET_ENV_VAR
+
+
+def wait_for_socket(socket_path: str, timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(socket_path):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"The compile server didn't listen on '{socket_path}'")
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = []
+        for i in range(args.files):
+            path = os.path.join(directory, f"prog{i}.c")
+            with open(path, "w") as f:
+                f.write(f"int main(void) {{ return {i}; }}\n")
+            files.append(path)
+
+        socket_path = os.path.join(directory, "server.sock")
+        environment = dict(
+            os.environ, LOGURU_LEVEL="WARNING", **{SOCKET_ENV_VAR: socket_path}
+        )
+        server = subprocess.Popen(
+            [sys.executable, "-m", "compiler.compile_server", "--socket", socket_path],
+            env=environment,
+        )
+        try:
+            wait_for_socket(socket_path)
+            print(f"{'command':>13} {'files':>6} {'ms/file':>8}")
+
+            def report(command: str, elapsed: float) -> None:
+                print(
+                    f"{command:>13} {len(files):>6} {elapsed * 1000 / len(files):>8.1f}"
+                )
+
+            for command, module in (
+                ("driver", "compiler.compiler_driver"),
+                ("client", "compiler.compile_client"),
+            ):
+                start = time.perf_counter()
+                for file in files:
+                    subprocess.run(
+                        [sys.executable, "-m", module, file, "--codegen"],
+                        env=environment,
+                        check=True,
+                    )
+                report(command, time.perf_counter() - start)
+
+            with mock.patch.dict(os.environ, environment):
+                start = time.perf_counter()
+                for file in files:
+                    assert compile_client.main([file, "--codegen"]) == 0
+                report("client (warm)", time.perf_counter() - start)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
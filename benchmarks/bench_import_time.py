@@ -0,0 +1,86 @@
+#!/usr/bin/env -S python3
+"""Measures the import time of the compiler driver.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_import_time --runs 10 --budget 120
+
+The driver is imported `--runs` times by new interpreters run with
+`-X importtime`, from the sources and from an archive built with
+`compiler.build_zipapp`. The modules taking the most time to import are
+listed. If a `--budget` in milliseconds is given, the exit status is 1 if the
+fastest import of the driver, from the sources, takes longer. Wall-clock times
+vary from one machine to another, so the budget is meant for local checks: the
+tests check which modules the driver imports instead.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from compiler.build_zipapp import build_zipapp
+
+MODULE = "compiler.compiler_driver"
+
+
+def import_times(path: str) -> dict[str, tuple[int, int]]:
+    """Imports the driver, returning the self and cumulative time of each module.
+
+    Times are in microseconds, as reported by `-X importtime`.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        env=dict(os.environ, PYTHONPATH=path),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(self_time), int(cumulative))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = os.path.join(directory, "c-compiler.pyz")
+        build_zipapp(archive)
+
+        fastest = {}
+        for source, path in (("sources", os.getcwd()), ("zipapp", archive)):
+            runs = [import_times(path) for _ in range(args.runs)]
+            fastest[source] = min(runs, key=lambda times: times[MODULE][1])
+
+    print(f"{'source':>8} {'import (ms)':>12}")
+    for source, times in fastest.items():
+        print(f"{source:>8} {times[MODULE][1] / 1000:>12.1f}")
+
+    times = fastest["sources"]
+    print(f"\n{'module':>50} {'self (ms)':>10} {'cumulative (ms)':>16}")
+    for name, (self_time, cumulative) in sorted(
+        times.items(), key=lambda item: item[1][1], reverse=True
+    )[: args.top]:
+        print(f"{name:>50} {self_time / 1000:>10.1f} {cumulative / 1000:>16.1f}")
+
+    elapsed = times[MODULE][1] / 1000
+    if args.budget is not None and elapsed > args.budget:
+        print(
+            f"\nImporting {MODULE} took {elapsed:.1f} ms, over the budget of "
+            f"{args.budget:.1f} ms"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env -S python3
+"""Compares incremental updates of a document with lexing and parsing it again.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_incremental --terms 100000
+
+The document is a function returning a chain of `--terms` subtractions. Each
+scenario types characters one at a time at the same place, as an editor does:
+in the name of the function, whose body is reused, in the whitespace of the
+body, where the tree is kept as is, and in the returned expression, which is
+the only statement of the program and has to be parsed again.
+"""
+
+import argparse
+import time
+
+from compiler.lexer.token_stream import TokenStream
+from compiler.parser.incremental import IncrementalDocument
+from compiler.parser.parser import generate_parse_tree
+
+
+def generate_document(terms: int) -> str:
+    """Generates a function returning a chain of `terms` subtractions."""
+    body = " - ".join(str(i % 100) for i in range(terms))
+    return f"int main(void) {{\n    return {body};\n}}\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, default=100_000)
+    parser.add_argument("--edits", type=int, default=100)
+    args = parser.parse_args()
+
+    code = generate_document(args.terms)
+
+    start = time.perf_counter()
+    generate_parse_tree(TokenStream.from_code(code))
+    full_time = time.perf_counter() - start
+    print(f"{len(code)} chars, full lex and parse: {full_time * 1e3:.1f} ms")
+
+    print(f"{'scenario':>12} {'edits':>6} {'ms/edit':>9}")
+    for scenario, offset, text, edits in (
+        ("name", code.index("main") + 4, "x", args.edits),
+        ("whitespace", code.index("return") + 7, " ", args.edits),
+        ("expression", code.index(";") - 1, "0", min(args.edits, 5)),
+    ):
+        document = IncrementalDocument(code)
+        start = time.perf_counter()
+        for i in range(edits):
+            document.edit(offset + i, 0, text)
+        elapsed = (time.perf_counter() - start) / edits
+        print(f"{scenario:>12} {edits:>6} {elapsed * 1e3:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
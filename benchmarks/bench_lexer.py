@@ -0,0 +1,67 @@
+#!/usr/bin/env -S python3
+"""Measures how the lexer scales with the size of its input.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_lexer --max-size 100M
+
+The lexer is linear if the time per byte stays roughly constant as the size of
+the input grows.
+"""
+
+import argparse
+import time
+from collections import deque
+
+from compiler.lexer.lexer import TokenScanner, get_scanner
+
+# A translation unit as produced by the preprocessor, repeated to reach the
+# requested size.
+SNIPPET = "int main(void)\n{\n    return -(~(--x_1 - 42));\n}\n"
+
+
+def parse_size(s: str) -> int:
+    """Parses sizes such as `1K`, `10M` or `4096` into a number of bytes."""
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    if s[-1].upper() in units:
+        return int(s[:-1]) * units[s[-1].upper()]
+    return int(s)
+
+
+def generate_code(size: int) -> str:
+    """Generates roughly `size` bytes of code."""
+    return SNIPPET * max(1, size // len(SNIPPET))
+
+
+def bench_scan(scanner: TokenScanner, code: str, repeat: int) -> float:
+    """Returns the best time, in seconds, taken to scan the whole `code`."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        # Consume the generator without keeping the tokens around
+        deque(scanner(code, 0, None), maxlen=0)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-size", type=parse_size, default=parse_size("1K"))
+    parser.add_argument("--max-size", type=parse_size, default=parse_size("100M"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--engine", default="regex", help="Lexer engine to measure")
+    args = parser.parse_args()
+
+    scanner = get_scanner(args.engine)
+
+    print(f"{'size (bytes)':>14} {'time (s)':>10} {'ns/byte':>8}")
+    size = args.min_size
+    while size <= args.max_size:
+        code = generate_code(size)
+        elapsed = bench_scan(scanner, code, args.repeat if size < (1 << 24) else 1)
+        print(f"{len(code):>14} {elapsed:>10.4f} {elapsed * 1e9 / len(code):>8.1f}")
+        size *= 10
+
+
+if __name__ == "__main__":
+    main()
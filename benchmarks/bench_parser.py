@@ -0,0 +1,107 @@
+#!/usr/bin/env -S python3
+"""Measures how consuming tokens in the parser scales with their number.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_parser --max-tokens 1000000
+
+Tokens are consumed with `TokenCursor.expect`, as the parser does, and with the
+`list.pop(0)` the parser used to rely on. The parser is linear if the time per
+token stays roughly constant as the number of tokens grows.
+
+With `--expressions`, deeply nested unary expressions, parenthesized expressions
+and long chains of binary operators are parsed instead, up to `--max-depth`.
+"""
+
+import argparse
+import time
+
+from compiler.lexer.lexer import Token
+from compiler.parser.parser import parse_expression
+from compiler.parser.token_cursor import TokenCursor
+
+CONSTANT = Token(Token.TokenType.Constant, 1)
+MINUS = Token(Token.TokenType.Minus, "-")
+COMPLEMENT = Token(Token.TokenType.Complement, "~")
+OPEN_PARENTHESIS = Token(Token.TokenType.OpenParenthesis, "(")
+CLOSE_PARENTHESIS = Token(Token.TokenType.CloseParenthesis, ")")
+
+
+def generate_expression(shape: str, depth: int) -> list[Token]:
+    """Generates the tokens of an expression nested `depth` times."""
+    if shape == "unary":
+        return [MINUS, COMPLEMENT] * (depth // 2) + [CONSTANT]
+    if shape == "parentheses":
+        return [OPEN_PARENTHESIS] * depth + [CONSTANT] + [CLOSE_PARENTHESIS] * depth
+    return [CONSTANT] + [MINUS, CONSTANT] * depth
+
+
+def consume_with_cursor(tokens: list[Token]) -> None:
+    cursor = TokenCursor(tokens)
+    while not cursor.at_end():
+        cursor.expect(Token.TokenType.Semicolon)
+
+
+def consume_with_pop(tokens: list[Token]) -> None:
+    tokens = tokens.copy()
+    while tokens:
+        tokens.pop(0)
+
+
+def bench_expressions(max_depth: int) -> None:
+    print(f"{'shape':>12} {'depth':>10} {'time (s)':>9} {'ns/token':>9}")
+    for shape in ("unary", "parentheses", "binary"):
+        depth = 1000
+        while depth <= max_depth:
+            tokens = generate_expression(shape, depth)
+            start = time.perf_counter()
+            parse_expression(TokenCursor(tokens))
+            elapsed = time.perf_counter() - start
+            ns_per_token = elapsed * 1e9 / len(tokens)
+            print(f"{shape:>12} {depth:>10} {elapsed:>9.4f} {ns_per_token:>9.1f}")
+            depth *= 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-tokens", type=int, default=1_000_000)
+    parser.add_argument(
+        "--max-pop-tokens",
+        type=int,
+        default=100_000,
+        help="Stop measuring list.pop(0) past this number of tokens",
+    )
+    parser.add_argument(
+        "--expressions",
+        action="store_true",
+        help="Measure parsing deeply nested expressions instead",
+    )
+    parser.add_argument("--max-depth", type=int, default=100_000)
+    args = parser.parse_args()
+
+    if args.expressions:
+        bench_expressions(args.max_depth)
+        return
+
+    print(f"{'tokens':>10} {'cursor (s)':>11} {'ns/token':>9} {'pop(0) (s)':>11}")
+    count = 1000
+    while count <= args.max_tokens:
+        tokens = [Token(Token.TokenType.Semicolon, ";")] * count
+
+        start = time.perf_counter()
+        consume_with_cursor(tokens)
+        cursor_time = time.perf_counter() - start
+
+        pop_time = "-"
+        if count <= args.max_pop_tokens:
+            start = time.perf_counter()
+            consume_with_pop(tokens)
+            pop_time = f"{time.perf_counter() - start:.4f}"
+
+        ns_per_token = cursor_time * 1e9 / count
+        print(f"{count:>10} {cursor_time:>11.4f} {ns_per_token:>9.1f} {pop_time:>11}")
+        count *= 10
+
+
+if __name__ == "__main__":
+    main()
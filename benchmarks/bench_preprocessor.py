@@ -0,0 +1,77 @@
+#!/usr/bin/env -S python3
+"""Compares preprocessing C source files with GCC and the built-in preprocessor.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_preprocessor --files 50 --macros 500
+
+`--files` small C source files including a common header, which defines
+`--macros` function-like macros, are preprocessed one at a time: by spawning
+`gcc -E -P`, by the built-in preprocessor with a header cache per file, and by
+the built-in preprocessor with the header cache shared by the files.
+"""
+
+import argparse
+import io
+import os
+import subprocess
+import tempfile
+import time
+
+from compiler.preprocessor.preprocessor import HeaderCache, Preprocessor
+
+
+def write_sources(directory: str, files: int, macros: int) -> list[str]:
+    with open(os.path.join(directory, "common.h"), "w") as f:
+        f.write("#ifndef COMMON_H\n#define COMMON_H\n")
+        for i in range(macros):
+            f.write(f"#define MACRO_{i}(x) ((x) + {i})\n")
+        f.write("#endif\n")
+
+    paths = []
+    for i in range(files):
+        path = os.path.join(directory, f"prog{i}.c")
+        with open(path, "w") as f:
+            f.write('#include "common.h"\n')
+            f.write(f"int main(void) {{ return MACRO_{i % macros}({i}); }}\n")
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--macros", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_sources(directory, args.files, args.macros)
+        print(f"{'preprocessor':>14} {'files':>6} {'ms/file':>8}")
+
+        def report(variant: str, elapsed: float) -> None:
+            print(f"{variant:>14} {len(paths):>6} {elapsed * 1000 / len(paths):>8.2f}")
+
+        start = time.perf_counter()
+        expected = [
+            subprocess.run(
+                ["gcc", "-E", "-P", path], capture_output=True, text=True, check=True
+            ).stdout.split()
+            for path in paths
+        ]
+        report("gcc", time.perf_counter() - start)
+
+        for variant in ("builtin", "builtin-cache"):
+            shared_cache = HeaderCache()
+            outputs = []
+            start = time.perf_counter()
+            for path in paths:
+                cache = shared_cache if variant == "builtin-cache" else HeaderCache()
+                stream = io.StringIO()
+                Preprocessor(header_cache=cache).preprocess(path, stream)
+                outputs.append(stream.getvalue().split())
+            report(variant, time.perf_counter() - start)
+            assert outputs == expected
+
+
+if __name__ == "__main__":
+    main()
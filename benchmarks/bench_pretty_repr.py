@@ -0,0 +1,111 @@
+#!/usr/bin/env -S python3
+"""Measures writing the pretty representation of large and deep ASTs.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_pretty_repr --instructions 300000 --depth 900
+
+An assembly function of `--instructions` move instructions, which has about 3
+nodes per instruction, is written to a file in the temporary directory, then
+to memory with the recursive representation the nodes used to build, and with
+truncation and elision of repeated siblings. The parse tree of a chain of
+`--depth` negations is written too: the recursive representation copies the
+representation of every subtree into the one of its parent, and can't go past
+the recursion limit.
+"""
+
+import argparse
+import io
+import tempfile
+import time
+
+from compiler.assembly_generation import assembly_ast
+from compiler.lexer.lexer import tokenize_code
+from compiler.parser.parser import generate_parse_tree
+from lib.ast.ast import ASTNode, write_pretty_ast_repr
+from lib.tree.builder import TreeBuilder
+from lib.tree.tree import Tree
+
+
+def build_function(count: int) -> assembly_ast.Function:
+    with TreeBuilder():
+        instructions: list[assembly_ast.Instruction] = [
+            assembly_ast.Mov(
+                parent=None,
+                source=assembly_ast.Immediate(parent=None, value=str(i % 10)),
+                destination=assembly_ast.Register(parent=None, name="eax"),
+            )
+            for i in range(count)
+        ]
+        instructions.append(assembly_ast.Return(parent=None))
+        name = assembly_ast.Identifier(parent=None, value="main")
+        return assembly_ast.Function(parent=None, identifier=name, body=instructions)
+
+
+def legacy_node_repr(node: ASTNode, level: int, fill: str, pre="", end="") -> str:
+    first_row = fill * level + pre + (f"{node!r}")
+    if node.is_leaf():
+        return first_row + end
+    children_repr = ""
+    for child in node.children:
+        assert isinstance(child, ASTNode)
+        pre_child = "" if child.field_name is None else child.field_name + "="
+        end_child = ",\n" if id(child) != id(node.children[-1]) else ""
+        children_repr += legacy_node_repr(child, level + 1, fill, pre_child, end_child)
+    last_row = fill * level + ")" + end
+    return f"{first_row}(\n{children_repr}\n{last_row}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--instructions", type=int, default=300_000)
+    parser.add_argument("--depth", type=int, default=900)
+    args = parser.parse_args()
+
+    print(f"{'tree':>6} {'variant':>10} {'nodes':>9} {'chars':>10} {'time (s)':>9}")
+
+    def report(variant: str, elapsed: float, chars: int) -> None:
+        print(f"{shape:>6} {variant:>10} {len(tree):>9} {chars:>10} {elapsed:>9.4f}")
+
+    shape = "chain"
+    code = f"int main(void) {{ return {'- ' * args.depth}1; }}"
+    tree = generate_parse_tree(tokenize_code(code))
+    stream = io.StringIO()
+    start = time.perf_counter()
+    write_pretty_ast_repr(tree, stream)
+    report("memory", time.perf_counter() - start, len(stream.getvalue()))
+    start = time.perf_counter()
+    representation = legacy_node_repr(tree.root, 0, "   ")
+    report("legacy", time.perf_counter() - start, len(representation))
+    assert stream.getvalue() == representation
+
+    shape = "wide"
+    tree = Tree(build_function(args.instructions))
+
+    with tempfile.TemporaryFile("w+") as f:
+        start = time.perf_counter()
+        write_pretty_ast_repr(tree, f)
+        elapsed = time.perf_counter() - start
+        report("file", elapsed, f.tell())
+
+    start = time.perf_counter()
+    representation = legacy_node_repr(tree.root, 0, "   ")
+    report("legacy", time.perf_counter() - start, len(representation))
+
+    for variant, options in (
+        ("memory", {}),
+        ("max-nodes", {"max_nodes": 1000}),
+        ("max-depth", {"max_depth": 1}),
+        ("elide", {"elide_repeats": True}),
+    ):
+        stream = io.StringIO()
+        start = time.perf_counter()
+        write_pretty_ast_repr(tree, stream, **options)
+        elapsed = time.perf_counter() - start
+        if not options:
+            assert stream.getvalue() == representation
+        report(variant, elapsed, len(stream.getvalue()))
+
+
+if __name__ == "__main__":
+    main()
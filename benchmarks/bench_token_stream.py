@@ -0,0 +1,42 @@
+#!/usr/bin/env -S python3
+"""Compares the memory used by a list of tokens and by a token stream.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_token_stream --size 10M
+"""
+
+import argparse
+import tracemalloc
+
+from benchmarks.bench_lexer import generate_code, parse_size
+from compiler.lexer.lexer import tokenize_code
+from compiler.lexer.token_stream import TokenStream
+
+
+def measure(build, code: str) -> tuple[int, int]:
+    """Returns the number of tokens built by `build` and the bytes they retain."""
+    tracemalloc.start()
+    tokens = build(code)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(tokens), retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=parse_size, default=parse_size("1M"))
+    args = parser.parse_args()
+
+    code = generate_code(args.size)
+    print(f"{'representation':>16} {'tokens':>10} {'bytes':>12} {'bytes/token':>12}")
+    for name, build in (
+        ("list[Token]", tokenize_code),
+        ("TokenStream", TokenStream.from_code),
+    ):
+        count, retained = measure(build, code)
+        print(f"{name:>16} {count:>10} {retained:>12} {retained / count:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
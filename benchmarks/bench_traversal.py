@@ -0,0 +1,87 @@
+#!/usr/bin/env -S python3
+"""Measures traversing large trees in every traversal mode.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_traversal --nodes 1000000
+
+Trees of `--nodes` nodes are built in three shapes: a chain, a single node with
+all the others as children, and a balanced tree with `--fanout` children per
+node. The traversal the trees used to rely on, which rebuilt its work queue at
+every step, is also measured up to `--max-legacy-nodes` nodes.
+"""
+
+import argparse
+import time
+
+from lib.tree.builder import TreeBuilder
+from lib.tree.node import TreeNode
+from lib.tree.traversal import TraversalMode, walk
+
+
+class BenchNode(TreeNode):
+    __slots__ = ()
+
+
+def build_tree(shape: str, count: int, fanout: int) -> TreeNode:
+    with TreeBuilder():
+        root = BenchNode()
+        nodes = [root]
+        for i in range(1, count):
+            if shape == "chain":
+                parent = nodes[-1]
+            elif shape == "wide":
+                parent = root
+            else:
+                parent = nodes[(i - 1) // fanout]
+            nodes.append(BenchNode(parent=parent))
+    return root
+
+
+def legacy_traverse(root: TreeNode, mode: TraversalMode):
+    yield root
+    queue = list(root.children)
+    while queue:
+        yield queue[0]
+        next_nodes = list(queue[0].children)
+        if mode == TraversalMode.DEPTH_FIRST:
+            queue = next_nodes + queue[1:]
+        else:
+            queue = queue[1:] + next_nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=1_000_000)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--max-legacy-nodes", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'shape':>9} {'mode':>14} {'nodes':>9} {'time (s)':>9} {'ns/node':>8}")
+    for shape in ("chain", "wide", "balanced"):
+        counts = sorted({min(args.nodes, args.max_legacy_nodes), args.nodes})
+        for count in counts:
+            root = build_tree(shape, count, args.fanout)
+            for mode in TraversalMode:
+                start = time.perf_counter()
+                for _ in walk(root, mode):
+                    pass
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{shape:>9} {mode.name:>14} {count:>9} {elapsed:>9.4f} "
+                    f"{elapsed * 1e9 / count:>8.1f}"
+                )
+                if mode == TraversalMode.POST_ORDER or count > args.max_legacy_nodes:
+                    continue
+                start = time.perf_counter()
+                for _ in legacy_traverse(root, mode):
+                    pass
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{shape:>9} {'legacy':>14} {count:>9} {elapsed:>9.4f} "
+                    f"{elapsed * 1e9 / count:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
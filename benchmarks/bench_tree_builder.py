@@ -0,0 +1,64 @@
+#!/usr/bin/env -S python3
+"""Measures linking nodes with and without a trusted `TreeBuilder`.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_tree_builder --max-depth 10000
+
+A chain of nodes is built top-down, each new node becoming the child of the
+deepest one. Outside a builder, every link walks up to the root to check for
+cycles, which makes building the chain quadratic. Within a builder the links
+take constant time, and validating the whole chain at the end is linear.
+"""
+
+import argparse
+import time
+
+from lib.tree.builder import TreeBuilder
+from lib.tree.node import TreeNode
+
+
+class ChainNode(TreeNode):
+    __slots__ = ()
+
+
+def build_chain(depth: int) -> TreeNode:
+    root = node = ChainNode()
+    for _ in range(depth):
+        node = ChainNode(parent=node)
+    return root
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-depth", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(
+        f"{'depth':>10} {'checked (s)':>12} {'trusted (s)':>12} {'validated (s)':>14}"
+    )
+    depth = 1000
+    while depth <= args.max_depth:
+        start = time.perf_counter()
+        build_chain(depth)
+        checked_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with TreeBuilder():
+            build_chain(depth)
+        trusted_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with TreeBuilder(validate=True):
+            build_chain(depth)
+        validated_time = time.perf_counter() - start
+
+        print(
+            f"{depth:>10} {checked_time:>12.4f} {trusted_time:>12.4f} "
+            f"{validated_time:>14.4f}"
+        )
+        depth *= 10
+
+
+if __name__ == "__main__":
+    main()
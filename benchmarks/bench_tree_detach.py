@@ -0,0 +1,55 @@
+#!/usr/bin/env -S python3
+"""Measures detaching and inserting the children of a wide node.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_tree_detach --max-width 1000000
+
+Every other child of a node with `width` children is detached, then the detached
+children are inserted back before their former next sibling, as an optimization
+pass rewriting the instructions of a long function body would. With the
+children linked to each other, both steps are linear in the width.
+"""
+
+import argparse
+import time
+
+from lib.tree.builder import TreeBuilder
+from lib.tree.node import TreeNode
+
+
+class WideNode(TreeNode):
+    __slots__ = ()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-width", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{'width':>10} {'detach (s)':>11} {'insert (s)':>11} {'ns/child':>9}")
+    width = 1000
+    while width <= args.max_width:
+        root = WideNode()
+        with TreeBuilder():
+            children = [WideNode(parent=root) for _ in range(width)]
+
+        start = time.perf_counter()
+        for child in children[::2]:
+            child.parent = None
+        detach_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(0, width - 1, 2):
+            children[i + 1].insert_before(children[i])
+        insert_time = time.perf_counter() - start
+
+        ns_per_child = (detach_time + insert_time) * 1e9 / width
+        print(
+            f"{width:>10} {detach_time:>11.4f} {insert_time:>11.4f} {ns_per_child:>9.1f}"
+        )
+        width *= 10
+
+
+if __name__ == "__main__":
+    main()
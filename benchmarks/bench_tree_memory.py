@@ -0,0 +1,151 @@
+#!/usr/bin/env -S python3
+"""Compares the memory and attribute access time of slotted and dict-based nodes.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_tree_memory --terms 500000
+
+The parse tree of a function returning a chain of `--terms` subtractions, which
+has about 2 nodes per term, is copied twice: once with the slotted node classes
+of the compiler, and once with replicas laid out like the nodes used to be,
+with an instance dictionary holding the same attributes. Values such as the
+constants are shared by both copies, so only the nodes themselves are counted.
+"""
+
+import argparse
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from compiler.lexer.token_stream import TokenStream
+from compiler.parser.parser import generate_parse_tree
+from lib.tree.builder import TreeBuilder
+from lib.tree.node import TreeNode
+
+
+class DictNode:
+    """A node laid out like `TreeNode` before slots, with an instance dictionary."""
+
+    _children: list["DictNode"]
+
+    @property
+    def children(self) -> list["DictNode"]:
+        return self._children
+
+
+def slot_names(cls: type) -> list[str]:
+    """Returns the names of the slots declared by `cls` and its bases."""
+    return [
+        name for klass in cls.__mro__ for name in klass.__dict__.get("__slots__", ())
+    ]
+
+
+def copy_slotted(node: TreeNode) -> TreeNode:
+    """Copies the tree rooted at `node` with the same slotted classes."""
+    names = {}
+    copies: dict[int, TreeNode] = {}
+    nodes = [node]
+    while nodes:
+        original = nodes.pop()
+        cls = type(original)
+        if cls not in names:
+            names[cls] = [
+                name for name in slot_names(cls) if name not in TreeNode.__slots__
+            ]
+        copy = cls.__new__(cls)
+        TreeNode.__init__(copy)
+        for name in names[cls]:
+            setattr(copy, name, getattr(original, name))
+        parent = original.parent
+        if parent is not None:
+            copy.parent = copies[id(parent)]
+        copies[id(original)] = copy
+        nodes.extend(reversed(original.children))
+    return copies[id(node)]
+
+
+def copy_dict_based(node: TreeNode) -> DictNode:
+    """Copies the tree rooted at `node` with dict-based replicas of its classes."""
+    names = {}
+    replicas: dict[type, type] = {}
+    copies: dict[int, DictNode] = {}
+    nodes = [node]
+    while nodes:
+        original = nodes.pop()
+        cls = type(original)
+        if cls not in replicas:
+            # One class per node type, as dictionaries share their keys per class
+            replicas[cls] = type(cls.__name__, (DictNode,), {})
+            names[cls] = [
+                name for name in slot_names(cls) if name not in TreeNode.__slots__
+            ]
+        copy = replicas[cls]()
+        copy._children = []
+        copy._parent = None
+        copy.__dict__.update({name: getattr(original, name) for name in names[cls]})
+        parent = original.parent
+        if parent is not None:
+            copy._parent = copies[id(parent)]
+            copy._parent._children.append(copy)
+        copies[id(original)] = copy
+        nodes.extend(reversed(original.children))
+    return copies[id(node)]
+
+
+def measure(copy: Callable, root: TreeNode) -> tuple[object, int]:
+    """Returns the copy of the tree made by `copy` and the bytes it retains.
+
+    The memory used by the bookkeeping of the copy is freed before measuring.
+    """
+    tracemalloc.start()
+    with TreeBuilder():
+        copied = copy(root)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return copied, retained
+
+
+def iter_nodes(root):
+    nodes = [root]
+    while nodes:
+        node = nodes.pop()
+        yield node
+        nodes.extend(node.children)
+
+
+def time_access(root) -> float:
+    """Returns the time taken to read the parent and field name of every node."""
+    nodes = list(iter_nodes(root))
+    unnamed = 0
+    start = time.perf_counter()
+    for node in nodes:
+        if node._parent is not None and node.field_name is None:
+            unnamed += 1
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, default=100_000)
+    args = parser.parse_args()
+
+    body = " - ".join(str(i % 100) for i in range(args.terms))
+    code = f"int main(void) {{ return {body}; }}"
+    root = generate_parse_tree(TokenStream.from_code(code)).root
+
+    print(
+        f"{'layout':>8} {'nodes':>10} {'bytes':>12} {'bytes/node':>11} {'access (s)':>11}"
+    )
+    for layout, copy in (("dict", copy_dict_based), ("slots", copy_slotted)):
+        copied, retained = measure(copy, root)
+        count = sum(1 for _ in iter_nodes(copied))
+        access_time = time_access(copied)
+        print(
+            f"{layout:>8} {count:>10} {retained:>12} {retained / count:>11.1f} "
+            f"{access_time:>11.4f}"
+        )
+        del copied
+
+
+if __name__ == "__main__":
+    main()
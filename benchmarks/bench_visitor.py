@@ -0,0 +1,66 @@
+#!/usr/bin/env -S python3
+"""Compares cached visitor dispatch with chains of isinstance checks.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_visitor --nodes 1000000 --kinds 1 8 32
+
+For each number of node kinds in `--kinds`, a class is made per kind, and
+`--nodes` nodes of evenly spread kinds are dispatched to their handler, once by
+a `NodeVisitor` and once by an isinstance chain testing the kinds in order, as
+the code generation stages used to.
+"""
+
+import argparse
+import time
+
+from lib.ast.visitor import NodeVisitor
+from lib.tree.node import TreeNode
+
+
+class BenchNode(TreeNode):
+    __slots__ = ()
+
+
+def make_kinds(count: int) -> list[type]:
+    return [type(f"Kind{i}", (BenchNode,), {"__slots__": ()}) for i in range(count)]
+
+
+def make_visitor(kinds: list[type]) -> NodeVisitor:
+    handlers = {f"visit_{kind.__name__}": lambda self, node: 1 for kind in kinds}
+    return type("BenchVisitor", (NodeVisitor,), handlers)()
+
+
+def dispatch_chain(kinds: list[type], node: TreeNode) -> int:
+    for kind in kinds:
+        if isinstance(node, kind):
+            return 1
+    raise RuntimeError(f"Node '{node}' has no handler")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=1_000_000)
+    parser.add_argument("--kinds", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    print(f"{'kinds':>6} {'nodes':>9} {'visitor (s)':>12} {'isinstance (s)':>15}")
+    for count in args.kinds:
+        kinds = make_kinds(count)
+        nodes = [kinds[i % count]() for i in range(args.nodes)]
+        visitor = make_visitor(kinds)
+
+        start = time.perf_counter()
+        total = sum(visitor.visit(node) for node in nodes)
+        visitor_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        total -= sum(dispatch_chain(kinds, node) for node in nodes)
+        chain_time = time.perf_counter() - start
+        assert total == 0
+
+        print(f"{count:>6} {args.nodes:>9} {visitor_time:>12.4f} {chain_time:>15.4f}")
+
+
+if __name__ == "__main__":
+    main()
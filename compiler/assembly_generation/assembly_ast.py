@@ -6,6 +6,8 @@ from lib.ast.ast import ASTNode
 class Instruction(ASTNode):
     """Abstract class denoting a generic assembly instruction."""
 
+    __slots__ = ()
+
     @abstractmethod
     def __init__(self, parent: ASTNode | None, **kwargs):
         super().__init__(parent, **kwargs)
@@ -14,6 +16,8 @@ class Instruction(ASTNode):
 class Operand(ASTNode):
     """Abstract class denoting a generic assembly operand."""
 
+    __slots__ = ()
+
     @abstractmethod
     def __init__(self, parent: ASTNode | None, **kwargs):
         super().__init__(parent, **kwargs)
@@ -22,14 +26,22 @@ class Operand(ASTNode):
 class Identifier(ASTNode):
     """An identifier is a string, such as the name of a label."""
 
-    def __init__(self, parent: ASTNode | None, value: str):
+    __slots__ = ("_value", "_symbol")
+
+    def __init__(self, parent: ASTNode | None, value: str, symbol: int | None = None):
         super().__init__(parent)
         self._value = value
+        self._symbol = symbol
 
     @property
     def value(self):
         return self._value
 
+    @property
+    def symbol(self) -> int | None:
+        """Id of the identifier in the symbol table of the compilation, if any."""
+        return self._symbol
+
     def __repr__(self) -> str:
         return f"Identifier({self._value})"
 
@@ -37,6 +49,8 @@ class Identifier(ASTNode):
 class Function(ASTNode):
     """A function definition has a name identifier and a list of instructions as its body."""
 
+    __slots__ = ("_body", "_name")
+
     def __init__(
         self,
         parent: ASTNode | None,
@@ -66,6 +80,8 @@ class Function(ASTNode):
 class Program(ASTNode):
     """The program node is the root of the parse tree."""
 
+    __slots__ = ("_func_def",)
+
     def __init__(self, func_def: Function):
         super().__init__()
         self._func_def = func_def
@@ -82,6 +98,8 @@ class Program(ASTNode):
 class Return(Instruction):
     """A return instruction is an assembly instruction."""
 
+    __slots__ = ()
+
     def __init__(self, parent: ASTNode | None):
         super().__init__(parent)
 
@@ -92,6 +110,8 @@ class Return(Instruction):
 class Mov(Instruction):
     """A mov instruction is an assembly instruction."""
 
+    __slots__ = ("_src", "_dst")
+
     def __init__(self, parent: ASTNode | None, source: Operand, destination: Operand):
         super().__init__(parent)
         self._src = source
@@ -116,6 +136,8 @@ class Mov(Instruction):
 class Immediate(Operand):
     """An immediate value is an operand."""
 
+    __slots__ = ("_value",)
+
     def __init__(self, parent: ASTNode | None, value):
         super().__init__(parent)
         self._value = value
@@ -131,6 +153,8 @@ class Immediate(Operand):
 class Register(Operand):
     """A register is an operand. It has a name such as 'eax'."""
 
+    __slots__ = ("_name",)
+
     def __init__(self, parent: ASTNode | None, name: str):
         super().__init__(parent)
         self._name = name
@@ -1,5 +1,6 @@
 import compiler.assembly_generation.assembly_ast as assembly_ast
 import compiler.parser.parser_ast as parser_ast
+from lib.ast.visitor import NodeTransformer
 from lib.tree.tree import Tree
 
 
@@ -15,105 +16,110 @@ def generate_assembly_ast(parse_tree: Tree) -> Tree:
         raise TypeError(
             f"The root node of the parse tree '{parse_tree}' is not a Program node"
         )
-    ast_prog = convert_program(parse_tree.root)
-    return Tree(ast_prog)
+    return AssemblyGenerator().transform(parse_tree)
 
 
-def convert_program(prog: parser_ast.Program) -> assembly_ast.Program:
+class AssemblyGenerator(NodeTransformer):
     """
-    Converts a parser Program node into an assembly Program node.
+    Converts the nodes of a parse tree into the nodes of an Assembly AST.
 
-    This function takes a Program node, converts its function definition
-    into an assembly Function node, and then wraps it into an assembly
-    Program node.
-
-    :param prog: The parser Program node to convert
-    :return: An assembly Program node
-    """
-    ast_func_def = convert_function_definition(prog.function_definition)
-    return assembly_ast.Program(ast_func_def)
-
-
-def convert_function_definition(func_def: parser_ast.Function) -> assembly_ast.Function:
-    """
-    Converts a parser Function node into an assembly Function node.
-
-    This function takes a Function node, converts its body Statement into a list
-    of Assembly instructions, and its name Identifier into an assembly Identifier
-    node.
-
-    :param func_def: The parser Function node to convert
-    :return: An assembly Function node
+    Each `visit_<Class>` method converts the parser nodes of that class, and the
+    handlers of abstract classes like `Statement` reject the nodes of their
+    subclasses that aren't supported yet.
     """
-    instructions = convert_statement(func_def.body)
-    name = convert_identifier(func_def.name)
-    return assembly_ast.Function(parent=None, body=instructions, identifier=name)
 
-
-def convert_statement(
-    statement: parser_ast.Statement,
-) -> list[assembly_ast.Instruction]:
-    """
-    Converts a parser Statement node into a list of Assembly instructions.
-
-    :param statement: The Statement node to convert
-    :raises: RuntimeError: If the statement type is not supported
-    :return: A list of Assembly instructions
-    """
-
-    if isinstance(statement, parser_ast.Return):
-        return convert_return_statement(statement)
-    else:
+    def visit_Program(self, prog: parser_ast.Program) -> assembly_ast.Program:
+        """
+        Converts a parser Program node into an assembly Program node.
+
+        This method takes a Program node, converts its function definition
+        into an assembly Function node, and then wraps it into an assembly
+        Program node.
+
+        :param prog: The parser Program node to convert
+        :return: An assembly Program node
+        """
+        ast_func_def = self.visit(prog.function_definition)
+        return assembly_ast.Program(ast_func_def)
+
+    def visit_Function(self, func_def: parser_ast.Function) -> assembly_ast.Function:
+        """
+        Converts a parser Function node into an assembly Function node.
+
+        This method takes a Function node, converts its body Statement into a list
+        of Assembly instructions, and its name Identifier into an assembly Identifier
+        node.
+
+        :param func_def: The parser Function node to convert
+        :return: An assembly Function node
+        """
+        instructions = self.visit(func_def.body)
+        name = self.visit(func_def.name)
+        return assembly_ast.Function(parent=None, body=instructions, identifier=name)
+
+    def visit_Statement(
+        self, statement: parser_ast.Statement
+    ) -> list[assembly_ast.Instruction]:
+        """
+        Rejects the statements that can't be converted yet.
+
+        :param statement: The Statement node to convert
+        :raises: RuntimeError: Always, as the statement type is not supported
+        """
         raise RuntimeError(
             f"Node '{statement}' cannot be converted into a list of Assembly instructions"
         )
 
-
-def convert_return_statement(
-    return_statement: parser_ast.Return,
-) -> list[assembly_ast.Instruction]:
-    """
-    Converts a Return statement into a list of Assembly instructions.
-
-    The instruction list consists of a single Mov instruction and a Return instruction.
-    The Mov instruction moves the value of the return expression into the register eax.
-
-    :param return_statement: The Return statement to convert
-    :return: A list of Assembly instructions
-    """
-    # This assumes that the return expression is an assembly operand
-    return [
-        assembly_ast.Mov(
-            parent=None,
-            source=convert_expression(return_statement.exp),
-            # Currently the only used register is eax
-            destination=assembly_ast.Register(parent=None, name="eax"),
-        ),
-        assembly_ast.Return(parent=None),
-    ]
-
-
-def convert_expression(exp: parser_ast.Exp) -> assembly_ast.Operand:
-    """
-    Converts an expression into an Assembly operand.
-
-    If the expression is a Constant, it returns an Immediate node with the same value.
-
-    :param exp: The expression to convert
-    :raises: RuntimeError: If the expression type is not supported
-    :return: An Assembly operand
-    """
-    if isinstance(exp, parser_ast.Constant):
-        return assembly_ast.Immediate(parent=None, value=exp.value)
-    else:
+    def visit_Return(
+        self, return_statement: parser_ast.Return
+    ) -> list[assembly_ast.Instruction]:
+        """
+        Converts a Return statement into a list of Assembly instructions.
+
+        The instruction list consists of a single Mov instruction and a Return instruction.
+        The Mov instruction moves the value of the return expression into the register eax.
+
+        :param return_statement: The Return statement to convert
+        :return: A list of Assembly instructions
+        """
+        # This assumes that the return expression is an assembly operand
+        return [
+            assembly_ast.Mov(
+                parent=None,
+                source=self.visit(return_statement.exp),
+                # Currently the only used register is eax
+                destination=assembly_ast.Register(parent=None, name="eax"),
+            ),
+            assembly_ast.Return(parent=None),
+        ]
+
+    def visit_Exp(self, exp: parser_ast.Exp) -> assembly_ast.Operand:
+        """
+        Rejects the expressions that can't be converted yet.
+
+        :param exp: The expression to convert
+        :raises: RuntimeError: Always, as the expression type is not supported
+        """
         raise RuntimeError(f"Node '{exp}' cannot be converted to Assembly Operand node")
 
+    def visit_Constant(self, exp: parser_ast.Constant) -> assembly_ast.Immediate:
+        """
+        Converts a Constant expression into an Immediate node with the same value.
 
-def convert_identifier(func_name: parser_ast.Identifier) -> assembly_ast.Identifier:
-    """
-    Converts a parser Identifier node into an assembly Identifier node.
+        :param exp: The Constant node to convert
+        :return: An Assembly operand
+        """
+        return assembly_ast.Immediate(parent=None, value=exp.value)
 
-    :param func_name: The parser Identifier node to convert
-    :return: An assembly Identifier node with the same value
-    """
-    return assembly_ast.Identifier(parent=None, value=func_name.value)
+    def visit_Identifier(
+        self, func_name: parser_ast.Identifier
+    ) -> assembly_ast.Identifier:
+        """
+        Converts a parser Identifier node into an assembly Identifier node.
+
+        :param func_name: The parser Identifier node to convert
+        :return: An assembly Identifier node with the same value and symbol
+        """
+        return assembly_ast.Identifier(
+            parent=None, value=func_name.value, symbol=func_name.symbol
+        )
@@ -0,0 +1,91 @@
+#!/usr/bin/env -S python3
+
+import argparse
+import compileall
+import importlib.util
+import os
+import py_compile
+import shutil
+import sys
+import tempfile
+import zipapp
+from collections.abc import Sequence
+
+# Packages bundled in the archive: the compiler, its library and its dependencies
+PACKAGES = ("compiler", "lib", "loguru")
+
+# Main module of the archive. Unlike the one zipapp generates for an entry point,
+# it exits with the status returned by the driver.
+MAIN_MODULE = """\
+import sys
+
+from compiler.compiler_driver import main
+
+sys.exit(main())
+"""
+
+
+def copy_package(name: str, destination: str) -> None:
+    """Copies the sources of an importable package into `destination`."""
+    spec = importlib.util.find_spec(name)
+    if spec is None or not spec.submodule_search_locations:
+        raise ValueError(f"Package '{name}' not found")
+    source = spec.submodule_search_locations[0]
+    shutil.copytree(
+        source,
+        os.path.join(destination, name),
+        ignore=shutil.ignore_patterns("__pycache__", "*.pyc"),
+    )
+
+
+def build_zipapp(output_file: str, packages: Sequence[str] = PACKAGES) -> None:
+    """Builds a single-file executable archive of the compiler driver.
+
+    The modules are compiled to bytecode next to their sources, where the zip
+    importer looks for it, so running the archive doesn't compile them again. The
+    bytecode isn't checked against the sources, which can't change in the archive.
+
+    Args:
+        output_file: Path to the archive, usually with a `.pyz` extension.
+        packages: The packages bundled in the archive.
+
+    Raises:
+        ValueError: If a package can't be found.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        for package in packages:
+            copy_package(package, directory)
+        with open(os.path.join(directory, "__main__.py"), "w") as f:
+            f.write(MAIN_MODULE)
+        compileall.compile_dir(
+            directory,
+            quiet=1,
+            legacy=True,
+            invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+        )
+        zipapp.create_archive(
+            directory,
+            output_file,
+            interpreter=sys.executable,
+        )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Build a single-file executable archive of the compiler driver"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="c-compiler.pyz",
+        help="Path to the archive (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    build_zipapp(args.output)
+    print(f"Built '{args.output}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,14 @@
+import io
+from typing import TextIO
+
 import compiler.assembly_generation.assembly_ast as assembly_ast
+from lib.ast.visitor import NodeVisitor
+from lib.tree.node import TreeNode
 from lib.tree.tree import Tree
 
+# Number of characters of code buffered by the emitter before writing them
+DEFAULT_BUFFER_SIZE = io.DEFAULT_BUFFER_SIZE
+
 
 def emit_assembly_code(input_tree: Tree) -> str:
     """
@@ -11,100 +19,174 @@ def emit_assembly_code(input_tree: Tree) -> str:
     :raises: TypeError: If the root node of the parse tree is not a Program node
     :return: A string containing the whole assembly code
     """
+    stream = io.StringIO()
+    write_assembly_code(input_tree, stream)
+    return stream.getvalue()
 
-    if not isinstance(input_tree.root, assembly_ast.Program):
-        raise TypeError(
-            f"The root node of the assembly AST '{input_tree}' is not a Program node"
-        )
-    return translate_program(input_tree.root)
-
-
-def translate_program(program: assembly_ast.Program) -> str:
-    """
-    Translates a Program node to the corresponding assembly code.
 
-    :param program: The Program node to translate
-    :return: A string with the corresponding assembly code
+def write_assembly_code(
+    input_tree: Tree, stream: TextIO, buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> None:
     """
-    header_line = "\t.intel_syntax noprefix\n"
-    function_code = translate_function(program.function_definition)
-    # The following line indicates that the code won't need an executable stack
-    ending_line = '\t.section .note.GNU-stack,"",@progbits\n'
-    return header_line + function_code + ending_line
-
+    Translates the input assembly AST to the corresponding assembly code,
+    and writes it to a text stream as it goes.
 
-def translate_function(function: assembly_ast.Function) -> str:
-    """
-    Translates a Function node to the corresponding assembly code.
+    The code is written in chunks of about `buffer_size` characters, so the
+    whole code is never held in memory.
 
-    :param function: The Function node to translate
-    :return: A string with the corresponding assembly code
+    :param input_tree: The assembly AST to be translated
+    :param stream: The text stream to write the code to, such as a file or a pipe
+    :param buffer_size: The number of characters buffered before writing them
+    :raises: TypeError: If the root node of the parse tree is not a Program node
     """
-    func_identifier = translate_identifier(function.name)
-    header = f"\t.global {func_identifier}\n"
-    label = f"{func_identifier}:\n"
-    instructions = translate_body(function.body)
-    return header + label + instructions
 
+    if not isinstance(input_tree.root, assembly_ast.Program):
+        raise TypeError(
+            f"The root node of the assembly AST '{input_tree}' is not a Program node"
+        )
+    emitter = AssemblyEmitter(stream, buffer_size)
+    emitter.visit(input_tree.root)
+    emitter.flush()
 
-def translate_identifier(func_name: assembly_ast.Identifier) -> str:
-    """
-    Translates an Identifier node to the corresponding label for the assembly code.
 
-    :param func_name: The Identifier node to translate
-    :return: A string with the identifying label
+class AssemblyEmitter(NodeVisitor):
     """
-    return func_name.value
+    Writes the assembly code of the nodes of an assembly AST to a text stream.
 
+    The `visit_<Class>` methods of the program, function and instruction nodes
+    write their lines of code, while the methods of the identifiers and operands
+    return their code to the instruction using them. The handlers of the abstract
+    `Instruction` and `Operand` classes reject the nodes of their subclasses that
+    can't be translated yet.
 
-def translate_body(func_body: list[assembly_ast.Instruction]) -> str:
+    Lines are buffered and written to the stream in chunks of about
+    `buffer_size` characters; `flush` writes the rest once emission is done.
     """
-    Translates a list of Instruction nodes to the corresponding lines of assembly code.
 
-    :param func_body: The list of Instruction nodes to translate
-    :raises: RuntimeError: If one of the instructions is not recognized
-    :return: A string with the corresponding assembly code
-    """
-    instructions_code = ""
-    for instruction in func_body:
-        if isinstance(instruction, assembly_ast.Mov):
-            instructions_code += f"\t{translate_mov(instruction)}\n"
-        elif isinstance(instruction, assembly_ast.Return):
-            instructions_code += "\tret\n"
-        else:
-            raise RuntimeError(
-                f"Failed to translate node '{instruction}' into a valid assembly instruction"
-            )
-    return instructions_code
+    def __init__(self, stream: TextIO, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self._stream = stream
+        self._buffer_size = buffer_size
+        self._lines: list[str] = []
+        self._buffered = 0
+
+    def write(self, line: str) -> None:
+        """
+        Buffers a line of assembly code, writing the buffer if it's full.
+
+        :param line: The line to write, including its newline
+        """
+        self._lines.append(line)
+        self._buffered += len(line)
+        if self._buffered >= self._buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered lines to the stream."""
+        self._stream.write("".join(self._lines))
+        self._lines.clear()
+        self._buffered = 0
+
+    def generic_visit(self, node: TreeNode) -> str:
+        """
+        Rejects the nodes that aren't part of an assembly AST.
+
+        :param node: The node to translate
+        :raises: RuntimeError: Always, as the node is not recognized
+        """
+        raise RuntimeError(f"Failed to translate node '{node}' into assembly code")
+
+    def visit_Program(self, program: assembly_ast.Program) -> None:
+        """
+        Writes the assembly code of a Program node.
+
+        :param program: The Program node to translate
+        """
+        self.write("\t.intel_syntax noprefix\n")
+        self.visit(program.function_definition)
+        # The following line indicates that the code won't need an executable stack
+        self.write('\t.section .note.GNU-stack,"",@progbits\n')
+
+    def visit_Function(self, function: assembly_ast.Function) -> None:
+        """
+        Writes the assembly code of a Function node.
+
+        :param function: The Function node to translate
+        """
+        func_identifier = self.visit(function.name)
+        self.write(f"\t.global {func_identifier}\n")
+        self.write(f"{func_identifier}:\n")
+        for instruction in function.body:
+            self.visit(instruction)
+
+    def visit_Identifier(self, func_name: assembly_ast.Identifier) -> str:
+        """
+        Translates an Identifier node to the corresponding label for the assembly code.
+
+        :param func_name: The Identifier node to translate
+        :return: A string with the identifying label
+        """
+        return func_name.value
+
+    def visit_Instruction(self, instruction: assembly_ast.Instruction) -> None:
+        """
+        Rejects the instructions that can't be translated yet.
+
+        :param instruction: The Instruction node to translate
+        :raises: RuntimeError: Always, as the instruction is not recognized
+        """
+        raise RuntimeError(
+            f"Failed to translate node '{instruction}' into a valid assembly instruction"
+        )
 
+    def visit_Return(self, return_instruction: assembly_ast.Return) -> None:
+        """
+        Writes the line of assembly code of a Return node.
+
+        :param return_instruction: The Return node to translate
+        """
+        self.write("\tret\n")
+
+    def visit_Mov(self, mov_instruction: assembly_ast.Mov) -> None:
+        """
+        Writes the line of assembly code of a Mov node.
+
+        :param mov_instruction: The Mov node to translate
+        :raises: RuntimeError: If the operand inside the instruction is not recognized
+        :raises: SyntaxError: If the destination operand is an Immediate node
+        """
+        if isinstance(mov_instruction.destination, assembly_ast.Immediate):
+            raise SyntaxError(
+                f"Cannot use Immediate operand '{mov_instruction.destination}' as destination for a move instruction"
+            )
+        src = self.visit(mov_instruction.source)
+        dst = self.visit(mov_instruction.destination)
+        self.write(f"\tmov\t{dst}, {src}\n")
 
-def translate_mov(mov_instruction: assembly_ast.Mov) -> str:
-    """
-    Translates a Mov node to the corresponding line of assembly code.
+    def visit_Operand(self, operand: assembly_ast.Operand) -> str:
+        """
+        Rejects the operands that can't be translated yet.
 
-    :param mov_instruction: The Mov node to translate
-    :raises: RuntimeError: If the operand inside the instruction is not recognized
-    :raises: SyntaxError: If the destination operand is an Immediate node
-    :return: A string with the corresponding line of assembly code
-    """
-    src, dst = "", ""
-    if isinstance(mov_instruction.source, assembly_ast.Register):
-        src = mov_instruction.source.name
-    elif isinstance(mov_instruction.source, assembly_ast.Immediate):
-        src = mov_instruction.source.value
-    else:
+        :param operand: The Operand node to translate
+        :raises: RuntimeError: Always, as the operand is not recognized
+        """
         raise RuntimeError(
-            f"Failed to translate operand '{mov_instruction.source}' inside move instruction"
+            f"Failed to translate operand '{operand}' inside move instruction"
         )
 
-    if isinstance(mov_instruction.destination, assembly_ast.Register):
-        dst = mov_instruction.destination.name
-    elif isinstance(mov_instruction.destination, assembly_ast.Immediate):
-        raise SyntaxError(
-            f"Cannot use Immediate operand '{mov_instruction.destination}' as destination for a move instruction"
-        )
-    else:
-        raise RuntimeError(
-            f"Failed to translate operand '{mov_instruction.destination}' inside move instruction"
-        )
-    return f"mov\t{dst}, {src}"
+    def visit_Register(self, register: assembly_ast.Register) -> str:
+        """
+        Translates a Register node to the name of the register.
+
+        :param register: The Register node to translate
+        :return: A string with the name of the register
+        """
+        return register.name
+
+    def visit_Immediate(self, immediate: assembly_ast.Immediate) -> str:
+        """
+        Translates an Immediate node to its value.
+
+        :param immediate: The Immediate node to translate
+        :return: A string with the value of the operand
+        """
+        return immediate.value
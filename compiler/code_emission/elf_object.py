@@ -0,0 +1,151 @@
+import struct
+from collections.abc import Iterable
+from typing import BinaryIO
+
+from compiler.code_emission.machine_code import MachineCode, encode_machine_code
+from lib.tree.tree import Tree
+
+# Identification of a 64-bit little-endian ELF file, for the System V ABI
+ELF_IDENT = b"\x7fELF" + bytes([2, 1, 1, 0]) + bytes(8)
+
+# Object file type and machine of the ELF header
+ET_REL = 1
+EM_X86_64 = 62
+
+# Section types and flags
+SHT_PROGBITS = 1
+SHT_SYMTAB = 2
+SHT_STRTAB = 3
+SHF_ALLOC = 0x2
+SHF_EXECINSTR = 0x4
+
+# Symbol binding and type, packed into the `st_info` field of a symbol
+STB_GLOBAL = 1
+STT_FUNC = 2
+
+# Layouts of the ELF header, a section header and a symbol table entry
+ELF_HEADER = struct.Struct("<16sHHIQQQIHHHHHH")
+SECTION_HEADER = struct.Struct("<IIQQQQIIQQ")
+SYMBOL = struct.Struct("<IBBHQQ")
+
+# Sections of the object file, in the order of their indices; index 0 is the
+# null section
+TEXT, NOTE_GNU_STACK, SYMTAB, STRTAB, SHSTRTAB = range(1, 6)
+SECTION_NAMES = (".text", ".note.GNU-stack", ".symtab", ".strtab", ".shstrtab")
+
+# Alignment of the code, as GNU as aligns the `.text` section
+TEXT_ALIGNMENT = 16
+
+
+def write_object_file(input_tree: Tree, stream: BinaryIO) -> None:
+    """
+    Encodes the input assembly AST into machine code, and writes it to a binary
+    stream as a relocatable ELF object file.
+
+    The object file can be linked into an executable like the one GNU as
+    assembles from the code emitted by `emit_assembly_code`.
+
+    :param input_tree: The assembly AST to be encoded
+    :param stream: The binary stream to write the object file to
+    :raises: TypeError: If the root node of the assembly AST is not a Program node
+    """
+    write_elf_object(encode_machine_code(input_tree), stream)
+
+
+def string_table(strings: Iterable[str]) -> tuple[bytes, list[int]]:
+    """
+    Builds an ELF string table of null-terminated strings.
+
+    :param strings: The strings of the table
+    :return: The content of the table, and the offset of each string in it
+    """
+    table = bytearray(b"\0")
+    offsets = []
+    for string in strings:
+        offsets.append(len(table))
+        table += string.encode() + b"\0"
+    return bytes(table), offsets
+
+
+def align(offset: int, alignment: int) -> int:
+    """Returns `offset` rounded up to a multiple of `alignment`."""
+    return -(-offset // alignment) * alignment
+
+
+def write_elf_object(machine_code: MachineCode, stream: BinaryIO) -> None:
+    """
+    Writes machine code to a binary stream as a relocatable ELF object file.
+
+    The object file has a `.text` section with the code, a global function
+    symbol for each function, and an empty `.note.GNU-stack` section, which
+    indicates that the code doesn't need an executable stack. The code doesn't
+    refer to any symbol, so the object file has no relocations.
+
+    :param machine_code: The machine code to write
+    :param stream: The binary stream to write the object file to
+    """
+    strtab, name_offsets = string_table(symbol.name for symbol in machine_code.symbols)
+    shstrtab, section_name_offsets = string_table(SECTION_NAMES)
+
+    # The symbol table starts with the null symbol, and has no local symbols
+    symtab = bytearray(SYMBOL.size)
+    for symbol, name_offset in zip(machine_code.symbols, name_offsets, strict=True):
+        symtab += SYMBOL.pack(
+            name_offset,
+            STB_GLOBAL << 4 | STT_FUNC,
+            0,
+            TEXT,
+            symbol.offset,
+            symbol.size,
+        )
+
+    # Type, flags, link, info, alignment and entry size of each section, in the
+    # order of `SECTION_NAMES`
+    sections: tuple[tuple[bytes, int, int, int, int, int, int], ...] = (
+        (bytes(machine_code.text), SHT_PROGBITS, SHF_ALLOC | SHF_EXECINSTR, 0, 0, TEXT_ALIGNMENT, 0),
+        (b"", SHT_PROGBITS, 0, 0, 0, 1, 0),
+        (bytes(symtab), SHT_SYMTAB, 0, STRTAB, 1, 8, SYMBOL.size),
+        (strtab, SHT_STRTAB, 0, 0, 0, 1, 0),
+        (shstrtab, SHT_STRTAB, 0, 0, 0, 1, 0),
+    )  # fmt: skip
+
+    # The contents of the sections are laid out after the ELF header, and followed
+    # by the section headers, starting with the null section
+    contents = bytearray(ELF_HEADER.size)
+    headers = bytearray(SECTION_HEADER.size)
+    for name_offset, section in zip(section_name_offsets, sections, strict=True):
+        data, section_type, flags, link, info, alignment, entry_size = section
+        offset = align(len(contents), alignment)
+        contents += bytes(offset - len(contents)) + data
+        headers += SECTION_HEADER.pack(
+            name_offset,
+            section_type,
+            flags,
+            0,
+            offset,
+            len(data),
+            link,
+            info,
+            alignment,
+            entry_size,
+        )
+
+    section_headers_offset = align(len(contents), 8)
+    contents += bytes(section_headers_offset - len(contents))
+    contents[: ELF_HEADER.size] = ELF_HEADER.pack(
+        ELF_IDENT,
+        ET_REL,
+        EM_X86_64,
+        1,
+        0,
+        0,
+        section_headers_offset,
+        0,
+        ELF_HEADER.size,
+        0,
+        0,
+        SECTION_HEADER.size,
+        len(SECTION_NAMES) + 1,
+        SHSTRTAB,
+    )
+    stream.write(contents + headers)
@@ -0,0 +1,275 @@
+from dataclasses import dataclass, field
+
+import compiler.assembly_generation.assembly_ast as assembly_ast
+from lib.ast.visitor import NodeVisitor
+from lib.tree.node import TreeNode
+from lib.tree.tree import Tree
+
+# Names of the general purpose registers, in the order of their numbers in the
+# instruction encoding, for 32 and 64-bit operands
+REGISTERS_32 = (
+    "eax", "ecx", "edx", "ebx", "esp", "ebp", "esi", "edi",
+    "r8d", "r9d", "r10d", "r11d", "r12d", "r13d", "r14d", "r15d",
+)  # fmt: skip
+REGISTERS_64 = (
+    "rax", "rcx", "rdx", "rbx", "rsp", "rbp", "rsi", "rdi",
+    "r8", "r9", "r10", "r11", "r12", "r13", "r14", "r15",
+)  # fmt: skip
+
+# Number and size in bytes of each register
+REGISTERS = {name: (number, 4) for number, name in enumerate(REGISTERS_32)} | {
+    name: (number, 8) for number, name in enumerate(REGISTERS_64)
+}
+
+# Bits of the REX prefix, which extends the operand size to 64 bits (W), and the
+# register numbers of the ModRM `reg` (R) and `rm` (B) fields to 4 bits
+REX, REX_W, REX_R, REX_B = 0x40, 0x08, 0x04, 0x01
+
+# Opcodes of the supported instructions
+RET = 0xC3
+MOV_RM_REG = 0x89
+MOV_REG_IMM = 0xB8
+MOV_RM_IMM = 0xC7
+
+# ModRM mode of register to register operands
+MODRM_REGISTER = 0b11
+
+
+@dataclass(frozen=True)
+class FunctionSymbol:
+    """A function defined in the machine code.
+
+    Attributes:
+        name: Name of the function.
+        offset: Offset of the first instruction of the function in the code.
+        size: Size in bytes of the code of the function.
+    """
+
+    name: str
+    offset: int
+    size: int
+
+
+@dataclass
+class MachineCode:
+    """The machine code of a program, ready to be written to an object file.
+
+    Attributes:
+        text: The encoded instructions, which make up the `.text` section.
+        symbols: The functions defined in the code, in order.
+    """
+
+    text: bytearray = field(default_factory=bytearray)
+    symbols: list[FunctionSymbol] = field(default_factory=list)
+
+
+def encode_machine_code(input_tree: Tree) -> MachineCode:
+    """
+    Encodes the instructions of the input assembly AST into x86-64 machine code.
+
+    The instructions are encoded as GNU as encodes the code emitted by
+    `emit_assembly_code`, choosing the shortest encoding of each instruction.
+
+    :param input_tree: The assembly AST to be encoded
+    :raises: TypeError: If the root node of the assembly AST is not a Program node
+    :return: The machine code and the functions it defines
+    """
+    if not isinstance(input_tree.root, assembly_ast.Program):
+        raise TypeError(
+            f"The root node of the assembly AST '{input_tree}' is not a Program node"
+        )
+    encoder = MachineCodeEncoder()
+    encoder.visit(input_tree.root)
+    return encoder.machine_code
+
+
+def rex_prefix(wide: bool, reg: int = 0, rm: int = 0) -> bytes:
+    """
+    Returns the REX prefix of an instruction, which is empty if it isn't needed.
+
+    :param wide: If the instruction has 64-bit operands
+    :param reg: Number of the register of the ModRM `reg` field, or opcode
+    :param rm: Number of the register of the ModRM `rm` field, or opcode
+    :return: The prefix, of zero or one byte
+    """
+    bits = (
+        (REX_W if wide else 0) | (REX_R if reg >= 8 else 0) | (REX_B if rm >= 8 else 0)
+    )
+    return bytes([REX | bits]) if bits else b""
+
+
+def modrm_registers(reg: int, rm: int) -> int:
+    """
+    Returns the ModRM byte of an instruction with two register operands.
+
+    :param reg: Number of the register of the `reg` field
+    :param rm: Number of the register of the `rm` field
+    :return: The ModRM byte
+    """
+    return MODRM_REGISTER << 6 | (reg & 7) << 3 | rm & 7
+
+
+class MachineCodeEncoder(NodeVisitor):
+    """
+    Encodes the nodes of an assembly AST into x86-64 machine code.
+
+    The `visit_<Class>` methods of the program, function and instruction nodes
+    append their bytes to the machine code, while the methods of the operands
+    return their value to the instruction using them: the number and size of a
+    register, or the integer of an immediate. The handlers of the abstract
+    `Instruction` and `Operand` classes reject the nodes of their subclasses that
+    can't be encoded yet.
+    """
+
+    def __init__(self) -> None:
+        self.machine_code = MachineCode()
+
+    def emit(self, *parts: bytes | int) -> None:
+        """
+        Appends the bytes of an instruction to the machine code.
+
+        :param parts: Byte strings, or single bytes given as integers
+        """
+        text = self.machine_code.text
+        for part in parts:
+            if isinstance(part, int):
+                text.append(part)
+            else:
+                text += part
+
+    def generic_visit(self, node: TreeNode) -> None:
+        """
+        Rejects the nodes that aren't part of an assembly AST.
+
+        :param node: The node to encode
+        :raises: RuntimeError: Always, as the node is not recognized
+        """
+        raise RuntimeError(f"Failed to encode node '{node}' into machine code")
+
+    def visit_Program(self, program: assembly_ast.Program) -> None:
+        """
+        Encodes the function of a Program node.
+
+        :param program: The Program node to encode
+        """
+        self.visit(program.function_definition)
+
+    def visit_Function(self, function: assembly_ast.Function) -> None:
+        """
+        Encodes the instructions of a Function node, and records its symbol.
+
+        :param function: The Function node to encode
+        """
+        offset = len(self.machine_code.text)
+        for instruction in function.body:
+            self.visit(instruction)
+        size = len(self.machine_code.text) - offset
+        self.machine_code.symbols.append(
+            FunctionSymbol(function.name.value, offset, size)
+        )
+
+    def visit_Instruction(self, instruction: assembly_ast.Instruction) -> None:
+        """
+        Rejects the instructions that can't be encoded yet.
+
+        :param instruction: The Instruction node to encode
+        :raises: RuntimeError: Always, as the instruction is not recognized
+        """
+        raise RuntimeError(
+            f"Failed to encode node '{instruction}' into a machine instruction"
+        )
+
+    def visit_Return(self, return_instruction: assembly_ast.Return) -> None:
+        """
+        Encodes a Return node.
+
+        :param return_instruction: The Return node to encode
+        """
+        self.emit(RET)
+
+    def visit_Mov(self, mov_instruction: assembly_ast.Mov) -> None:
+        """
+        Encodes a Mov node.
+
+        A register is moved with `mov r/m, r`. An immediate is moved with
+        `mov r, imm32` into a 32-bit register, and into a 64-bit register with
+        `mov r/m, imm32` if it's sign-extended from 32 bits, or else with
+        `mov r, imm64`.
+
+        :param mov_instruction: The Mov node to encode
+        :raises: RuntimeError: If the operand inside the instruction is not recognized
+        :raises: SyntaxError: If the destination operand is an Immediate node, or if
+            the sizes of the registers differ
+        :raises: ValueError: If the immediate doesn't fit in the destination register
+        """
+        if isinstance(mov_instruction.destination, assembly_ast.Immediate):
+            raise SyntaxError(
+                f"Cannot use Immediate operand '{mov_instruction.destination}' as destination for a move instruction"
+            )
+        dst, size = self.visit(mov_instruction.destination)
+        wide = size == 8
+        if isinstance(mov_instruction.source, assembly_ast.Register):
+            src, src_size = self.visit(mov_instruction.source)
+            if src_size != size:
+                raise SyntaxError(
+                    f"Operands of move instruction '{mov_instruction}' differ in size"
+                )
+            self.emit(rex_prefix(wide, src, dst), MOV_RM_REG, modrm_registers(src, dst))
+            return
+
+        value = self.visit(mov_instruction.source)
+        if not -(2 ** (size * 8 - 1)) <= value < 2 ** (size * 8):
+            raise ValueError(
+                f"Immediate '{value}' of move instruction '{mov_instruction}' "
+                f"doesn't fit in {size * 8} bits"
+            )
+        if wide and -(2**31) <= value < 2**31:
+            self.emit(
+                rex_prefix(wide, rm=dst),
+                MOV_RM_IMM,
+                modrm_registers(0, dst),
+                value.to_bytes(4, "little", signed=True),
+            )
+        else:
+            self.emit(
+                rex_prefix(wide, rm=dst),
+                MOV_REG_IMM + (dst & 7),
+                (value % 2 ** (size * 8)).to_bytes(size, "little"),
+            )
+
+    def visit_Operand(self, operand: assembly_ast.Operand) -> None:
+        """
+        Rejects the operands that can't be encoded yet.
+
+        :param operand: The Operand node to encode
+        :raises: RuntimeError: Always, as the operand is not recognized
+        """
+        raise RuntimeError(
+            f"Failed to encode operand '{operand}' inside move instruction"
+        )
+
+    def visit_Register(self, register: assembly_ast.Register) -> tuple[int, int]:
+        """
+        Encodes a Register node to the number and size of the register.
+
+        :param register: The Register node to encode
+        :raises: RuntimeError: If the register is not a general purpose register
+        :return: The number of the register, and its size in bytes
+        """
+        if register.name not in REGISTERS:
+            raise RuntimeError(f"Failed to encode unknown register '{register.name}'")
+        return REGISTERS[register.name]
+
+    def visit_Immediate(self, immediate: assembly_ast.Immediate) -> int:
+        """
+        Encodes an Immediate node to its integer value.
+
+        As in C and in the assembly code, a value with a leading zero is octal.
+
+        :param immediate: The Immediate node to encode
+        :return: The value of the operand
+        """
+        value = str(immediate.value)
+        if len(value) > 1 and value.startswith("0"):
+            return int(value, 8)
+        return int(value)
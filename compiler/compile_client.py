@@ -0,0 +1,166 @@
+#!/usr/bin/env -S python3
+
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+from collections.abc import Sequence
+
+from compiler.driver_arguments import build_argument_parser, get_dumps, get_stage
+
+# Environment variable overriding the path of the socket of the compile server
+SOCKET_ENV_VAR = "C_COMPILER_SOCKET"
+
+
+def get_private_dir() -> str:
+    """Returns a directory of the temporary directory only the current user can use.
+
+    The directory is created if needed. Since other users can create files in
+    the temporary directory, an existing one is checked to belong to the
+    current user, and not to be accessible by other users.
+
+    Raises:
+        RuntimeError: If the directory can't be created, or belongs to another
+            user, or other users can access it.
+    """
+    path = os.path.join(tempfile.gettempdir(), f"c-compiler-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    except OSError as e:
+        raise RuntimeError(f"Failed to create the directory '{path}': {e}") from e
+    status = os.lstat(path)
+    if (
+        not stat.S_ISDIR(status.st_mode)
+        or status.st_uid != os.getuid()
+        or stat.S_IMODE(status.st_mode) & 0o077
+    ):
+        raise RuntimeError(f"'{path}' is not a private directory of the current user")
+    return path
+
+
+def get_socket_path() -> str:
+    """Returns the path of the Unix socket the compile server listens on.
+
+    The path is read from the `C_COMPILER_SOCKET` environment variable, and
+    defaults to a socket in the runtime directory of the user, given by the
+    `XDG_RUNTIME_DIR` environment variable, or else in `get_private_dir()`.
+
+    Raises:
+        RuntimeError: If the private directory of the socket can't be used.
+    """
+    if SOCKET_ENV_VAR in os.environ:
+        return os.environ[SOCKET_ENV_VAR]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "c-compiler.sock")
+    return os.path.join(get_private_dir(), "server.sock")
+
+
+def connect(socket_path: str) -> socket.socket:
+    """Connects to the compile server.
+
+    Args:
+        socket_path: Path to the Unix socket of the server.
+
+    Raises:
+        OSError: If the server can't be reached, such as when it isn't running.
+
+    Returns:
+        The socket connected to the server.
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except OSError:
+        client.close()
+        raise
+    return client
+
+
+def send_request(client: socket.socket, request: dict) -> dict:
+    """Sends a request to the compile server and returns its response.
+
+    Requests and responses are JSON objects, each written on a single line.
+
+    Args:
+        client: The socket connected to the server, see `connect`.
+        request: The request to send.
+
+    Raises:
+        OSError: If the connection to the server fails.
+        ValueError: If the response isn't valid JSON.
+
+    Returns:
+        The response of the server.
+    """
+    with client.makefile("rwb") as stream:
+        stream.write(json.dumps(request).encode() + b"\n")
+        stream.flush()
+        response = stream.readline()
+    if not response:
+        raise ConnectionError("The compile server closed the connection")
+    return json.loads(response)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Compiles C source files with the compile server, like the compiler driver.
+
+    The arguments are the ones of the compiler driver, and are parsed here, so
+    invalid arguments are reported without reaching the server. The server
+    compiles the files with its own pool of processes, at most as many at once as
+    the number of jobs requested. If the server can't be reached, the files are
+    compiled by the driver in this process, but a request failing once sent is
+    reported as a failed compilation.
+
+    Returns:
+        The exit status of the compilation, as returned by the compiler driver.
+    """
+    args = build_argument_parser().parse_args(argv)
+    stage = get_stage(args)
+    dumps = get_dumps(args)
+    # The server may run in another working directory
+    input_files = [os.path.abspath(file) for file in args.input_files]
+    include_dirs = [os.path.abspath(directory) for directory in args.include_dirs]
+    request = {
+        "input_files": input_files,
+        "stage": stage,
+        "dumps": sorted(dumps),
+        "preprocessor": args.preprocessor,
+        "include_dirs": include_dirs,
+        "assembler": args.assembler,
+        "jobs": args.jobs,
+        "log_level": os.environ.get("LOGURU_LEVEL", "DEBUG"),
+    }
+    try:
+        client = connect(get_socket_path())
+    except (OSError, RuntimeError):
+        from compiler.compiler_driver import compile_files
+
+        return compile_files(
+            args.input_files,
+            stage,
+            dumps,
+            args.jobs,
+            args.preprocessor,
+            args.include_dirs,
+            args.assembler,
+        )
+
+    # The server may have compiled some of the files already, so they aren't
+    # compiled again if the request fails
+    with client:
+        try:
+            response = send_request(client, request)
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"The compile request failed: {e}\n")
+            return 1
+    sys.stderr.write(response["log"])
+    return response["status"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+#!/usr/bin/env -S python3
+
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from collections.abc import Callable, Collection, Sequence
+from concurrent.futures import BrokenExecutor, Executor, Future, ProcessPoolExecutor
+from typing import Any
+
+from loguru import logger
+
+from compiler.compile_client import get_socket_path
+from compiler.compiler_driver import STAGE_MODULES, compile_file, report_failures
+from compiler.driver_arguments import jobs_type
+
+# Format of the logs sent back to clients, which is the default one of loguru
+LOG_FORMAT = (
+    "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - "
+    "{message}"
+)
+
+
+def init_worker() -> None:
+    """Removes the log sinks of a worker process, whose logs go to the clients."""
+    logger.remove()
+
+
+def compile_file_with_log(
+    input_file: str,
+    stage: str | None,
+    dumps: Collection[str],
+    preprocessor: str,
+    include_dirs: Sequence[str],
+    assembler: str,
+    log_level: str,
+) -> tuple[int, str]:
+    """Compiles a C source file with `compile_file`, capturing its logs.
+
+    Run by the worker processes of the server, which compile one file at a time.
+
+    Args:
+        input_file: The path to the input C source file.
+        stage: Last stage to execute, if the file isn't compiled into an executable.
+        dumps: Stages whose output is dumped to a file, among `DUMP_STAGES`.
+        preprocessor: The preprocessor to use, among `PREPROCESSORS`.
+        include_dirs: Directories searched for included files.
+        assembler: The assembler to use, among `ASSEMBLERS`.
+        log_level: The minimum level of the logs captured.
+
+    Returns:
+        The exit status of the compilation and its logs.
+    """
+    messages: list[str] = []
+    handler = logger.add(messages.append, level=log_level, format=LOG_FORMAT)
+    try:
+        status = compile_file(
+            input_file, stage, dumps, preprocessor, include_dirs, assembler
+        )
+    except Exception:
+        logger.exception(f"Failed to compile '{input_file}'")
+        status = 1
+    finally:
+        logger.remove(handler)
+    return status, "".join(messages)
+
+
+class CompileRequestHandler(socketserver.StreamRequestHandler):
+    """Serves a compile request sent by `compile_client`.
+
+    The request lists the files to compile, with the arguments of the driver:
+    `{"input_files": [...], "stage": ..., "dumps": [...], "preprocessor": ...,
+    "include_dirs": [...], "assembler": ..., "jobs": ..., "log_level": ...}`.
+    The response holds the exit status of the batch and its logs:
+    `{"status": ..., "log": ...}`.
+    """
+
+    server: "CompileServer"
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            arguments = (
+                list(request["input_files"]),
+                request["stage"],
+                frozenset(request["dumps"]),
+                request["preprocessor"],
+                list(request["include_dirs"]),
+                request["assembler"],
+                int(request["jobs"]),
+                request["log_level"],
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            response = {"status": 2, "log": f"Invalid compile request: {e}\n"}
+        else:
+            response = self.server.compile(*arguments)
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class CompileServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    A server compiling C source files for clients connected to a Unix socket.
+
+    The compiler is loaded once, in the worker processes of the executor, so
+    requests don't pay the startup of the interpreter and the import of the
+    compiler. Each connection is served by a thread, and the files of concurrent
+    requests are compiled in parallel by the workers. If a worker process dies,
+    the files it was compiling fail, and the executor, which is then broken, is
+    replaced by a new one from `make_executor`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, make_executor: Callable[[], Executor]) -> None:
+        self.make_executor = make_executor
+        self.executor = make_executor()
+        self.executor_lock = threading.Lock()
+        # Only the user running the server can connect to it, from the moment the
+        # socket is bound
+        umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, CompileRequestHandler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.executor.shutdown()
+
+    def submit(self, *args: Any) -> Future[tuple[int, str]]:
+        """Submits the compilation of a file to the workers.
+
+        Args:
+            args: The arguments of `compile_file_with_log`.
+
+        Returns:
+            The future of the exit status of the compilation and its logs.
+        """
+        with self.executor_lock:
+            try:
+                return self.executor.submit(compile_file_with_log, *args)
+            except BrokenExecutor:
+                logger.warning("Replacing the broken pool of worker processes...")
+                self.executor.shutdown(wait=False)
+                self.executor = self.make_executor()
+                return self.executor.submit(compile_file_with_log, *args)
+
+    def compile(
+        self,
+        input_files: Sequence[str],
+        stage: str | None,
+        dumps: Collection[str],
+        preprocessor: str,
+        include_dirs: Sequence[str],
+        assembler: str,
+        jobs: int,
+        log_level: str,
+    ) -> dict:
+        """Compiles C source files, returning the response to the request.
+
+        At most `jobs` files of the request are compiled at once, like with the
+        driver, while the files of other requests are compiled by the other workers.
+        """
+        slots = threading.Semaphore(max(jobs, 1))
+        futures = []
+        for file in input_files:
+            slots.acquire()
+            future = self.submit(
+                file, stage, dumps, preprocessor, include_dirs, assembler, log_level
+            )
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+
+        # Capture the logs of the workers, and the ones of the batch, logged by
+        # this thread
+        logs: list[str] = []
+        thread_id = threading.get_ident()
+        handler = logger.add(
+            logs.append,
+            level=log_level,
+            format=LOG_FORMAT,
+            filter=lambda record: record["thread"].id == thread_id,
+        )
+        try:
+            statuses = []
+            for file, future in zip(input_files, futures, strict=True):
+                try:
+                    status, log = future.result()
+                except BrokenExecutor as e:
+                    logger.error(f"Failed to compile '{file}': {e}")
+                    status = 1
+                else:
+                    logs.append(log)
+                statuses.append(status)
+            status = report_failures(input_files, statuses)
+        finally:
+            logger.remove(handler)
+        return {"status": status, "log": "".join(logs)}
+
+
+def remove_stale_socket(socket_path: str) -> None:
+    """Removes the socket of a server that is no longer running, if any.
+
+    Only a Unix socket of the current user is removed, so that a file given by
+    mistake, or planted by another user, is never deleted.
+
+    Raises:
+        RuntimeError: If a server is already listening on the socket, or if the
+            path isn't a socket of the current user, or can't be removed.
+    """
+    try:
+        status = os.lstat(socket_path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(status.st_mode) or status.st_uid != os.getuid():
+        raise RuntimeError(f"'{socket_path}' is not a socket of the current user")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except OSError:
+            pass
+        else:
+            raise RuntimeError(
+                f"A compile server is already listening on '{socket_path}'"
+            )
+    try:
+        os.unlink(socket_path)
+    except OSError as e:
+        raise RuntimeError(
+            f"Failed to remove the stale socket '{socket_path}': {e}"
+        ) from e
+
+
+def serve(socket_path: str, jobs: int) -> None:
+    """Serves compile requests on a Unix socket until the process is terminated.
+
+    Args:
+        socket_path: Path to the Unix socket to listen on.
+        jobs: The number of files compiled in parallel.
+
+    Raises:
+        RuntimeError: If a server is already listening on the socket.
+    """
+    remove_stale_socket(socket_path)
+    # Workers are forked from a process that has already imported the compiler,
+    # rather than from this multithreaded one
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["compiler.compiler_driver", *STAGE_MODULES])
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    def make_executor() -> Executor:
+        return ProcessPoolExecutor(jobs, context, initializer=init_worker)
+
+    with CompileServer(socket_path, make_executor) as server:
+        logger.info(f"Serving compile requests on '{socket_path}' with {jobs} jobs...")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+            logger.info("Compile server stopped")
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Serve compile requests of `compile_client` on a Unix socket"
+    )
+    parser.add_argument(
+        "--socket",
+        help="Path to the Unix socket to listen on, by default the one clients use",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=jobs_type,
+        default="0",
+        metavar="N",
+        help="Compile N files in parallel, or one per CPU if N is 0",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        serve(args.socket or get_socket_path(), args.jobs)
+    except RuntimeError as e:
+        logger.error(e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,36 @@
 #!/usr/bin/env -S python3
 
-import argparse
+# The stages of the compiler, and modules only some invocations need, are imported
+# by the functions using them, so that startup only pays for what is run: lexing
+# a file doesn't import the parser or the code generator
+import io
 import os
-import subprocess
-from tempfile import NamedTemporaryFile
+import sys
+from collections.abc import Collection, Sequence
+from contextlib import suppress
+from typing import TYPE_CHECKING
 
 from loguru import logger
 
-from compiler.assembly_generation.assembly_generation import generate_assembly_ast
-from compiler.code_emission.code_emission import emit_assembly_code
-from compiler.lexer.lexer import tokenize
-from compiler.parser.parser import generate_parse_tree
-from lib.ast.ast import generate_pretty_ast_repr
+from compiler.driver_arguments import build_argument_parser, get_dumps, get_stage
+
+if TYPE_CHECKING:
+    from lib.tree.tree import Tree
+
+# Extensions of the dump files of the stages, when they aren't the stage names
+DUMP_EXTENSIONS = {"preprocess": "i", "asm": "s", "obj": "o"}
+
+# Modules of the stages of the compiler, for processes that compile many files
+# to import them upfront
+STAGE_MODULES = (
+    "compiler.preprocessor.preprocessor",
+    "compiler.lexer.lexer",
+    "compiler.parser.parser",
+    "compiler.assembly_generation.assembly_generation",
+    "compiler.code_emission.code_emission",
+    "compiler.code_emission.elf_object",
+    "lib.ast.ast",
+)
 
 
 def gcc_preprocess(input_file: str, output_file: str) -> None:
@@ -21,49 +40,222 @@ def gcc_preprocess(input_file: str, output_file: str) -> None:
         input_file: Path to the source C file to preprocess.
         output_file: Path to the preprocessed file. The file should have `.i` extension.
     """
+    import subprocess
+
     logger.info(f"Preprocessing C source file '{input_file}'...")
     subprocess.run(["gcc", "-E", "-P", input_file, "-o", output_file], check=True)
 
 
-def run_compiler(input_file: str, output_file: str, use_gcc: bool) -> None:
-    """Compiles a preprocessed C source file into an assembly file.
+def gcc_preprocess_code(input_file: str, include_dirs: Sequence[str] = ()) -> str:
+    """Preprocess a C source file using GCC and returns the preprocessed code.
+
+    The code is read from the standard output of GCC, without going through a file.
 
     Args:
-        input_file: Path to the preprocessed C file. The file should have a `.i` extension.
-        output_file: Path to the compiled assembly file. The file should have a `.s` extension.
+        input_file: Path to the source C file to preprocess.
+        include_dirs: Directories searched for included files, before the system
+            ones.
+
+    Raises:
+        subprocess.CalledProcessError: If GCC fails to preprocess the file.
+
+    Returns:
+        The preprocessed C code.
     """
-    if use_gcc:
-        logger.info(f"Compiling the preprocessed file '{input_file}' with GCC...")
-        subprocess.run(
-            [
-                "gcc",
-                "-S",
-                "-O",
-                "-masm=intel",
-                "-fno-asynchronous-unwind-tables",
-                "-fcf-protection=none",
-                input_file,
-                "-o",
-                output_file,
-            ],
-            check=True,
-        )
-    else:
-        logger.info(
-            f"Compiling the preprocessed file '{input_file}' with the custom compiler..."
-        )
-        tokens = tokenize(input_file)
-        parse_tree = generate_parse_tree(tokens)
-        logger.debug("Parse tree:\n" + generate_pretty_ast_repr(parse_tree))
-        assembly_ast = generate_assembly_ast(parse_tree)
-        logger.debug("Assembly AST:\n" + generate_pretty_ast_repr(assembly_ast))
-        out_code = emit_assembly_code(assembly_ast)
-        with open(output_file, "w") as f:
-            f.write(out_code)
-        logger.debug(f"Assembly code:\n{out_code}")
-
-
-def run_compiler_stages(input_file: str, stage: str) -> None:
+    import subprocess
+
+    logger.info(f"Preprocessing C source file '{input_file}'...")
+    options = [f"-I{directory}" for directory in include_dirs]
+    process = subprocess.run(
+        ["gcc", "-E", "-P", *options, input_file],
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return process.stdout
+
+
+def builtin_preprocess_code(
+    input_file: str, include_dirs: Sequence[str] = ()
+) -> str | None:
+    """Preprocess a C source file using the built-in preprocessor.
+
+    Included files are cached by the process, so the headers shared by the files of
+    a batch are only read once.
+
+    Args:
+        input_file: Path to the source C file to preprocess.
+        include_dirs: Directories searched for included files.
+
+    Raises:
+        OSError: If a file can't be read.
+        ValueError: If the code is invalid, or if it has an `#error` directive.
+
+    Returns:
+        The preprocessed C code, or None if the file uses a construct the built-in
+        preprocessor doesn't support, such as system headers.
+    """
+    from compiler.preprocessor.preprocessor import preprocess_file
+
+    logger.info(f"Preprocessing C source file '{input_file}' (built-in)...")
+    try:
+        return preprocess_file(input_file, include_dirs)
+    except NotImplementedError as e:
+        logger.info(f"Falling back to GCC to preprocess '{input_file}': {e}")
+        return None
+
+
+def dump_tree(tree: "Tree", stage: str, dump_file: str | None = None) -> None:
+    """Dumps the pretty representation of the tree produced by a stage.
+
+    The representation is logged at debug level, and streamed to `dump_file` if
+    given, in which case the log reads it back. It's only generated if it's
+    written, or if a sink handles debug logs.
+
+    Args:
+        tree: The tree produced by the stage.
+        stage: Name of the stage, used as the title of the dump.
+        dump_file: Path to the file the representation is written to, if any.
+    """
+    from pathlib import Path
+
+    from lib.ast.ast import generate_pretty_ast_repr, write_pretty_ast_repr
+
+    title = f"{stage.capitalize()} tree:\n{{}}"
+    if dump_file is None:
+        logger.opt(lazy=True).debug(title, lambda: generate_pretty_ast_repr(tree))
+        return
+    logger.info(f"Dumping the output of the {stage} stage to '{dump_file}'...")
+    with open(dump_file, "w") as f:
+        write_pretty_ast_repr(tree, f)
+        f.write("\n")
+    logger.opt(lazy=True).debug(title, lambda: Path(dump_file).read_text()[:-1])
+
+
+def get_dump_file(
+    dump_prefix: str | None, dumps: Collection[str], stage: str
+) -> str | None:
+    """Returns the path of the dump file of `stage`, or None if it isn't dumped."""
+    if dump_prefix is None or stage not in dumps:
+        return None
+    return f"{dump_prefix}.{DUMP_EXTENSIONS.get(stage, stage)}"
+
+
+def preprocess(
+    input_file: str,
+    dumps: Collection[str] = (),
+    dump_prefix: str | None = None,
+    preprocessor: str = "builtin",
+    include_dirs: Sequence[str] = (),
+) -> str:
+    """Preprocesses a C source file, dumping the preprocessed code if asked.
+
+    Args:
+        input_file: The path to the input C source file.
+        dumps: Stages whose output is dumped to a file, among `DUMP_STAGES`.
+        dump_prefix: Path of the dump files without extension.
+        preprocessor: The preprocessor to use, among `PREPROCESSORS`. The built-in
+            one falls back to GCC for the constructs it doesn't support.
+        include_dirs: Directories searched for included files.
+
+    Raises:
+        subprocess.CalledProcessError: If GCC fails to preprocess the file.
+        OSError: If the built-in preprocessor can't read a file.
+        ValueError: If the built-in preprocessor rejects the code.
+
+    Returns:
+        The preprocessed C code.
+    """
+    code = None
+    if preprocessor == "builtin":
+        code = builtin_preprocess_code(input_file, include_dirs)
+    if code is None:
+        code = gcc_preprocess_code(input_file, include_dirs)
+    dump_file = get_dump_file(dump_prefix, dumps, "preprocess")
+    if dump_file is not None:
+        logger.info(f"Dumping the preprocessed code to '{dump_file}'...")
+        with open(dump_file, "w") as f:
+            f.write(code)
+    return code
+
+
+def gcc_compile_code(code: str, output_file: str) -> None:
+    """Compiles preprocessed C code into an assembly file with GCC.
+
+    The assembly code is in the syntax the custom compiler emits, without unwind
+    tables or control-flow protection, so it can serve as a reference for the
+    output of the custom compiler.
+
+    Args:
+        code: The preprocessed C code, piped into the standard input of GCC.
+        output_file: Path to the assembly file. The file should have a `.s` extension.
+
+    Raises:
+        subprocess.CalledProcessError: If GCC fails to compile the code.
+    """
+    import subprocess
+
+    logger.info(f"Compiling the preprocessed code into '{output_file}' with GCC...")
+    subprocess.run(
+        [
+            "gcc",
+            "-S",
+            "-O",
+            "-masm=intel",
+            "-fno-asynchronous-unwind-tables",
+            "-fcf-protection=none",
+            "-x",
+            "cpp-output",
+            "-",
+            "-o",
+            output_file,
+        ],
+        input=code,
+        text=True,
+        check=True,
+    )
+
+
+def run_compiler(
+    code: str, dumps: Collection[str] = (), dump_prefix: str | None = None
+) -> "Tree":
+    """Compiles preprocessed C code into an assembly tree with the custom compiler.
+
+    Args:
+        code: The preprocessed C code.
+        dumps: Stages whose output is dumped to a file, among `DUMP_STAGES`.
+        dump_prefix: Path of the dump files without extension.
+
+    Returns:
+        The assembly tree, from which the assembly code is emitted.
+    """
+    from compiler.assembly_generation.assembly_generation import generate_assembly_ast
+    from compiler.code_emission.code_emission import emit_assembly_code
+    from compiler.lexer.lexer import tokenize_code
+    from compiler.parser.parser import generate_parse_arena
+
+    logger.info("Compiling the preprocessed code with the custom compiler...")
+    tokens = tokenize_code(code)
+    # The parse tree is stored in an arena, which the garbage collector doesn't
+    # have to track, and only read through façades by the later stages
+    parse_tree = generate_parse_arena(tokens).to_tree()
+    dump_tree(parse_tree, "parse", get_dump_file(dump_prefix, dumps, "parse"))
+    assembly_ast = generate_assembly_ast(parse_tree)
+    dump_tree(assembly_ast, "codegen", get_dump_file(dump_prefix, dumps, "codegen"))
+    logger.opt(lazy=True).debug(
+        "Assembly code:\n{}", lambda: emit_assembly_code(assembly_ast)
+    )
+    return assembly_ast
+
+
+def run_compiler_stages(
+    input_file: str,
+    stage: str,
+    dumps: Collection[str] = (),
+    dump_prefix: str | None = None,
+    preprocessor: str = "builtin",
+    include_dirs: Sequence[str] = (),
+) -> None:
     """Runs specified stages of the compiler based on input arguments.
 
     This function preprocesses the input file and, depending on `stage`,
@@ -76,6 +268,10 @@ def run_compiler_stages(input_file: str, stage: str) -> None:
     Args:
         input_file: The path to the input C source file.
         stage: Last stage to execute. Can be "lex", "parse" or "codegen".
+        dumps: Stages whose output is dumped to a file, among `DUMP_STAGES`.
+        dump_prefix: Path of the dump files without extension.
+        preprocessor: The preprocessor to use, among `PREPROCESSORS`.
+        include_dirs: Directories searched for included files.
 
     Raises:
         subprocess.CalledProcessError: If the preprocessing step using GCC fails.
@@ -87,29 +283,36 @@ def run_compiler_stages(input_file: str, stage: str) -> None:
             f"Invalid stage '{stage}'. Please choose 'lex', 'parse', or 'codegen'."
         )
 
-    with NamedTemporaryFile(suffix=".i") as preprocessed_file:
-        try:
-            gcc_preprocess(input_file, preprocessed_file.name)
-        except subprocess.CalledProcessError as e:
-            exit(e.returncode)
-
-        # Execute sequentially the stages
-        tokens = []
-        parse_tree = None
-        for current_stage in stages:
-            if current_stage == "lex":
-                tokens = tokenize(preprocessed_file.name)
-            elif current_stage == "parse":
-                parse_tree = generate_parse_tree(tokens)
-                logger.debug("Parse tree:\n" + generate_pretty_ast_repr(parse_tree))
-            elif current_stage == "codegen":
-                assert parse_tree is not None
-                assembly_ast = generate_assembly_ast(parse_tree)
-                logger.debug("Assembly AST:\n" + generate_pretty_ast_repr(assembly_ast))
-
-            # Stop once we've reached the chosen stage
-            if current_stage == stage:
-                break
+    code = preprocess(input_file, dumps, dump_prefix, preprocessor, include_dirs)
+
+    # Execute sequentially the stages
+    tokens = []
+    parse_tree = None
+    for current_stage in stages:
+        if current_stage == "lex":
+            from compiler.lexer.lexer import tokenize_code
+
+            logger.info(f"Running lexer on the preprocessed code of '{input_file}'...")
+            tokens = tokenize_code(code)
+        elif current_stage == "parse":
+            from compiler.parser.parser import generate_parse_arena
+
+            parse_tree = generate_parse_arena(tokens).to_tree()
+            dump_file = get_dump_file(dump_prefix, dumps, "parse")
+            dump_tree(parse_tree, "parse", dump_file)
+        elif current_stage == "codegen":
+            from compiler.assembly_generation.assembly_generation import (
+                generate_assembly_ast,
+            )
+
+            assert parse_tree is not None
+            assembly_ast = generate_assembly_ast(parse_tree)
+            dump_file = get_dump_file(dump_prefix, dumps, "codegen")
+            dump_tree(assembly_ast, "codegen", dump_file)
+
+        # Stop once we've reached the chosen stage
+        if current_stage == stage:
+            break
 
 
 def gcc_assemble_and_link(input_file: str, output_file: str) -> None:
@@ -119,89 +322,256 @@ def gcc_assemble_and_link(input_file: str, output_file: str) -> None:
         input_file: Path to the the assembly file to be assembled and linked. The file should have a `.s` extension.
         output_file: Path to the executable file.
     """
+    import subprocess
+
     logger.info(f"Assembling and linking assembly file '{input_file}'...")
     subprocess.run(["gcc", "-masm=intel", input_file, "-o", output_file], check=True)
 
 
-def cfile_type(s: str) -> str:
-    """Checks if a given string is a valid C source file path.
+def gcc_assemble_and_link_tree(assembly_ast: "Tree", output_file: str) -> None:
+    """Assembles and links an assembly tree to produce an executable.
+
+    The assembly code is emitted straight into the standard input of GCC, without
+    going through a file.
 
     Args:
-        s: Path to the file as a string.
+        assembly_ast: The assembly tree to be assembled and linked.
+        output_file: Path to the executable file.
 
-    Returns:
-        The original string if it represents a valid C source file.
+    Raises:
+        subprocess.CalledProcessError: If GCC fails to assemble or link the code.
     """
-    if not s.endswith(".c"):
-        raise argparse.ArgumentTypeError(f"Not a valid C source file: {s!r}")
-    return s
+    import subprocess
 
+    from compiler.code_emission.code_emission import write_assembly_code
 
-def main():
-    # Set up argparse for argument parsing
-    parser = argparse.ArgumentParser()
+    logger.info(f"Assembling and linking assembly code into '{output_file}'...")
+    command = ["gcc", "-masm=intel", "-x", "assembler", "-", "-o", output_file]
+    with subprocess.Popen(command, stdin=subprocess.PIPE, text=True) as process:
+        assert isinstance(process.stdin, io.TextIOWrapper)
+        try:
+            # GCC closes the pipe if it fails early, in which case its exit
+            # status reports the error
+            with suppress(BrokenPipeError):
+                write_assembly_code(assembly_ast, process.stdin)
+                process.stdin.close()
+        except BaseException:
+            # Closing the pipe would have GCC assemble the truncated code
+            process.kill()
+            raise
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+
+
+def gcc_link(object_file: str, output_file: str) -> None:
+    """Links an object file to produce an executable.
 
-    # Required input file argument
-    parser.add_argument(
-        "input_file",
-        type=cfile_type,
-        help="Path to the C source file",
-    )
+    Args:
+        object_file: Path to the object file to be linked. The file should have a `.o` extension.
+        output_file: Path to the executable file.
 
-    # Create a mutually exclusive group
-    group = parser.add_mutually_exclusive_group()
+    Raises:
+        subprocess.CalledProcessError: If GCC fails to link the object file.
+    """
+    import subprocess
 
-    # Add the arguments to the group
-    group.add_argument(
-        "--lex",
-        action="store_true",
-        help="Run the lexer, but stop before parsing",
-    )
+    logger.info(f"Linking object file '{object_file}'...")
+    subprocess.run(["gcc", object_file, "-o", output_file], check=True)
 
-    group.add_argument(
-        "--parse",
-        action="store_true",
-        help="Run the lexer and parser, but stop before assembly generation",
-    )
 
-    group.add_argument(
-        "--codegen",
-        action="store_true",
-        help="Perform lexing, parsing, and assembly generation, but stop before code emission",
-    )
+def builtin_assemble_and_link_tree(
+    assembly_ast: "Tree", output_file: str, object_file: str | None = None
+) -> None:
+    """Assembles an assembly tree with the built-in assembler, and links it with GCC.
 
-    # Parse the arguments
-    args = parser.parse_args()
+    The machine code is encoded and the object file is written by this process, so
+    GCC only runs the linker, which reads the object file from disk.
 
-    INPUT_FILE = args.input_file
-    OUTPUT_FILE, _ = os.path.splitext(INPUT_FILE)
+    Args:
+        assembly_ast: The assembly tree to be assembled and linked.
+        output_file: Path to the executable file.
+        object_file: Path to the object file, which is written to a temporary
+            directory and removed if not given.
 
-    if args.lex or args.parse or args.codegen:
-        if args.lex:
-            stage = "lex"
-        elif args.parse:
-            stage = "parse"
-        elif args.codegen:
-            stage = "codegen"
-        run_compiler_stages(INPUT_FILE, stage)
-        exit(0)
+    Raises:
+        subprocess.CalledProcessError: If GCC fails to link the object file.
+        OSError: If the object file can't be written.
+    """
+    from compiler.code_emission.elf_object import write_elf_object
+    from compiler.code_emission.machine_code import encode_machine_code
+
+    if object_file is None:
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as directory:
+            object_file = os.path.join(directory, f"{os.path.basename(output_file)}.o")
+            builtin_assemble_and_link_tree(assembly_ast, output_file, object_file)
+        return
+
+    logger.info(f"Assembling assembly code into '{object_file}' (built-in)...")
+    # Encode first, so that no object file is left if the code can't be encoded
+    machine_code = encode_machine_code(assembly_ast)
+    with open(object_file, "wb") as f:
+        write_elf_object(machine_code, f)
+    gcc_link(object_file, output_file)
+
+
+def compile_file(
+    input_file: str,
+    stage: str | None = None,
+    dumps: Collection[str] = (),
+    preprocessor: str = "builtin",
+    include_dirs: Sequence[str] = (),
+    assembler: str = "builtin",
+) -> int:
+    """Compiles a C source file into an executable with the same name, without extension.
+
+    The preprocessed code and the assembly code are kept in memory or piped from
+    and to GCC, and the object file of the built-in assembler is written to a
+    temporary directory, unless they are dumped to files, as with `--save-temps`.
+    Errors are logged rather than raised, so that a file failing to compile
+    doesn't stop the other files of a batch.
 
-    # Execute compiler driver's commands
-    with (
-        NamedTemporaryFile(suffix=".i") as preprocessed_file,
-        NamedTemporaryFile(suffix=".s") as assembly_file,
-    ):
-        try:
-            gcc_preprocess(INPUT_FILE, preprocessed_file.name)
+    Args:
+        input_file: The path to the input C source file.
+        stage: Last stage to execute, if the file isn't compiled into an executable.
+            Can be "lex", "parse" or "codegen".
+        dumps: Stages whose output is dumped to a file, among `DUMP_STAGES`.
+        preprocessor: The preprocessor to use, among `PREPROCESSORS`.
+        include_dirs: Directories searched for included files.
+        assembler: The assembler to use, among `ASSEMBLERS`.
+
+    Returns:
+        The exit status of the compilation: 0 on success, the exit status of GCC if
+        it failed, or 1 if the compiler rejected the file.
+    """
+    import subprocess
+
+    output_file, _ = os.path.splitext(input_file)
+    try:
+        if stage is not None:
+            run_compiler_stages(
+                input_file, stage, dumps, output_file, preprocessor, include_dirs
+            )
+            return 0
+
+        code = preprocess(input_file, dumps, output_file, preprocessor, include_dirs)
+        assembly_ast = run_compiler(code, dumps, output_file)
+
+        assembly_file = get_dump_file(output_file, dumps, "asm")
+        if assembly_file is not None:
+            from compiler.code_emission.code_emission import write_assembly_code
+
+            logger.info(f"Dumping the assembly code to '{assembly_file}'...")
+            with open(assembly_file, "w") as f:
+                write_assembly_code(assembly_ast, f)
+
+        if assembler == "builtin":
+            object_file = get_dump_file(output_file, dumps, "obj")
+            builtin_assemble_and_link_tree(assembly_ast, output_file, object_file)
+        elif assembly_file is None:
+            gcc_assemble_and_link_tree(assembly_ast, output_file)
+        else:
+            gcc_assemble_and_link(assembly_file, output_file)
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Failed to compile '{input_file}': {e}")
+        return e.returncode
+    except (ValueError, SyntaxError, RuntimeError, TypeError, OSError) as e:
+        logger.error(f"Failed to compile '{input_file}': {e}")
+        return 1
+    return 0
+
+
+def compile_files(
+    input_files: Sequence[str],
+    stage: str | None = None,
+    dumps: Collection[str] = (),
+    jobs: int = 1,
+    preprocessor: str = "builtin",
+    include_dirs: Sequence[str] = (),
+    assembler: str = "builtin",
+) -> int:
+    """Compiles C source files with `compile_file`, in parallel if `jobs` > 1.
+
+    The files are compiled by a pool of `jobs` processes, each compiling one file
+    at a time, so the startup of the interpreter is paid once per process rather
+    than once per file. A report of the files that failed to compile is logged.
+
+    Args:
+        input_files: The paths to the input C source files.
+        stage: Last stage to execute, if the files aren't compiled into executables.
+        dumps: Stages whose output is dumped to a file, among `DUMP_STAGES`.
+        jobs: The number of files compiled in parallel.
+        preprocessor: The preprocessor to use, among `PREPROCESSORS`.
+        include_dirs: Directories searched for included files.
+        assembler: The assembler to use, among `ASSEMBLERS`.
+
+    Returns:
+        0 if every file compiled, or else the exit status of the first file that
+        failed to compile.
+    """
+    jobs = min(jobs, len(input_files))
+    if jobs <= 1:
+        statuses = [
+            compile_file(file, stage, dumps, preprocessor, include_dirs, assembler)
+            for file in input_files
+        ]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        from itertools import repeat
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            statuses = list(
+                executor.map(
+                    compile_file,
+                    input_files,
+                    repeat(stage),
+                    repeat(dumps),
+                    repeat(preprocessor),
+                    repeat(include_dirs),
+                    repeat(assembler),
+                )
+            )
 
-            run_compiler(preprocessed_file.name, assembly_file.name, use_gcc=False)
+    return report_failures(input_files, statuses)
 
-            gcc_assemble_and_link(assembly_file.name, OUTPUT_FILE)
-        except subprocess.CalledProcessError as e:
-            return e.returncode
 
-    exit(0)
+def report_failures(input_files: Sequence[str], statuses: Sequence[int]) -> int:
+    """Logs the files of a batch that failed to compile.
+
+    Args:
+        input_files: The paths to the C source files of the batch.
+        statuses: The exit status of the compilation of each file.
+
+    Returns:
+        0 if every file compiled, or else the exit status of the first file that
+        failed to compile.
+    """
+    failed = [
+        file for file, status in zip(input_files, statuses, strict=True) if status != 0
+    ]
+    if failed and len(input_files) > 1:
+        logger.error(
+            f"{len(failed)} of {len(input_files)} files failed to compile: "
+            + ", ".join(failed)
+        )
+    return next((status for status in statuses if status != 0), 0)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_argument_parser().parse_args(argv)
+
+    # Execute compiler driver's commands
+    return compile_files(
+        args.input_files,
+        get_stage(args),
+        get_dumps(args),
+        args.jobs,
+        args.preprocessor,
+        args.include_dirs,
+        args.assembler,
+    )
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
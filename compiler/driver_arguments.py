@@ -0,0 +1,200 @@
+import argparse
+import os
+
+# Stages whose output can be dumped to a file with `--dump`
+DUMP_STAGES = ("preprocess", "parse", "codegen", "asm", "obj")
+
+# Preprocessors the driver can use
+PREPROCESSORS = ("builtin", "gcc")
+
+# Assemblers the driver can use
+ASSEMBLERS = ("builtin", "gcc")
+
+# Stages whose output is kept with `--save-temps`, which are the intermediate files
+# of a build
+TEMP_STAGES = frozenset({"preprocess", "asm", "obj"})
+
+
+def cfile_type(s: str) -> str:
+    """Checks if a given string is a valid C source file path.
+
+    Args:
+        s: Path to the file as a string.
+
+    Returns:
+        The original string if it represents a valid C source file.
+    """
+    if not s.endswith(".c"):
+        raise argparse.ArgumentTypeError(f"Not a valid C source file: {s!r}")
+    return s
+
+
+def dump_stages_type(s: str) -> frozenset[str]:
+    """Checks if a given string is a comma-separated list of dumpable stages.
+
+    Args:
+        s: Comma-separated stage names, such as "parse,asm".
+
+    Returns:
+        The set of stage names.
+    """
+    stages = frozenset(stage.strip() for stage in s.split(",") if stage.strip())
+    invalid = stages.difference(DUMP_STAGES)
+    if invalid:
+        raise argparse.ArgumentTypeError(
+            f"Invalid stages {', '.join(sorted(invalid))}: "
+            f"choose among {', '.join(DUMP_STAGES)}"
+        )
+    return stages
+
+
+def jobs_type(s: str) -> int:
+    """Checks if a given string is a valid number of parallel jobs.
+
+    Args:
+        s: The number of jobs as a string. 0 stands for the number of CPUs.
+
+    Returns:
+        The number of jobs.
+    """
+    try:
+        jobs = int(s)
+    except ValueError:
+        jobs = -1
+    if jobs < 0:
+        raise argparse.ArgumentTypeError(f"Not a valid number of jobs: {s!r}")
+    return jobs or os.cpu_count() or 1
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    """Returns the parser of the command line arguments of the compiler driver.
+
+    The arguments only depend on the standard library, so that the compile client
+    can parse them without importing the compiler.
+    """
+    # Set up argparse for argument parsing. Arguments can be read from response
+    # files, one per line, given as "@path"
+    parser = argparse.ArgumentParser(fromfile_prefix_chars="@")
+
+    # Required input files argument
+    parser.add_argument(
+        "input_files",
+        type=cfile_type,
+        nargs="+",
+        metavar="input_file",
+        help="Path to a C source file, or @FILE to read arguments from FILE",
+    )
+
+    # Create a mutually exclusive group
+    group = parser.add_mutually_exclusive_group()
+
+    # Add the arguments to the group
+    group.add_argument(
+        "--lex",
+        action="store_true",
+        help="Run the lexer, but stop before parsing",
+    )
+
+    group.add_argument(
+        "--parse",
+        action="store_true",
+        help="Run the lexer and parser, but stop before assembly generation",
+    )
+
+    group.add_argument(
+        "--codegen",
+        action="store_true",
+        help="Perform lexing, parsing, and assembly generation, but stop before code emission",
+    )
+
+    parser.add_argument(
+        "--dump",
+        type=dump_stages_type,
+        default=frozenset(),
+        metavar="STAGES",
+        help=(
+            "Write the output of comma-separated stages next to the C source file: "
+            "'preprocess' to a .i file, 'parse' and 'codegen' trees to .parse and "
+            ".codegen files, 'asm' to a .s file, 'obj' to a .o file with the "
+            "built-in assembler"
+        ),
+    )
+
+    parser.add_argument(
+        "--save-temps",
+        action="store_true",
+        help=(
+            "Keep the preprocessed code, the assembly code and the object file next "
+            "to the C source file, which are otherwise kept in memory, piped to and "
+            "from GCC or written to a temporary directory; same as --dump="
+            "preprocess,asm,obj"
+        ),
+    )
+
+    parser.add_argument(
+        "-I",
+        dest="include_dirs",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help="Search DIR for included files",
+    )
+
+    parser.add_argument(
+        "--preprocessor",
+        choices=PREPROCESSORS,
+        default="builtin",
+        help=(
+            "Preprocessor to use: the built-in one falls back to GCC for the "
+            "constructs it doesn't support, such as system headers "
+            "(default: %(default)s)"
+        ),
+    )
+
+    parser.add_argument(
+        "--assembler",
+        choices=ASSEMBLERS,
+        default="builtin",
+        help=(
+            "Assembler to use: the built-in one encodes the machine code and writes "
+            "the object file in process, so GCC only links it (default: %(default)s)"
+        ),
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=jobs_type,
+        default=1,
+        metavar="N",
+        help="Compile N files in parallel, or one per CPU if N is 0",
+    )
+
+    return parser
+
+
+def get_stage(args: argparse.Namespace) -> str | None:
+    """Returns the last stage to execute, or None to build executables.
+
+    Args:
+        args: The arguments parsed by the parser of `build_argument_parser`.
+    """
+    stage = None
+    if args.lex:
+        stage = "lex"
+    elif args.parse:
+        stage = "parse"
+    elif args.codegen:
+        stage = "codegen"
+    return stage
+
+
+def get_dumps(args: argparse.Namespace) -> frozenset[str]:
+    """Returns the stages whose output is dumped to a file.
+
+    Args:
+        args: The arguments parsed by the parser of `build_argument_parser`.
+    """
+    if args.save_temps:
+        return args.dump | TEMP_STAGES
+    return args.dump
@@ -0,0 +1,539 @@
+#!/usr/bin/env -S python3
+"""A small lexer generator.
+
+The token specification (`Token.token_patterns` plus whitespace) is compiled
+into a minimized DFA: each pattern is parsed into a Thompson NFA, the NFAs are
+joined and turned into a DFA by subset construction, and the DFA is minimized by
+partition refinement. The resulting transition table is cached on disk, keyed by
+a hash of the specification, so that it's only generated when the specification
+changes. Running this module generates the table ahead of time.
+
+Patterns are written in a subset of the regular expression syntax: literal
+characters, escapes, the `\\w`, `\\d` and `\\s` classes, bracketed classes (also
+negated), grouping, `|`, `*`, `+` and `?`. A trailing `\\b` requires the token to
+end at a word boundary.
+"""
+
+import hashlib
+import json
+import os
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from functools import cache
+
+from loguru import logger
+
+from compiler.lexer.lexer import Token
+
+# Bump when the generated tables change for the same specification
+GENERATOR_VERSION = 1
+
+# Characters are mapped to symbols: ASCII characters are symbols on their own,
+# while other characters fall into one of three symbols, based on how `\w` and
+# `\s` would match them.
+NON_ASCII_WORD = 128
+NON_ASCII_SPACE = 129
+NON_ASCII_OTHER = 130
+NUM_SYMBOLS = 131
+
+ALL_SYMBOLS = frozenset(range(NUM_SYMBOLS))
+WORD_SYMBOLS = frozenset(
+    [c for c in range(128) if chr(c).isalnum() or chr(c) == "_"] + [NON_ASCII_WORD]
+)
+SPACE_SYMBOLS = frozenset(
+    [c for c in range(128) if chr(c).isspace()] + [NON_ASCII_SPACE]
+)
+DIGIT_SYMBOLS = frozenset(range(ord("0"), ord("9") + 1))
+
+_ESCAPED_CLASSES = {
+    "w": WORD_SYMBOLS,
+    "W": ALL_SYMBOLS - WORD_SYMBOLS,
+    "s": SPACE_SYMBOLS,
+    "S": ALL_SYMBOLS - SPACE_SYMBOLS,
+    "d": DIGIT_SYMBOLS,
+    "D": ALL_SYMBOLS - DIGIT_SYMBOLS,
+}
+
+_ESCAPED_CHARS = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v"}
+
+
+def classify_char(char: str) -> int:
+    """Returns the symbol of a character."""
+    code = ord(char)
+    if code < 128:
+        return code
+    elif char.isalnum():
+        return NON_ASCII_WORD
+    elif char.isspace():
+        return NON_ASCII_SPACE
+    return NON_ASCII_OTHER
+
+
+class _NFA:
+    """A Thompson NFA, built one fragment at a time."""
+
+    def __init__(self) -> None:
+        # For each state, the list of epsilon moves and the list of moves on a
+        # set of symbols
+        self.epsilon: list[list[int]] = []
+        self.moves: list[list[tuple[frozenset[int], int]]] = []
+
+    def new_state(self) -> int:
+        self.epsilon.append([])
+        self.moves.append([])
+        return len(self.epsilon) - 1
+
+
+class _PatternParser:
+    """Parses a pattern into a fragment `(start, end)` of an NFA.
+
+    Grammar:
+        alternation := concatenation ("|" concatenation)*
+        concatenation := repetition*
+        repetition := atom ("*" | "+" | "?")*
+        atom := "(" alternation ")" | "[" class "]" | "\\" escape | character
+    """
+
+    def __init__(self, nfa: _NFA, pattern: str) -> None:
+        self.nfa = nfa
+        self.pattern = pattern
+        self.pos = 0
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"{message} at offset {self.pos} of pattern {self.pattern!r}")
+
+    def peek(self) -> str | None:
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else None
+
+    def next(self) -> str:
+        if self.pos >= len(self.pattern):
+            raise self.error("Unexpected end")
+        char = self.pattern[self.pos]
+        self.pos += 1
+        return char
+
+    def parse(self) -> tuple[int, int]:
+        fragment = self.parse_alternation()
+        if self.pos != len(self.pattern):
+            raise self.error("Unexpected character")
+        return fragment
+
+    def parse_alternation(self) -> tuple[int, int]:
+        fragments = [self.parse_concatenation()]
+        while self.peek() == "|":
+            self.pos += 1
+            fragments.append(self.parse_concatenation())
+        if len(fragments) == 1:
+            return fragments[0]
+        start, end = self.nfa.new_state(), self.nfa.new_state()
+        for frag_start, frag_end in fragments:
+            self.nfa.epsilon[start].append(frag_start)
+            self.nfa.epsilon[frag_end].append(end)
+        return start, end
+
+    def parse_concatenation(self) -> tuple[int, int]:
+        start = end = self.nfa.new_state()
+        while self.peek() not in (None, "|", ")"):
+            frag_start, frag_end = self.parse_repetition()
+            self.nfa.epsilon[end].append(frag_start)
+            end = frag_end
+        return start, end
+
+    def parse_repetition(self) -> tuple[int, int]:
+        frag_start, frag_end = self.parse_atom()
+        while self.peek() in ("*", "+", "?"):
+            operator = self.next()
+            start, end = self.nfa.new_state(), self.nfa.new_state()
+            self.nfa.epsilon[start].append(frag_start)
+            self.nfa.epsilon[frag_end].append(end)
+            if operator in ("*", "?"):
+                self.nfa.epsilon[start].append(end)
+            if operator in ("*", "+"):
+                self.nfa.epsilon[frag_end].append(frag_start)
+            frag_start, frag_end = start, end
+        return frag_start, frag_end
+
+    def parse_atom(self) -> tuple[int, int]:
+        char = self.next()
+        if char == "(":
+            fragment = self.parse_alternation()
+            if self.next() != ")":
+                raise self.error("Missing ')'")
+            return fragment
+        elif char == "[":
+            symbols = self.parse_class()
+        elif char == "\\":
+            symbols = self.parse_escape(in_class=False)
+        elif char in "*+?|)":
+            raise self.error(f"Unexpected {char!r}")
+        elif char == ".":
+            symbols = ALL_SYMBOLS - {ord("\n")}
+        else:
+            symbols = self.literal(char)
+        start, end = self.nfa.new_state(), self.nfa.new_state()
+        self.nfa.moves[start].append((symbols, end))
+        return start, end
+
+    def parse_class(self) -> frozenset[int]:
+        negated = self.peek() == "^"
+        if negated:
+            self.pos += 1
+        symbols: set[int] = set()
+        first = True
+        while True:
+            char = self.next()
+            if char == "]" and not first:
+                break
+            first = False
+            if char == "\\":
+                symbols |= self.parse_escape(in_class=True)
+            # A '-' right before the closing ']' is a literal, not a range
+            elif self.peek() == "-" and self.pattern[self.pos + 1 :][:1] not in "]":
+                self.pos += 1
+                last = self.next()
+                if ord(last) < ord(char):
+                    raise self.error("Invalid range")
+                for code in range(ord(char), ord(last) + 1):
+                    symbols |= self.literal(chr(code))
+            else:
+                symbols |= self.literal(char)
+        return ALL_SYMBOLS - symbols if negated else frozenset(symbols)
+
+    def parse_escape(self, in_class: bool) -> frozenset[int]:
+        char = self.next()
+        if char in _ESCAPED_CLASSES:
+            return _ESCAPED_CLASSES[char]
+        elif char == "b" and not in_class:
+            raise self.error("'\\b' is only supported at the end of a pattern")
+        elif char.isalnum():
+            raise self.error(f"Unsupported escape '\\{char}'")
+        return self.literal(_ESCAPED_CHARS.get(char, char))
+
+    def literal(self, char: str) -> frozenset[int]:
+        if ord(char) >= 128:
+            raise self.error("Only ASCII characters can be matched literally")
+        return frozenset([ord(char)])
+
+
+@dataclass(frozen=True)
+class LexerTables:
+    """The transition table of a lexer DFA.
+
+    Attributes:
+        rules: Name of the token type matched by each rule, or `Whitespace`.
+        word_boundary: For each rule, if the token must end at a word boundary.
+        symbol_classes: For each symbol, the column of the transition table.
+        num_classes: Number of columns of the transition table.
+        transitions: The transition table, flattened row by row. The next state
+            from `state` on column `c` is `transitions[state * num_classes + c]`,
+            where -1 is the dead state. The start state is 0.
+        accepts: For each state, the index of the rule it accepts, or -1.
+    """
+
+    rules: list[str]
+    word_boundary: list[bool]
+    symbol_classes: list[int]
+    num_classes: int
+    transitions: list[int]
+    accepts: list[int]
+
+    @property
+    def num_states(self) -> int:
+        return len(self.accepts)
+
+
+def token_specification() -> list[tuple[str, str]]:
+    """Returns the rules of the lexer as `(name, pattern)` pairs, by priority."""
+    return [("Whitespace", Token.whitespace_pattern)] + [
+        (token_type.name, pattern)
+        for token_type, pattern in Token.token_patterns.items()
+    ]
+
+
+def specification_hash(specification: list[tuple[str, str]]) -> str:
+    """Hashes a specification, together with the version of the generator."""
+    data = json.dumps([GENERATOR_VERSION, specification])
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def build_tables(specification: list[tuple[str, str]]) -> LexerTables:
+    """Compiles a token specification into the tables of a minimized DFA.
+
+    When several rules match the longest token, the first one wins.
+
+    Args:
+        specification: The rules of the lexer as `(name, pattern)` pairs.
+
+    Raises:
+        ValueError: If a pattern is not supported, or if it matches the empty string.
+
+    Returns:
+        The tables of the DFA.
+    """
+    nfa = _NFA()
+    nfa_start = nfa.new_state()
+    nfa_accepts: dict[int, int] = {}
+    word_boundary = []
+    for rule, (_, pattern) in enumerate(specification):
+        boundary = pattern.endswith("\\b") and not pattern.endswith("\\\\b")
+        if boundary:
+            pattern = pattern[:-2]
+        start, end = _PatternParser(nfa, pattern).parse()
+        nfa.epsilon[nfa_start].append(start)
+        nfa_accepts[end] = rule
+        word_boundary.append(boundary)
+
+    symbol_classes, num_classes = _symbol_classes(nfa)
+    class_moves = [
+        [
+            (frozenset(symbol_classes[s] for s in symbols), target)
+            for symbols, target in moves
+        ]
+        for moves in nfa.moves
+    ]
+
+    def closure(states: set[int]) -> frozenset[int]:
+        stack = list(states)
+        result = set(states)
+        while stack:
+            for target in nfa.epsilon[stack.pop()]:
+                if target not in result:
+                    result.add(target)
+                    stack.append(target)
+        return frozenset(result)
+
+    # Subset construction
+    start_set = closure({nfa_start})
+    dfa_states = {start_set: 0}
+    queue = deque([start_set])
+    dfa_transitions: list[list[int]] = []
+    dfa_accepts: list[int] = []
+    while queue:
+        current = queue.popleft()
+        rules = [nfa_accepts[s] for s in current if s in nfa_accepts]
+        dfa_accepts.append(min(rules) if rules else -1)
+        row = []
+        for column in range(num_classes):
+            targets = {
+                target
+                for s in current
+                for classes, target in class_moves[s]
+                if column in classes
+            }
+            if not targets:
+                row.append(-1)
+                continue
+            next_set = closure(targets)
+            if next_set not in dfa_states:
+                dfa_states[next_set] = len(dfa_states)
+                queue.append(next_set)
+            row.append(dfa_states[next_set])
+        dfa_transitions.append(row)
+
+    if dfa_accepts[0] != -1:
+        name = specification[dfa_accepts[0]][0]
+        raise ValueError(f"The pattern of rule '{name}' matches the empty string")
+
+    transitions, accepts = _minimize(dfa_transitions, dfa_accepts)
+    return LexerTables(
+        rules=[name for name, _ in specification],
+        word_boundary=word_boundary,
+        symbol_classes=symbol_classes,
+        num_classes=num_classes,
+        transitions=[target for row in transitions for target in row],
+        accepts=accepts,
+    )
+
+
+def _symbol_classes(nfa: _NFA) -> tuple[list[int], int]:
+    """Groups the symbols that no pattern can tell apart into the same class."""
+    symbol_sets = sorted(
+        {symbols for moves in nfa.moves for symbols, _ in moves}, key=sorted
+    )
+    signatures: dict[tuple[bool, ...], int] = {}
+    symbol_classes = []
+    for symbol in range(NUM_SYMBOLS):
+        signature = tuple(symbol in symbols for symbols in symbol_sets)
+        symbol_classes.append(signatures.setdefault(signature, len(signatures)))
+    return symbol_classes, len(signatures)
+
+
+def _minimize(
+    transitions: list[list[int]], accepts: list[int]
+) -> tuple[list[list[int]], list[int]]:
+    """Minimizes a DFA by partition refinement (Moore's algorithm).
+
+    States are first split by the rule they accept, then repeatedly split by the
+    blocks their transitions lead to, until the partition is stable. The block of
+    the start state is renumbered 0.
+    """
+    block_of = list(accepts)
+    num_blocks = -1
+    while True:
+        signatures: dict[tuple[int, ...], int] = {}
+        new_block_of = []
+        for state, row in enumerate(transitions):
+            signature = (block_of[state],) + tuple(
+                block_of[target] if target >= 0 else -1 for target in row
+            )
+            new_block_of.append(signatures.setdefault(signature, len(signatures)))
+        block_of = new_block_of
+        if len(signatures) == num_blocks:
+            break
+        num_blocks = len(signatures)
+
+    # Renumber blocks in order of first appearance, so that the start state is 0
+    order: dict[int, int] = {}
+    for block in block_of:
+        order.setdefault(block, len(order))
+    min_transitions: list[list[int]] = [[] for _ in range(num_blocks)]
+    min_accepts = [-1] * num_blocks
+    for state, row in enumerate(transitions):
+        block = order[block_of[state]]
+        min_accepts[block] = accepts[state]
+        min_transitions[block] = [
+            order[block_of[target]] if target >= 0 else -1 for target in row
+        ]
+    return min_transitions, min_accepts
+
+
+def default_cache_dir() -> str:
+    """Returns the directory where lexer tables are cached.
+
+    It can be set with the `C_COMPILER_CACHE_DIR` environment variable, and
+    defaults to `c-compiler` in the user cache directory.
+    """
+    cache_dir = os.environ.get("C_COMPILER_CACHE_DIR")
+    if cache_dir:
+        return cache_dir
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "c-compiler")
+
+
+def load_tables(
+    specification: list[tuple[str, str]], cache_dir: str | None = None
+) -> LexerTables:
+    """Loads the tables of a specification from the cache, building them if needed.
+
+    Failing to read or write the cache is not an error: the tables are then
+    built in memory.
+
+    Args:
+        specification: The rules of the lexer as `(name, pattern)` pairs.
+        cache_dir: Directory of the cache. Defaults to `default_cache_dir()`.
+
+    Returns:
+        The tables of the DFA.
+    """
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    digest = specification_hash(specification)
+    path = os.path.join(cache_dir, f"lexer-dfa-{digest[:16]}.json")
+
+    try:
+        with open(path) as file:
+            data = json.load(file)
+        if data.pop("hash") == digest:
+            return LexerTables(**data)
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    logger.info(f"Generating the lexer tables into '{path}'...")
+    tables = build_tables(specification)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump({"hash": digest, **asdict(tables)}, file)
+        # Replace atomically, in case of concurrent compilations
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not cache the lexer tables: {e}")
+    return tables
+
+
+@cache
+def get_tables() -> LexerTables:
+    """Returns the tables of the lexer specification, loaded once per process."""
+    return load_tables(token_specification())
+
+
+def scan_tokens_dfa(
+    code: str, pos: int = 0, endpos: int | None = None
+) -> Iterator[tuple[Token.TokenType, int, int]]:
+    """Scans `code` driven by the transition table of the lexer DFA.
+
+    Each token is the longest prefix accepted by the DFA, so scanning is linear
+    in the size of the code, and no regular expression is compiled.
+
+    Args:
+        code: The source code to scan.
+        pos: Offset at which scanning starts.
+        endpos: Offset at which scanning stops. Defaults to the end of `code`.
+
+    Raises:
+        ValueError: If an unrecognized sequence is encountered in the source code.
+
+    Yields:
+        Tuples `(token_type, start, end)`, where `code[start:end]` is the value
+        of the token.
+    """
+    if endpos is None:
+        endpos = len(code)
+    tables = get_tables()
+    transitions = tables.transitions
+    accepts = tables.accepts
+    num_classes = tables.num_classes
+    ascii_classes = tables.symbol_classes[:128]
+    other_classes = tables.symbol_classes
+    token_types = [
+        None if name == "Whitespace" else Token.TokenType[name] for name in tables.rules
+    ]
+    word_boundary = tables.word_boundary
+    identifier = Token.TokenType.Identifier
+    keywords = Token.token_keywords
+
+    while pos < endpos:
+        state = 0
+        rule = -1
+        end = i = pos
+        while i < endpos:
+            char = code[i]
+            code_point = ord(char)
+            column = (
+                ascii_classes[code_point]
+                if code_point < 128
+                else other_classes[classify_char(char)]
+            )
+            state = transitions[state * num_classes + column]
+            if state < 0:
+                break
+            i += 1
+            if accepts[state] >= 0:
+                rule = accepts[state]
+                end = i
+
+        if rule < 0 or (
+            word_boundary[rule]
+            and (classify_char(code[end - 1]) in WORD_SYMBOLS)
+            == (end < endpos and classify_char(code[end]) in WORD_SYMBOLS)
+        ):
+            # Report the first 20 chars of the unmatched segment
+            error_segment = code[pos : pos + 20]
+            raise ValueError(f"Unrecognized sequence: '{error_segment}'")
+
+        token_type = token_types[rule]
+        if token_type is not None:
+            # Check if the identifier is a keyword
+            if token_type is identifier:
+                token_type = keywords.get(code[pos:end], identifier)
+            yield token_type, pos, end
+        pos = end
+
+
+if __name__ == "__main__":
+    tables = load_tables(token_specification())
+    print(f"Lexer DFA: {tables.num_states} states, {tables.num_classes} symbol classes")
@@ -0,0 +1,123 @@
+from collections.abc import Callable, Iterator
+
+from compiler.lexer.lexer import Token
+
+# A scanner is called with the code, the offset of the first character of the
+# token and the offset at which scanning stops. It returns the type of the
+# scanned token, or None for whitespace, and the offset past its end.
+Scanner = Callable[[str, int, int], tuple[Token.TokenType | None, int]]
+
+_DIGITS = frozenset("0123456789")
+
+_PUNCTUATORS = {
+    "(": Token.TokenType.OpenParenthesis,
+    ")": Token.TokenType.CloseParenthesis,
+    "{": Token.TokenType.OpenBrace,
+    "}": Token.TokenType.CloseBrace,
+    ";": Token.TokenType.Semicolon,
+    "~": Token.TokenType.Complement,
+}
+
+
+def _is_word_char(char: str) -> bool:
+    """Tells if `char` is matched by `\\w` in a regular expression."""
+    return char == "_" or char.isalnum()
+
+
+def _scan_whitespace(code: str, pos: int, endpos: int) -> tuple[None, int]:
+    pos += 1
+    while pos < endpos and code[pos].isspace():
+        pos += 1
+    return None, pos
+
+
+def _scan_punctuator(code: str, pos: int, endpos: int) -> tuple[Token.TokenType, int]:
+    return _PUNCTUATORS[code[pos]], pos + 1
+
+
+def _scan_minus(code: str, pos: int, endpos: int) -> tuple[Token.TokenType, int]:
+    # '--' should match MinusMinus first, not Minus
+    if pos + 1 < endpos and code[pos + 1] == "-":
+        return Token.TokenType.MinusMinus, pos + 2
+    return Token.TokenType.Minus, pos + 1
+
+
+def _scan_identifier(code: str, pos: int, endpos: int) -> tuple[Token.TokenType, int]:
+    start = pos
+    pos += 1
+    while pos < endpos and _is_word_char(code[pos]):
+        pos += 1
+    return Token.token_keywords.get(code[start:pos], Token.TokenType.Identifier), pos
+
+
+def _scan_constant(code: str, pos: int, endpos: int) -> tuple[Token.TokenType, int]:
+    start = pos
+    pos += 1
+    while pos < endpos and code[pos] in _DIGITS:
+        pos += 1
+    if pos < endpos and _is_word_char(code[pos]):
+        # Constants must end at a word boundary, e.g. '1foo' is not a valid token
+        raise _unrecognized_sequence(code, start)
+    return Token.TokenType.Constant, pos
+
+
+def _unrecognized_sequence(code: str, pos: int) -> ValueError:
+    # Report the first 20 chars of the unmatched segment
+    error_segment = code[pos : pos + 20]
+    return ValueError(f"Unrecognized sequence: '{error_segment}'")
+
+
+def _build_dispatch_table() -> dict[str, Scanner]:
+    """Maps each character that can start a token to its scanner."""
+    table: dict[str, Scanner] = {}
+    for char in " \t\n\r\f\v":
+        table[char] = _scan_whitespace
+    for char in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_":
+        table[char] = _scan_identifier
+    for char in _DIGITS:
+        table[char] = _scan_constant
+    for char in _PUNCTUATORS:
+        table[char] = _scan_punctuator
+    table["-"] = _scan_minus
+    return table
+
+
+_DISPATCH_TABLE = _build_dispatch_table()
+
+
+def scan_tokens_dispatch(
+    code: str, pos: int = 0, endpos: int | None = None
+) -> Iterator[tuple[Token.TokenType, int, int]]:
+    """Scans `code` by jumping on the first character of each token to its scanner.
+
+    This engine produces the same tokens, and raises the same errors, as
+    `scan_tokens` without running any regular expression.
+
+    Args:
+        code: The source code to scan.
+        pos: Offset at which scanning starts.
+        endpos: Offset at which scanning stops. Defaults to the end of `code`.
+
+    Raises:
+        ValueError: If an unrecognized sequence is encountered in the source code.
+
+    Yields:
+        Tuples `(token_type, start, end)`, where `code[start:end]` is the value
+        of the token.
+    """
+    if endpos is None:
+        endpos = len(code)
+    table = _DISPATCH_TABLE
+
+    while pos < endpos:
+        scanner = table.get(code[pos])
+        if scanner is None:
+            # Whitespace outside of ASCII is rare enough to be checked last
+            if not code[pos].isspace():
+                raise _unrecognized_sequence(code, pos)
+            scanner = _scan_whitespace
+
+        token_type, end = scanner(code, pos, endpos)
+        if token_type is not None:
+            yield token_type, pos, end
+        pos = end
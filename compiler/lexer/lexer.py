@@ -1,9 +1,15 @@
+import codecs
+import mmap
 import re
+from collections.abc import Callable, Iterable, Iterator
 from enum import Enum
+from functools import cache
 from typing import Any
 
 from loguru import logger
 
+from compiler.lexer.symbol_table import SymbolTable
+
 
 class Token:
     """
@@ -15,6 +21,8 @@ class Token:
     keywords (e.g., 'int', 'void', 'return').
     """
 
+    __slots__ = ("_type", "_value", "_symbol")
+
     class TokenType(Enum):
         Identifier = 0
         Constant = 1
@@ -36,28 +44,37 @@ class Token:
     # Place all regexps in order so that we match for the longest possible token
     # for example:
     # '--' should match MinusMinus first, not Minus
+    # Patterns are kept as strings: each lexer engine compiles them on first use.
     token_patterns = {
-        TokenType.Identifier: re.compile(r"[a-zA-Z_]\w*\b"),
-        TokenType.Constant: re.compile(r"[0-9]+\b"),
-        TokenType.OpenParenthesis: re.compile(r"\("),
-        TokenType.CloseParenthesis: re.compile(r"\)"),
-        TokenType.OpenBrace: re.compile(r"{"),
-        TokenType.CloseBrace: re.compile(r"}"),
-        TokenType.Semicolon: re.compile(r";"),
-        TokenType.MinusMinus: re.compile(r"--"),
-        TokenType.Minus: re.compile(r"-"),
-        TokenType.Complement: re.compile(r"~"),
+        TokenType.Identifier: r"[a-zA-Z_]\w*\b",
+        TokenType.Constant: r"[0-9]+\b",
+        TokenType.OpenParenthesis: r"\(",
+        TokenType.CloseParenthesis: r"\)",
+        TokenType.OpenBrace: r"{",
+        TokenType.CloseBrace: r"}",
+        TokenType.Semicolon: r";",
+        TokenType.MinusMinus: r"--",
+        TokenType.Minus: r"-",
+        TokenType.Complement: r"~",
     }
 
+    # Whitespace separates tokens, but doesn't produce any
+    whitespace_pattern = r"\s+"
+
+    # Keywords are matched as identifiers first, then classified with a single
+    # lookup of their spelling
     token_keywords = {
-        TokenType.IntKeyword: re.compile(r"\bint\b"),
-        TokenType.VoidKeyword: re.compile(r"\bvoid\b"),
-        TokenType.ReturnKeyword: re.compile(r"\breturn\b"),
+        "int": TokenType.IntKeyword,
+        "void": TokenType.VoidKeyword,
+        "return": TokenType.ReturnKeyword,
     }
 
-    def __init__(self, token_type: TokenType, value: Any = None) -> None:
+    def __init__(
+        self, token_type: TokenType, value: Any = None, symbol: int | None = None
+    ) -> None:
         self._type = token_type
         self._value = value
+        self._symbol = symbol
 
     @property
     def value(self):
@@ -67,6 +84,11 @@ class Token:
     def type(self):
         return self._type
 
+    @property
+    def symbol(self) -> int | None:
+        """Id of the spelling of an identifier in the symbol table, if interned."""
+        return self._symbol
+
     def __repr__(self) -> str:
         return f"<{self._type.name}, '{self._value}'>"
 
@@ -76,7 +98,179 @@ class Token:
         return self._type == other._type and self._value == other.value
 
 
-def tokenize(c_source_file: str) -> list[Token]:
+@cache
+def get_master_pattern() -> re.Pattern:
+    """Returns all the token patterns joined into a single regular expression.
+
+    The alternation follows the order of `Token.token_patterns`, so that the
+    longest-match ordering is preserved. Each alternative is a named group called
+    after its token type, so that `match.lastgroup` tells which token matched.
+    Whitespace is matched by its own group and skipped by the scanner.
+    """
+    return re.compile(
+        f"(?P<Whitespace>{Token.whitespace_pattern})|"
+        + "|".join(
+            f"(?P<{token_type.name}>{pattern})"
+            for token_type, pattern in Token.token_patterns.items()
+        )
+    )
+
+
+def scan_tokens(
+    code: str, pos: int = 0, endpos: int | None = None
+) -> Iterator[tuple[Token.TokenType, int, int]]:
+    """Scans `code` with a single cursor and yields the position of each token.
+
+    The source is never sliced: every match is attempted at the current offset
+    of the cursor with the master pattern (see `get_master_pattern`), so scanning
+    is linear in the size of the code.
+
+    Args:
+        code: The source code to scan.
+        pos: Offset at which scanning starts.
+        endpos: Offset at which scanning stops. Defaults to the end of `code`.
+
+    Raises:
+        ValueError: If an unrecognized sequence is encountered in the source code.
+
+    Yields:
+        Tuples `(token_type, start, end)`, where `code[start:end]` is the value
+        of the token.
+    """
+    if endpos is None:
+        endpos = len(code)
+    match_at = get_master_pattern().match
+    group_types = _GROUP_TOKEN_TYPES
+    identifier = Token.TokenType.Identifier
+    keywords = Token.token_keywords
+
+    while pos < endpos:
+        match = match_at(code, pos, endpos)
+        if match is None:
+            # Report the first 20 chars of the unmatched segment
+            error_segment = code[pos : pos + 20]
+            raise ValueError(f"Unrecognized sequence: '{error_segment}'")
+
+        end = match.end()
+        token_type = group_types[match.lastgroup]
+        if token_type is not None:
+            # Check if the identifier is a keyword
+            if token_type is identifier:
+                token_type = keywords.get(code[pos:end], identifier)
+            yield token_type, pos, end
+        # Move past the matched token
+        pos = end
+
+
+# Maps the group names of the master pattern to token types. Whitespace is
+# mapped to None, as it doesn't produce any token.
+_GROUP_TOKEN_TYPES: dict[str | None, Token.TokenType | None] = {
+    token_type.name: token_type for token_type in Token.token_patterns
+}
+_GROUP_TOKEN_TYPES["Whitespace"] = None
+
+
+# A scanner yields the type, the start offset and the end offset of each token
+# of a code, between two offsets
+TokenScanner = Callable[
+    [str, int, int | None], Iterator[tuple[Token.TokenType, int, int]]
+]
+
+
+def get_scanner(engine: str) -> TokenScanner:
+    """Returns the scanner implementing a lexer engine.
+
+    Available engines are:
+    - `regex`: Matches a single regular expression joining all the token patterns.
+    - `dispatch`: Jumps on the first character of each token to a specialized
+      scanner, without running any regular expression.
+    - `dfa`: Runs the minimized DFA generated from the token patterns.
+
+    The `regex` engine is the default: the loop of the `dfa` engine runs in
+    Python, and scans about 15% slower than the regular expression engine.
+
+    Args:
+        engine: Name of the lexer engine.
+
+    Raises:
+        ValueError: If `engine` is not one of the expected values.
+
+    Returns:
+        The scanner of the engine.
+    """
+    if engine == "regex":
+        return scan_tokens
+    elif engine == "dispatch":
+        from compiler.lexer.dispatch import scan_tokens_dispatch
+
+        return scan_tokens_dispatch
+    elif engine == "dfa":
+        from compiler.lexer.dfa import scan_tokens_dfa
+
+        return scan_tokens_dfa
+    raise ValueError(
+        f"Invalid lexer engine '{engine}'. Please choose 'regex', 'dispatch' or 'dfa'."
+    )
+
+
+def make_token(
+    code: str,
+    token_type: Token.TokenType,
+    start: int,
+    end: int,
+    symbols: SymbolTable,
+) -> Token:
+    """Builds the token spanning `code[start:end]`.
+
+    The spelling of identifiers is interned into `symbols`, so that tokens of
+    the same identifier share one string and carry its id.
+
+    Args:
+        code: The source code containing the token.
+        token_type: The type of the token.
+        start: Offset of the first character of the token.
+        end: Offset past the last character of the token.
+        symbols: The symbol table of the compilation.
+
+    Returns:
+        The token.
+    """
+    if token_type is Token.TokenType.Identifier:
+        symbol = symbols.intern(code[start:end])
+        return Token(token_type, symbols.spelling(symbol), symbol)
+    return Token(token_type, code[start:end])
+
+
+def tokenize_code(
+    code: str, symbols: SymbolTable | None = None, engine: str = "regex"
+) -> list[Token]:
+    """Tokenizes a string of C source code.
+
+    Args:
+        code: The C source code.
+        symbols: The symbol table where identifiers are interned. A new one is
+            created if not given.
+        engine: Name of the lexer engine, see `get_scanner`.
+
+    Raises:
+        ValueError: If an unrecognized sequence is encountered in the source code,
+            or if `engine` is not a valid lexer engine.
+
+    Returns:
+        A list of tokens representing the syntactic elements of the code.
+    """
+    scanner = get_scanner(engine)
+    if symbols is None:
+        symbols = SymbolTable()
+    return [
+        make_token(code, token_type, start, end, symbols)
+        for token_type, start, end in scanner(code, 0, None)
+    ]
+
+
+def tokenize(
+    c_source_file: str, symbols: SymbolTable | None = None, engine: str = "regex"
+) -> list[Token]:
     """Tokenizes the contents of a C source file as part of the lexer component.
 
     This function is responsible for the lexical analysis phase of the compiler.
@@ -85,49 +279,105 @@ def tokenize(c_source_file: str) -> list[Token]:
 
     Args:
         c_source_file: Path to the C source file.
+        symbols: The symbol table where identifiers are interned. A new one is
+            created if not given.
+        engine: Name of the lexer engine, see `get_scanner`.
 
     Raises:
-        ValueError: If an unrecognized sequence is encountered in the source code.
+        ValueError: If an unrecognized sequence is encountered in the source code,
+            or if `engine` is not a valid lexer engine.
 
     Returns:
         A list of tokens representing the syntactic elements of the source file.
     """
     logger.info(f"Running lexer on file '{c_source_file}'...")
 
-    output_tokens: list[Token] = []
-
     with open(c_source_file) as file:
         code = file.read()
 
-    position = 0
-    while position < len(code):
-        # Trim whitespace
-        code = code[position:].lstrip()
-        if len(code) == 0:
-            break
-        position = 0
-        matched = False
-
-        # Check each regex pattern
-        for token_type, pattern in Token.token_patterns.items():
-            match = pattern.match(code)
-            if match:
-                # Check if the identifier is a keyword
-                if token_type == Token.TokenType.Identifier:
-                    for keyword, pattern in Token.token_keywords.items():
-                        if re.fullmatch(pattern, match.group()):
-                            token_type = keyword
-                token_value = match.group()
-                tok = Token(token_type, token_value)
-                output_tokens.append(tok)
-                # Move past the matched token
-                position = match.end()
-                matched = True
-                break
-
-        if not matched:
-            # If no match found, report the unmatched part
-            error_segment = code[:20]  # First 20 chars of the unmatched segment
-            raise ValueError(f"Unrecognized sequence: '{error_segment}'")
+    return tokenize_code(code, symbols, engine)
+
+
+def iter_tokens_from_chunks(
+    chunks: Iterable[str], symbols: SymbolTable | None = None
+) -> Iterator[Token]:
+    """Lazily tokenizes C source code that is split into consecutive chunks.
+
+    Tokens may straddle chunk boundaries. A token reaching the end of the code
+    read so far may go on in the next chunk, so it is carried over and scanned
+    again together with the next chunk. Every other token is complete, so the
+    carried over code is never longer than a token.
+
+    Args:
+        chunks: Consecutive pieces of the C source code.
+        symbols: The symbol table where identifiers are interned. A new one is
+            created if not given.
+
+    Raises:
+        ValueError: If an unrecognized sequence is encountered in the source code.
+
+    Yields:
+        The tokens of the source code, in order.
+    """
+    if symbols is None:
+        symbols = SymbolTable()
+    pending = ""
+    for chunk in chunks:
+        code = pending + chunk
+        pending = ""
+        last = None
+        for token in scan_tokens(code):
+            if last is not None:
+                yield make_token(code, *last, symbols)
+            last = token
+        if last is not None:
+            if last[2] == len(code):
+                pending = code[last[1] :]
+            else:
+                yield make_token(code, *last, symbols)
+
+    for token_type, start, end in scan_tokens(pending):
+        yield make_token(pending, token_type, start, end, symbols)
+
+
+def iter_tokens(
+    c_source_file: str,
+    chunk_size: int = 1 << 16,
+    symbols: SymbolTable | None = None,
+) -> Iterator[Token]:
+    """Tokenizes a C source file, yielding tokens as they are produced.
+
+    Unlike `tokenize`, the file is memory-mapped and decoded one chunk at a
+    time, so memory usage doesn't grow with the size of the file.
+
+    Args:
+        c_source_file: Path to the C source file.
+        chunk_size: Number of bytes decoded and scanned at a time.
+        symbols: The symbol table where identifiers are interned. A new one is
+            created if not given.
+
+    Raises:
+        ValueError: If an unrecognized sequence is encountered in the source code.
+
+    Yields:
+        The tokens of the source file, in order.
+    """
+    logger.info(f"Running streaming lexer on file '{c_source_file}'...")
+
+    with open(c_source_file, "rb") as file:
+        try:
+            mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be memory-mapped
+            return
 
-    return output_tokens
+    with mapped_file:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        chunks = (
+            decoder.decode(
+                mapped_file[offset : offset + chunk_size],
+                final=offset + chunk_size >= len(mapped_file),
+            )
+            for offset in range(0, len(mapped_file), chunk_size)
+        )
+        yield from iter_tokens_from_chunks(chunks, symbols)
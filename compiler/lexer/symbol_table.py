@@ -0,0 +1,50 @@
+class SymbolTable:
+    """
+    A per-compilation table of interned identifier spellings.
+
+    Each distinct spelling is stored once and is given a small integer id, in
+    order of first appearance. Later stages can compare and hash identifiers by
+    their id instead of by their spelling.
+    """
+
+    __slots__ = ("_ids", "_spellings")
+
+    def __init__(self) -> None:
+        self._ids: dict[str, int] = {}
+        self._spellings: list[str] = []
+
+    def intern(self, spelling: str) -> int:
+        """Returns the id of `spelling`, adding it to the table if needed.
+
+        Args:
+            spelling: The identifier spelling.
+
+        Returns:
+            The id of the spelling.
+        """
+        symbol = self._ids.get(spelling)
+        if symbol is None:
+            symbol = self._ids[spelling] = len(self._spellings)
+            self._spellings.append(spelling)
+        return symbol
+
+    def lookup(self, spelling: str) -> int | None:
+        """Returns the id of `spelling`, or None if it was never interned."""
+        return self._ids.get(spelling)
+
+    def spelling(self, symbol: int) -> str:
+        """Returns the interned spelling with id `symbol`.
+
+        Raises:
+            IndexError: If no spelling has the given id.
+        """
+        return self._spellings[symbol]
+
+    def __len__(self) -> int:
+        return len(self._spellings)
+
+    def __contains__(self, spelling: object) -> bool:
+        return spelling in self._ids
+
+    def __repr__(self) -> str:
+        return f"SymbolTable({self._spellings!r})"
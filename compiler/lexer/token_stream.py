@@ -0,0 +1,209 @@
+from array import array
+from collections.abc import Iterator, Sequence
+from typing import overload
+
+from loguru import logger
+
+from compiler.lexer.lexer import Token, make_token, scan_tokens
+from compiler.lexer.symbol_table import SymbolTable
+
+# Token types indexed by their value, as stored in the kinds arrays of the token
+# streams
+TOKEN_TYPES = tuple(sorted(Token.TokenType, key=lambda token_type: token_type.value))
+assert all(token_type.value == index for index, token_type in enumerate(TOKEN_TYPES)), (
+    "The values of the token types must be contiguous from 0"
+)
+
+
+class TokenStream(Sequence[Token]):
+    """
+    A compact, array-backed sequence of tokens over the original source code.
+
+    Instead of one `Token` object per token, the stream stores the kind, the
+    start offset and the end offset of each token in three parallel arrays, and
+    keeps a reference to the source code they point into. `Token` objects and
+    token values are only materialized when they are accessed. Identifiers are
+    interned into the symbol table of the stream, so its tokens are the ones
+    `tokenize` returns, symbols included.
+
+    A stream is a view over the range `[lo, hi)` of its arrays: slicing it
+    returns another view sharing the same buffers, and `pop` consumes a token
+    from either end of the view without touching them. This makes a stream a
+    drop-in replacement for the list of tokens returned by `tokenize`.
+    """
+
+    __slots__ = ("_code", "_kinds", "_starts", "_ends", "_symbols", "_lo", "_hi")
+
+    def __init__(
+        self,
+        code: str,
+        kinds: array,
+        starts: array,
+        ends: array,
+        symbols: SymbolTable | None = None,
+        lo: int = 0,
+        hi: int | None = None,
+    ) -> None:
+        self._code = code
+        self._kinds = kinds
+        self._starts = starts
+        self._ends = ends
+        self._symbols = SymbolTable() if symbols is None else symbols
+        self._lo = lo
+        self._hi = len(kinds) if hi is None else hi
+
+    @classmethod
+    def from_code(cls, code: str, symbols: SymbolTable | None = None) -> "TokenStream":
+        """Tokenizes a string of C source code into a token stream.
+
+        Identifiers are interned in the order of the code, as by `tokenize_code`.
+
+        Args:
+            code: The C source code.
+            symbols: The symbol table where identifiers are interned. A new one is
+                created if not given.
+
+        Raises:
+            ValueError: If an unrecognized sequence is encountered in the source code.
+
+        Returns:
+            The token stream of the code.
+        """
+        if symbols is None:
+            symbols = SymbolTable()
+        kinds = array("B")
+        starts = array("i")
+        ends = array("i")
+        identifier = Token.TokenType.Identifier
+        for token_type, start, end in scan_tokens(code):
+            kinds.append(token_type.value)
+            starts.append(start)
+            ends.append(end)
+            if token_type is identifier:
+                symbols.intern(code[start:end])
+        return cls(code, kinds, starts, ends, symbols)
+
+    @property
+    def code(self) -> str:
+        return self._code
+
+    @property
+    def symbols(self) -> SymbolTable:
+        """The symbol table where the identifiers of the stream are interned."""
+        return self._symbols
+
+    def _index(self, index: int) -> int:
+        """Converts an index of the view into an index of the underlying arrays."""
+        if index < 0:
+            index += self._hi - self._lo
+        if not 0 <= index < self._hi - self._lo:
+            raise IndexError("token stream index out of range")
+        return self._lo + index
+
+    def kind(self, index: int) -> Token.TokenType:
+        """Returns the type of the token at `index`, without building a `Token`."""
+        return TOKEN_TYPES[self._kinds[self._index(index)]]
+
+    def span(self, index: int) -> tuple[int, int]:
+        """Returns the start and end offsets in the source of the token at `index`."""
+        i = self._index(index)
+        return self._starts[i], self._ends[i]
+
+    def value(self, index: int) -> str:
+        """Returns the value of the token at `index`, without building a `Token`."""
+        i = self._index(index)
+        return self._code[self._starts[i] : self._ends[i]]
+
+    def __len__(self) -> int:
+        return self._hi - self._lo
+
+    @overload
+    def __getitem__(self, index: int) -> Token: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TokenStream": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("token stream slices cannot have a step")
+            stop = max(start, stop)
+            return TokenStream(
+                self._code,
+                self._kinds,
+                self._starts,
+                self._ends,
+                self._symbols,
+                self._lo + start,
+                self._lo + stop,
+            )
+        i = self._index(index)
+        return make_token(
+            self._code,
+            TOKEN_TYPES[self._kinds[i]],
+            self._starts[i],
+            self._ends[i],
+            self._symbols,
+        )
+
+    def __iter__(self) -> Iterator[Token]:
+        code, kinds, starts, ends = self._code, self._kinds, self._starts, self._ends
+        symbols = self._symbols
+        for i in range(self._lo, self._hi):
+            yield make_token(code, TOKEN_TYPES[kinds[i]], starts[i], ends[i], symbols)
+
+    def pop(self, index: int = -1) -> Token:
+        """Removes a token from either end of the view and returns it.
+
+        Only the view shrinks: the underlying arrays, which may be shared with
+        other views, are left untouched.
+
+        Args:
+            index: Either 0 (the first token) or -1 (the last token).
+
+        Raises:
+            IndexError: If the view is empty.
+            ValueError: If `index` doesn't refer to either end of the view.
+
+        Returns:
+            The removed token.
+        """
+        token = self[index]
+        if index == 0:
+            self._lo += 1
+        elif index == -1:
+            self._hi -= 1
+        else:
+            raise ValueError("tokens can only be popped from either end of the stream")
+        return token
+
+    def __repr__(self) -> str:
+        return f"TokenStream({list(self)!r})"
+
+
+def tokenize_stream(
+    c_source_file: str, symbols: SymbolTable | None = None
+) -> TokenStream:
+    """Tokenizes the contents of a C source file into a compact token stream.
+
+    This is the compact counterpart of `tokenize`: the returned stream can be
+    used wherever a list of tokens is expected.
+
+    Args:
+        c_source_file: Path to the C source file.
+        symbols: The symbol table where identifiers are interned. A new one is
+            created if not given.
+
+    Raises:
+        ValueError: If an unrecognized sequence is encountered in the source code.
+
+    Returns:
+        The token stream of the source file.
+    """
+    logger.info(f"Running lexer on file '{c_source_file}'...")
+
+    with open(c_source_file) as file:
+        code = file.read()
+
+    return TokenStream.from_code(code, symbols)
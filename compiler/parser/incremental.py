@@ -0,0 +1,329 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+
+from compiler.lexer.lexer import Token, make_token, scan_tokens
+from compiler.lexer.symbol_table import SymbolTable
+from compiler.lexer.token_stream import TOKEN_TYPES, TokenStream
+from compiler.parser.parser import parse_program
+from compiler.parser.token_cursor import TokenCursor
+from lib.ast.ast import ASTNode
+from lib.tree.builder import TreeBuilder
+from lib.tree.tree import Tree
+
+# A node parsed by a reusable parsing function: (first token, end token, node)
+_Span = tuple[int, int, ASTNode]
+
+
+class _DocumentTokens(Sequence[Token]):
+    """The tokens of an `IncrementalDocument`, as read by the parser.
+
+    Offsets are resolved through the pending shift of the document, so that the
+    parser can run before the offsets of the tokens after an edit are updated.
+    Only integer indices are supported, which is all `TokenCursor` needs.
+    """
+
+    __slots__ = ("_document",)
+
+    def __init__(self, document: "IncrementalDocument") -> None:
+        self._document = document
+
+    def __len__(self) -> int:
+        return len(self._document._kinds)
+
+    def __getitem__(self, index):
+        if not isinstance(index, int):
+            raise TypeError("document tokens only support integer indices")
+        document = self._document
+        if index < 0:
+            index += len(document._kinds)
+        start, end = document._span(index)
+        return make_token(
+            document._code,
+            TOKEN_TYPES[document._kinds[index]],
+            start,
+            end,
+            document._symbols,
+        )
+
+
+class _ReusingCursor(TokenCursor):
+    """A cursor that reuses the nodes of the previous parse outside the damage.
+
+    The tokens `[damage_start, damage_end)` of the previous parse were replaced
+    by `inserted` tokens. A node parsed from the previous tokens `[a, b)` can be
+    reused if neither those tokens nor the token `b`, which the parser may have
+    looked ahead at, were replaced.
+    """
+
+    __slots__ = (
+        "_spans",
+        "_starts",
+        "_damage_start",
+        "_damage_end",
+        "_growth",
+        "new_spans",
+    )
+
+    def __init__(
+        self,
+        tokens: Sequence[Token],
+        spans: list[_Span],
+        damage_start: int,
+        damage_end: int,
+        inserted: int,
+    ) -> None:
+        super().__init__(tokens)
+        # Spans of the previous parse, sorted by their first token
+        self._spans = spans
+        self._starts = [start for start, _, _ in spans]
+        self._damage_start = damage_start
+        self._damage_end = damage_end
+        self._growth = inserted - (damage_end - damage_start)
+        # Spans of the new parse
+        self.new_spans: list[_Span] = []
+
+    def _old_position(self, position: int) -> int | None:
+        """Maps a position of the new tokens to the previous tokens, if unchanged."""
+        if position < self._damage_start:
+            return position
+        if position >= self._damage_end + self._growth:
+            return position - self._growth
+        return None
+
+    def reuse(self, node_type: type) -> ASTNode | None:
+        start = self._old_position(self.position)
+        if start is None:
+            return None
+        first = bisect_left(self._starts, start)
+        last = bisect_right(self._starts, start)
+        for _, end, node in self._spans[first:last]:
+            if not isinstance(node, node_type):
+                continue
+            if start < self._damage_start and end >= self._damage_start:
+                continue
+            shift = self.position - start
+            self.seek(end + shift)
+            # Nodes nested in the reused node can be reused by the next parse
+            nested_end = bisect_left(self._starts, end)
+            for nested_start, nested_end_token, nested in self._spans[first:nested_end]:
+                if nested_end_token <= end:
+                    self.new_spans.append(
+                        (nested_start + shift, nested_end_token + shift, nested)
+                    )
+            return node
+        return None
+
+    def record(self, node: ASTNode, start: int) -> None:
+        self.new_spans.append((start, self.position, node))
+
+
+class IncrementalDocument:
+    """
+    A C source document that is relexed and reparsed incrementally as it's edited.
+
+    The document keeps the tokens of the code in parallel arrays, like
+    `TokenStream`, and the parse tree of the code. An edit only relexes the
+    tokens around the edited region, until the new tokens line up with the
+    previous ones again, and reparses the program reusing the `Function` and
+    `Statement` nodes whose tokens were left untouched.
+
+    Moving the offsets of every token after an edit would take linear time, so
+    the document keeps one pending shift instead: the offsets stored for the
+    tokens from `shift_index` on are `shift` characters behind. The pending shift
+    is merged with the next edit, which only updates the offsets between the two
+    edits. Edits close to each other, as when typing, are therefore cheap.
+
+    Identifiers are interned into the symbol table of the document as their
+    tokens are read, so a spelling keeps its symbol across edits.
+    """
+
+    __slots__ = (
+        "_code",
+        "_kinds",
+        "_starts",
+        "_ends",
+        "_symbols",
+        "_shift_index",
+        "_shift",
+        "_tree",
+        "_spans",
+    )
+
+    def __init__(self, code: str, symbols: SymbolTable | None = None) -> None:
+        """Lexes and parses a whole document.
+
+        Args:
+            code: The C source code of the document.
+            symbols: The symbol table where identifiers are interned. A new one is
+                created if not given.
+
+        Raises:
+            ValueError: If an unrecognized sequence is encountered in the code.
+            SyntaxError: If the code is not a valid program.
+        """
+        self._code = code
+        self._kinds = array("B")
+        self._starts = array("i")
+        self._ends = array("i")
+        self._symbols = SymbolTable() if symbols is None else symbols
+        for token_type, start, end in scan_tokens(code):
+            self._kinds.append(token_type.value)
+            self._starts.append(start)
+            self._ends.append(end)
+        self._shift_index = len(self._kinds)
+        self._shift = 0
+        self._tree: Tree | None = None
+        self._spans: list[_Span] = []
+        self._parse(0, 0, 0)
+
+    @property
+    def code(self) -> str:
+        return self._code
+
+    @property
+    def tree(self) -> Tree | None:
+        """The parse tree of the code, or None if the last edit broke the syntax."""
+        return self._tree
+
+    @property
+    def tokens(self) -> TokenStream:
+        """A snapshot of the tokens of the code, unaffected by later edits."""
+        self._apply_shift(len(self._kinds))
+        return TokenStream(
+            self._code,
+            array("B", self._kinds),
+            self._starts[:],
+            self._ends[:],
+            self._symbols,
+        )
+
+    def _span(self, index: int) -> tuple[int, int]:
+        """Returns the offsets of the token at `index`, taking the shift into account."""
+        shift = self._shift if index >= self._shift_index else 0
+        return self._starts[index] + shift, self._ends[index] + shift
+
+    def _apply_shift(self, index: int) -> None:
+        """Applies the pending shift to the stored offsets up to `index`."""
+        shift = self._shift
+        starts, ends = self._starts, self._ends
+        for i in range(self._shift_index if shift else index, index):
+            starts[i] += shift
+            ends[i] += shift
+        self._shift_index = max(self._shift_index, index)
+
+    def _first_token_ending_at(self, offset: int) -> int:
+        """Returns the index of the first token ending at or after `offset`."""
+        lo, hi = 0, len(self._kinds)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._span(mid)[1] < offset:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def edit(self, offset: int, removed: int, inserted: str) -> Tree:
+        """Replaces `removed` characters at `offset` by `inserted`, and reparses.
+
+        The tree returned by the previous edit must not be used afterwards: its
+        unchanged subtrees are moved to the new tree.
+
+        Args:
+            offset: Offset of the edit in the current code.
+            removed: Number of characters removed at `offset`.
+            inserted: Text inserted at `offset`.
+
+        Raises:
+            ValueError: If the edit is out of the code, or an unrecognized
+                sequence is encountered in the new code. The document is left
+                unchanged.
+            SyntaxError: If the new code is not a valid program. The document
+                holds the new code and tokens, but no tree, and the next edit
+                reparses it from scratch.
+
+        Returns:
+            The parse tree of the new code.
+        """
+        code = self._code
+        if offset < 0 or removed < 0 or offset + removed > len(code):
+            raise ValueError(f"Edit ({offset}, {removed}) is out of the code")
+        new_code = code[:offset] + inserted + code[offset + removed :]
+        delta = len(inserted) - removed
+
+        # The token before the first token touching the edit is relexed as well,
+        # and relexing stops at the first new token starting where a previous
+        # token started after the edit: from there on, the tokens are the same.
+        count = len(self._kinds)
+        damage_start = max(self._first_token_ending_at(offset) - 1, 0)
+        relex_from = min(self._span(damage_start)[0], offset) if count else 0
+        resync_from = offset + len(inserted)
+        damage_end = damage_start
+        new_kinds = array("B")
+        new_starts = array("i")
+        new_ends = array("i")
+        for token_type, start, end in scan_tokens(new_code, relex_from):
+            if start >= resync_from:
+                while damage_end < count and self._span(damage_end)[0] + delta < start:
+                    damage_end += 1
+                if damage_end < count and self._span(damage_end)[0] + delta == start:
+                    break
+            new_kinds.append(token_type.value)
+            new_starts.append(start)
+            new_ends.append(end)
+        else:
+            damage_end = count
+
+        # The tokens relexed before the edit are usually unchanged
+        unchanged = 0
+        while (
+            damage_start + unchanged < damage_end
+            and unchanged < len(new_kinds)
+            and new_ends[unchanged] <= offset
+            and new_kinds[unchanged] == self._kinds[damage_start + unchanged]
+            and (new_starts[unchanged], new_ends[unchanged])
+            == self._span(damage_start + unchanged)
+        ):
+            unchanged += 1
+        if unchanged:
+            damage_start += unchanged
+            del new_kinds[:unchanged]
+            del new_starts[:unchanged]
+            del new_ends[:unchanged]
+
+        # Make the stored offsets exact before the damage, and `shift` behind
+        # after it, so that one pending shift covers all the following tokens
+        shift = self._shift
+        if self._shift_index < damage_start:
+            self._apply_shift(damage_start)
+        if shift:
+            for i in range(damage_end, self._shift_index):
+                self._starts[i] -= shift
+                self._ends[i] -= shift
+
+        self._code = new_code
+        self._kinds[damage_start:damage_end] = new_kinds
+        self._starts[damage_start:damage_end] = new_starts
+        self._ends[damage_start:damage_end] = new_ends
+        self._shift_index = damage_start + len(new_kinds)
+        self._shift = shift + delta
+
+        if self._tree is not None and damage_end == damage_start and not new_kinds:
+            # Only whitespace changed
+            return self._tree
+        return self._parse(damage_start, damage_end, len(new_kinds))
+
+    def _parse(self, damage_start: int, damage_end: int, inserted: int) -> Tree:
+        """Parses the tokens, reusing the nodes of the previous parse if any."""
+        spans = self._spans if self._tree is not None else []
+        self._tree = None
+        self._spans = []
+        cursor = _ReusingCursor(
+            _DocumentTokens(self), spans, damage_start, damage_end, inserted
+        )
+        with TreeBuilder():
+            tree = Tree(parse_program(cursor))
+        cursor.new_spans.sort(key=lambda span: span[0])
+        self._spans = cursor.new_spans
+        self._tree = tree
+        return tree
@@ -1,5 +1,11 @@
+from collections.abc import Callable, Iterable
+from functools import wraps
+from typing import Any, TypeVar, cast
+
 from compiler.lexer.lexer import Token
 from compiler.parser.parser_ast import (
+    Binary,
+    BinaryOperator,
     Constant,
     Exp,
     Function,
@@ -7,52 +13,200 @@ from compiler.parser.parser_ast import (
     Program,
     Return,
     Statement,
+    Unary,
+    UnaryOperator,
 )
+from compiler.parser.token_cursor import TokenCursor
+from lib.ast.arena import ASTArena
+from lib.tree.builder import TreeBuilder
 from lib.tree.tree import Tree
 
+# Operators that may start a factor, i.e. that appear before an operand
+UNARY_OPERATORS: dict[Token.TokenType, UnaryOperator] = {
+    Token.TokenType.Minus: UnaryOperator.Negate,
+    Token.TokenType.Complement: UnaryOperator.Complement,
+}
+
+# Operators that appear between two operands, with their precedence. All of them
+# are left-associative, and bind less tightly than the unary operators.
+BINARY_OPERATORS: dict[Token.TokenType, tuple[BinaryOperator, int]] = {
+    Token.TokenType.Minus: (BinaryOperator.Subtract, 45),
+}
+
+# Marks an open parenthesis on the operator stack of `parse_expression`
+_OPEN_PARENTHESIS = None
+
+ParseFunction = TypeVar("ParseFunction", bound=Callable[..., Any])
+
+
+class NodeFactory:
+    """Builds the nodes of a parse tree as objects.
+
+    The parsing functions build nodes through a factory, so that the same parser
+    builds either node objects, or nodes in an arena with `ArenaNodeFactory`.
+    The nodes returned by a factory are only passed back to it.
+    """
+
+    def program(self, func_def: Any) -> Any:
+        return Program(func_def=func_def)
+
+    def function(self, name: Any, body: Any) -> Any:
+        return Function(parent=None, name=name, body=body)
+
+    def return_statement(self, exp: Any) -> Any:
+        return Return(parent=None, exp=exp)
+
+    def identifier(self, value: str, symbol: int | None) -> Any:
+        return Identifier(parent=None, value=value, symbol=symbol)
+
+    def constant(self, value: str) -> Any:
+        return Constant(parent=None, value=value)
+
+    def unary(self, operator: UnaryOperator, exp: Any) -> Any:
+        return Unary(None, operator, exp)
+
+    def binary(self, operator: BinaryOperator, left: Any, right: Any) -> Any:
+        return Binary(None, operator, left, right)
+
+
+class ArenaNodeFactory(NodeFactory):
+    """Builds the nodes of a parse tree in an arena, where nodes are handles.
+
+    No node object is created: the attributes of each node are stored in the
+    columns of the arena, as the constructors of the node classes would set them.
+    """
+
+    def __init__(self, arena: ASTArena) -> None:
+        self.arena = arena
+
+    def program(self, func_def: int) -> int:
+        return self.arena.add(Program, children={"_func_def": func_def})
+
+    def function(self, name: int, body: int) -> int:
+        return self.arena.add(
+            Function,
+            children={"_name": name, "_body": body},
+            field_names={"_name": "name", "_body": "body"},
+        )
+
+    def return_statement(self, exp: int) -> int:
+        return self.arena.add(Return, children={"_exp": exp})
+
+    def identifier(self, value: str, symbol: int | None) -> int:
+        return self.arena.add(Identifier, payload={"_value": value, "_symbol": symbol})
+
+    def constant(self, value: str) -> int:
+        return self.arena.add(Constant, payload={"_value": value})
+
+    def unary(self, operator: UnaryOperator, exp: int) -> int:
+        return self.arena.add(
+            Unary, payload={"_operator": operator}, children={"_exp": exp}
+        )
+
+    def binary(self, operator: BinaryOperator, left: int, right: int) -> int:
+        return self.arena.add(
+            Binary,
+            payload={"_operator": operator},
+            children={"_left": left, "_right": right},
+            field_names={"_left": "left", "_right": "right"},
+        )
+
+
+# Factory of the parsing functions building node objects
+OBJECT_NODES = NodeFactory()
+
+
+def reusable(node_type: type) -> Callable[[ParseFunction], ParseFunction]:
+    """Lets the cursor reuse a node of `node_type` instead of parsing it again.
+
+    The decorated parsing function is only called if `TokenCursor.reuse` returns
+    no node. Nodes it parses are reported to the cursor with `TokenCursor.record`,
+    so that incremental parsing can reuse them later on.
+
+    Args:
+        node_type: The type of node returned by the decorated function.
+    """
+
+    def decorator(parse: ParseFunction) -> ParseFunction:
+        @wraps(parse)
+        def parse_reusable(tokens: TokenCursor, *args: Any) -> Any:
+            start = tokens.position
+            node = tokens.reuse(node_type)
+            if isinstance(node, node_type):
+                return node
+            node = parse(tokens, *args)
+            tokens.record(node, start)
+            return node
+
+        return cast(ParseFunction, parse_reusable)
+
+    return decorator
+
 
-def generate_parse_tree(tokens: list[Token]) -> Tree:
-    """Generates a parse tree from a list of tokens as part of the parser component.
+def generate_parse_tree(tokens: Iterable[Token]) -> Tree:
+    """Generates a parse tree from a stream of tokens as part of the parser component.
 
     This function performs the syntactic analysis phase of the compiler.
-    It takes a list of tokens produced by the lexer and constructs a parse tree,
+    It takes the tokens produced by the lexer and constructs a parse tree,
     which represents the hierarchical structure of the program according to the grammar rules.
 
     Args:
-        tokens: A list of tokens representing the program.
+        tokens: The tokens representing the program. They can be a list, a token
+            stream or any iterable, such as the streaming tokenizer. They are not
+            modified.
 
     Returns:
         The parse tree rooted at the program node.
     """
-    prog = parse_program(tokens)
+    with TreeBuilder():
+        prog = parse_program(TokenCursor(tokens))
     return Tree(prog)
 
 
-def parse_program(tokens: list[Token]) -> Program:
-    """Parses a list of tokens representing a program and validates the syntax.
+def generate_parse_arena(tokens: Iterable[Token]) -> ASTArena:
+    """Generates a parse tree in an arena, without creating a node object.
+
+    The tree takes a few bytes per node instead of an object per node, and the
+    garbage collector has nothing to track. `ASTArena.to_tree` returns a tree of
+    façades, which the later stages accept in place of the parse tree.
+
+    Args:
+        tokens: The tokens representing the program, as for `generate_parse_tree`.
+
+    Returns:
+        The arena, whose root is the program node.
+    """
+    arena = ASTArena()
+    parse_program(TokenCursor(tokens), ArenaNodeFactory(arena))
+    return arena
+
+
+def parse_program(tokens: TokenCursor, nodes: NodeFactory = OBJECT_NODES) -> Program:
+    """Parses the tokens representing a program and validates the syntax.
 
     Args:
-        tokens: List of tokens.
+        tokens: Cursor over the tokens.
+        nodes: Factory of the nodes.
 
     Returns:
         AST node representing the program.
     """
-    main_func = parse_function(tokens)
+    main_func = parse_function(tokens, nodes)
     # No extra junk after function
-    if len(tokens) != 0:
-        raise SyntaxError(
-            f"Program contains junk after function '{main_func.name.value}'"
-        )
+    if not tokens.at_end():
+        raise SyntaxError(f"Program contains junk after function: {tokens.peek()}")
 
-    prog = Program(func_def=main_func)
+    prog = nodes.program(main_func)
     return prog
 
 
-def parse_function(tokens: list[Token]) -> Function:
-    """Parses a list of tokens representing a function and validates the syntax.
+@reusable(Function)
+def parse_function(tokens: TokenCursor, nodes: NodeFactory = OBJECT_NODES) -> Function:
+    """Parses the tokens representing a function and validates the syntax.
 
     Args:
-        tokens: List of tokens.
+        tokens: Cursor over the tokens.
+        nodes: Factory of the nodes.
 
     Returns:
         AST node representing the function.
@@ -60,37 +214,43 @@ def parse_function(tokens: list[Token]) -> Function:
     # By the end of chapter 1, we parse functions with the following form:
     # "int" <identifier> "(" "void" ")" "{" <statement> "}"
     expect_token_type(Token.TokenType.IntKeyword, tokens)
-    identifier = parse_identifier(tokens)
+    identifier = parse_identifier(tokens, nodes)
     expect_token_type(Token.TokenType.OpenParenthesis, tokens)
     expect_token_type(Token.TokenType.VoidKeyword, tokens)
     expect_token_type(Token.TokenType.CloseParenthesis, tokens)
     expect_token_type(Token.TokenType.OpenBrace, tokens)
-    statement = parse_statement(tokens)
+    statement = parse_statement(tokens, nodes)
     expect_token_type(Token.TokenType.CloseBrace, tokens)
 
-    func = Function(parent=None, name=identifier, body=statement)
-    statement.parent = func
+    func = nodes.function(identifier, statement)
     return func
 
 
-def parse_statement(tokens: list[Token]) -> Statement:
-    """Parses a list of tokens representing a statement and validates the syntax.
+@reusable(Statement)
+def parse_statement(
+    tokens: TokenCursor, nodes: NodeFactory = OBJECT_NODES
+) -> Statement:
+    """Parses the tokens representing a statement and validates the syntax.
 
     Args:
-        tokens: List of tokens.
+        tokens: Cursor over the tokens.
+        nodes: Factory of the nodes.
 
     Returns:
         AST node representing the statement.
     """
     # By the end of chapter 1, we parse only return statements.
-    return parse_return_statement(tokens)
+    return parse_return_statement(tokens, nodes)
 
 
-def parse_return_statement(tokens: list) -> Return:
-    """Parses a list of tokens representing a return statement and validates the syntax.
+def parse_return_statement(
+    tokens: TokenCursor, nodes: NodeFactory = OBJECT_NODES
+) -> Return:
+    """Parses the tokens representing a return statement and validates the syntax.
 
     Args:
-        tokens: List of tokens.
+        tokens: Cursor over the tokens.
+        nodes: Factory of the nodes.
 
     Returns:
         AST node representing the Return statement.
@@ -98,58 +258,134 @@ def parse_return_statement(tokens: list) -> Return:
     # By the end of chapter 1 we parse the return statement as follows:
     # "return" <exp> ";"
     expect_token_type(Token.TokenType.ReturnKeyword, tokens)
-    expr = parse_expression(tokens)
+    expr = parse_expression(tokens, nodes)
     expect_token_type(Token.TokenType.Semicolon, tokens)
 
-    ret = Return(parent=None, exp=expr)
+    ret = nodes.return_statement(expr)
     return ret
 
 
-def parse_identifier(tokens: list[Token]) -> Identifier:
-    """Parses a list of tokens representing an identifier and validates the syntax.
+def parse_identifier(
+    tokens: TokenCursor, nodes: NodeFactory = OBJECT_NODES
+) -> Identifier:
+    """Parses the tokens representing an identifier and validates the syntax.
 
     Args:
-        tokens: List of tokens.
+        tokens: Cursor over the tokens.
+        nodes: Factory of the nodes.
 
     Returns:
         AST node representing the identifier.
     """
 
     tok = expect_token_type(Token.TokenType.Identifier, tokens)
-    return Identifier(parent=None, value=tok.value)
+    return nodes.identifier(tok.value, tok.symbol)
 
 
-def parse_expression(tokens: list[Token]) -> Exp:
-    """Parses a list of tokens representing a an expression and validates the syntax.
+def parse_expression(tokens: TokenCursor, nodes: NodeFactory = OBJECT_NODES) -> Exp:
+    """Parses the tokens representing a an expression and validates the syntax.
+
+    The expression is parsed by precedence climbing, driven by the
+    `UNARY_OPERATORS` and `BINARY_OPERATORS` tables. Instead of recursing for
+    each nested factor, pending operators and open parentheses are kept on an
+    explicit stack, so that the nesting depth of the expression is only limited
+    by memory and the parsing time is linear in the number of tokens.
 
     Args:
-        tokens: List of tokens.
+        tokens: Cursor over the tokens.
+        nodes: Factory of the nodes.
+
+    Raises:
+        SyntaxError: If the tokens don't form a valid expression.
 
     Returns:
         AST node representing the expression.
     """
-    # By the end of chapter 1, the parser understands only constants as expressions.
-    tok = expect_token_type(Token.TokenType.Constant, tokens)
-    return Constant(parent=None, value=tok.value)
-
-
-def expect_token_type(expected_type: Token.TokenType, tokens: list[Token]) -> Token:
-    """Pops the first element out of the tokens list and compares it to the expected type.
+    # <exp> ::= <factor> | <exp> <binop> <exp>
+    # <factor> ::= <int> | <unop> <factor> | "(" <exp> ")"
+    operands: list[Exp] = []
+    # Pending unary operators, binary operators with their precedence, and open
+    # parentheses (`_OPEN_PARENTHESIS`) in the order they were read
+    operators: list[UnaryOperator | tuple[BinaryOperator, int] | None] = []
+    open_parentheses = 0
+
+    def reduce_binary(min_precedence: int) -> None:
+        # Applies the pending binary operators binding at least as tightly as
+        # `min_precedence`, down to the innermost open parenthesis
+        while operators and isinstance(operators[-1], tuple):
+            operator, precedence = operators[-1]
+            if precedence < min_precedence:
+                break
+            operators.pop()
+            right = operands.pop()
+            left = operands.pop()
+            operands.append(nodes.binary(operator, left, right))
+
+    while True:
+        # Read a factor: unary operators and open parentheses are pushed until
+        # the constant they apply to
+        tok = tokens.peek()
+        if tok is not None and tok.type in UNARY_OPERATORS:
+            tokens.advance()
+            operators.append(UNARY_OPERATORS[tok.type])
+            continue
+        if tok is not None and tok.type == Token.TokenType.OpenParenthesis:
+            tokens.advance()
+            operators.append(_OPEN_PARENTHESIS)
+            open_parentheses += 1
+            continue
+        tok = expect_token_type(Token.TokenType.Constant, tokens)
+        operands.append(nodes.constant(tok.value))
+
+        while True:
+            # Unary operators bind more tightly than any binary operator, so
+            # the ones before the factor apply to it right away
+            while operators:
+                unary_operator = operators[-1]
+                if not isinstance(unary_operator, UnaryOperator):
+                    break
+                operators.pop()
+                operands.append(nodes.unary(unary_operator, operands.pop()))
+
+            # A closing parenthesis completes a factor; loop to apply the unary
+            # operators before its opening parenthesis
+            tok = tokens.peek()
+            if (
+                tok is None
+                or tok.type != Token.TokenType.CloseParenthesis
+                or not open_parentheses
+            ):
+                break
+            reduce_binary(0)
+            tokens.advance()
+            operators.pop()
+            open_parentheses -= 1
+
+        if tok is not None and tok.type in BINARY_OPERATORS:
+            operator, precedence = BINARY_OPERATORS[tok.type]
+            # Left-associative: apply the pending operators of equal precedence
+            reduce_binary(precedence)
+            tokens.advance()
+            operators.append((operator, precedence))
+            continue
+
+        reduce_binary(0)
+        if open_parentheses:
+            expect_token_type(Token.TokenType.CloseParenthesis, tokens)
+        return operands.pop()
+
+
+def expect_token_type(expected_type: Token.TokenType, tokens: TokenCursor) -> Token:
+    """Consumes the next token of the cursor and compares it to the expected type.
 
     Args:
         expected_type: The expected token type.
-        tokens: List of tokens.
+        tokens: Cursor over the tokens.
 
     Raises:
-        SyntaxError: If the tokens list is empty or the actual token differs from the expected token.
+        SyntaxError: If all the tokens have been consumed or the actual token differs from the expected token.
 
     Returns:
-        The popped token.
+        The consumed token.
     """
-    try:
-        token = tokens.pop(0)
-        if token.type != expected_type:
-            raise SyntaxError(f"Expected {expected_type!r} but found {token!r}")
-        return token
-    except IndexError:
-        raise SyntaxError(f"Expected {expected_type!r}") from IndexError
+    return tokens.expect(expected_type)
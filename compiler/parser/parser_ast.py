@@ -1,4 +1,5 @@
 from abc import abstractmethod
+from enum import Enum
 
 from lib.ast.ast import ASTNode
 
@@ -6,6 +7,8 @@ from lib.ast.ast import ASTNode
 class Exp(ASTNode):
     """Abstract class denoting a generic expression."""
 
+    __slots__ = ()
+
     @abstractmethod
     def __init__(self, parent: ASTNode | None, **kwargs):
         super().__init__(parent, **kwargs)
@@ -14,6 +17,8 @@ class Exp(ASTNode):
 class Statement(ASTNode):
     """Abstract class denoting a generic statement."""
 
+    __slots__ = ()
+
     @abstractmethod
     def __init__(self, parent: ASTNode | None, **kwargs):
         super().__init__(parent, **kwargs)
@@ -28,14 +33,22 @@ class Identifier(ASTNode):
     the program.
     """
 
-    def __init__(self, parent: ASTNode | None, value: str):
+    __slots__ = ("_value", "_symbol")
+
+    def __init__(self, parent: ASTNode | None, value: str, symbol: int | None = None):
         super().__init__(parent)
         self._value = value
+        self._symbol = symbol
 
     @property
     def value(self):
         return self._value
 
+    @property
+    def symbol(self) -> int | None:
+        """Id of the identifier in the symbol table of the compilation, if any."""
+        return self._symbol
+
     def __repr__(self) -> str:
         return f"Identifier({self._value})"
 
@@ -47,6 +60,8 @@ class Function(ASTNode):
     Currently, this class does not support function arguments.
     """
 
+    __slots__ = ("_name", "_body")
+
     def __init__(self, parent: ASTNode | None, name: Identifier, body: Statement):
         super().__init__(parent)
         name.parent = self
@@ -73,6 +88,8 @@ class Function(ASTNode):
 class Program(ASTNode):
     """Represents the root node of the parse tree."""
 
+    __slots__ = ("_func_def",)
+
     def __init__(self, func_def: Function):
         super().__init__()
         self._func_def = func_def
@@ -89,6 +106,8 @@ class Program(ASTNode):
 class Return(Statement):
     """Represents a return statement in the abstract syntax tree (AST)."""
 
+    __slots__ = ("_exp",)
+
     def __init__(self, parent: ASTNode | None, exp: Exp):
         super().__init__(parent)
         self._exp = exp
@@ -109,6 +128,8 @@ class Constant(Exp):
     floating-point number, or string literal.
     """
 
+    __slots__ = ("_value",)
+
     def __init__(self, parent: ASTNode | None, value):
         super().__init__(parent)
         self._value = value
@@ -119,3 +140,85 @@ class Constant(Exp):
 
     def __repr__(self) -> str:
         return f"Constant({self._value})"
+
+
+class UnaryOperator(Enum):
+    """Operators of unary expressions."""
+
+    Complement = 0
+    Negate = 1
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class BinaryOperator(Enum):
+    """Operators of binary expressions."""
+
+    Subtract = 0
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class Unary(Exp):
+    """Represents a unary expression in the abstract syntax tree (AST).
+
+    A unary expression applies a unary operator, such as negation or bitwise
+    complement, to an inner expression.
+    """
+
+    __slots__ = ("_operator", "_exp")
+
+    def __init__(self, parent: ASTNode | None, operator: UnaryOperator, exp: Exp):
+        super().__init__(parent)
+        self._operator = operator
+        self._exp = exp
+        exp.parent = self
+
+    @property
+    def operator(self) -> UnaryOperator:
+        return self._operator
+
+    @property
+    def exp(self) -> Exp:
+        return self._exp
+
+    def __repr__(self) -> str:
+        return f"Unary({self._operator!r})"
+
+
+class Binary(Exp):
+    """Represents a binary expression in the abstract syntax tree (AST).
+
+    A binary expression applies a binary operator to a left and a right operand.
+    """
+
+    __slots__ = ("_operator", "_left", "_right")
+
+    def __init__(
+        self, parent: ASTNode | None, operator: BinaryOperator, left: Exp, right: Exp
+    ):
+        super().__init__(parent)
+        self._operator = operator
+        self._left = left
+        self._right = right
+        left.parent = self
+        right.parent = self
+        left.field_name = "left"
+        right.field_name = "right"
+
+    @property
+    def operator(self) -> BinaryOperator:
+        return self._operator
+
+    @property
+    def left(self) -> Exp:
+        return self._left
+
+    @property
+    def right(self) -> Exp:
+        return self._right
+
+    def __repr__(self) -> str:
+        return f"Binary({self._operator!r})"
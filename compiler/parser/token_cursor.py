@@ -0,0 +1,194 @@
+from collections.abc import Iterable, Sequence
+
+from compiler.lexer.lexer import Token
+from lib.ast.ast import ASTNode
+
+
+class TokenCursor:
+    """
+    A read-only cursor over a stream of tokens.
+
+    The cursor moves over the tokens without modifying them. Sequences of tokens,
+    such as lists or token streams, are indexed directly. Other iterables, such as
+    the streaming tokenizer, are consumed lazily: tokens are buffered while they
+    may still be needed, that is while they are ahead of the cursor or after a
+    mark that hasn't been released.
+    """
+
+    __slots__ = ("_tokens", "_iterator", "_lazy", "_offset", "_position", "_marks")
+
+    # Number of consumed tokens after which the buffer of a lazy stream is trimmed
+    _TRIM_THRESHOLD = 1024
+
+    def __init__(self, tokens: Iterable[Token]) -> None:
+        self._tokens: Sequence[Token]
+        self._lazy = not isinstance(tokens, Sequence)
+        if isinstance(tokens, Sequence):
+            self._tokens = tokens
+            self._iterator = None
+        else:
+            self._tokens = []
+            self._iterator = iter(tokens)
+        # Absolute position of the first buffered token
+        self._offset = 0
+        # Absolute position of the next token
+        self._position = 0
+        self._marks: list[int] = []
+
+    @property
+    def position(self) -> int:
+        """The number of tokens consumed so far."""
+        return self._position
+
+    def _fill(self, index: int) -> bool:
+        """Buffers tokens until the buffer has `index`, relative to the offset.
+
+        Returns:
+            False if the stream ends before `index`.
+        """
+        tokens = self._tokens
+        if index < len(tokens):
+            return True
+        if self._iterator is None:
+            return False
+        assert isinstance(tokens, list)
+        for token in self._iterator:
+            tokens.append(token)
+            if index < len(tokens):
+                return True
+        self._iterator = None
+        return False
+
+    def peek(self, k: int = 0) -> Token | None:
+        """Returns the token `k` positions ahead of the cursor without consuming it.
+
+        Args:
+            k: How many tokens to look ahead. 0 is the next token.
+
+        Returns:
+            The token, or None if the stream ends before it.
+        """
+        index = self._position - self._offset + k
+        if not self._fill(index):
+            return None
+        return self._tokens[index]
+
+    def at_end(self) -> bool:
+        """Tells if all the tokens have been consumed."""
+        return self.peek() is None
+
+    def advance(self) -> Token:
+        """Consumes the next token.
+
+        Raises:
+            SyntaxError: If all the tokens have been consumed.
+
+        Returns:
+            The consumed token.
+        """
+        token = self.peek()
+        if token is None:
+            raise SyntaxError("Unexpected end of the program")
+        self._position += 1
+        self._trim()
+        return token
+
+    def expect(self, expected_type: Token.TokenType) -> Token:
+        """Consumes the next token, checking it has the expected type.
+
+        Args:
+            expected_type: The expected token type.
+
+        Raises:
+            SyntaxError: If all the tokens have been consumed or the next token
+                differs from the expected token.
+
+        Returns:
+            The consumed token.
+        """
+        token = self.peek()
+        if token is None:
+            raise SyntaxError(f"Expected {expected_type!r}")
+        if token.type != expected_type:
+            raise SyntaxError(f"Expected {expected_type!r} but found {token!r}")
+        self._position += 1
+        self._trim()
+        return token
+
+    def mark(self) -> int:
+        """Marks the current position, so that the cursor can be rewound to it.
+
+        Every mark must be released once backtracking to it is no longer possible.
+
+        Returns:
+            The mark.
+        """
+        self._marks.append(self._position)
+        return self._position
+
+    def rewind(self, mark: int) -> None:
+        """Moves the cursor back to a mark. The mark remains valid.
+
+        Raises:
+            ValueError: If the mark is not active.
+        """
+        if mark not in self._marks:
+            raise ValueError(f"Mark {mark} is not active")
+        self._position = mark
+
+    def release(self, mark: int) -> None:
+        """Releases a mark, allowing the tokens before it to be discarded.
+
+        Raises:
+            ValueError: If the mark is not active.
+        """
+        if mark not in self._marks:
+            raise ValueError(f"Mark {mark} is not active")
+        self._marks.remove(mark)
+        self._trim()
+
+    def seek(self, position: int) -> None:
+        """Moves the cursor forward to an absolute position.
+
+        Raises:
+            ValueError: If `position` is behind the cursor.
+            SyntaxError: If the stream ends before `position`.
+        """
+        if position < self._position:
+            raise ValueError("Use mark and rewind to move the cursor backwards")
+        if not self._fill(position - self._offset - 1):
+            raise SyntaxError("Unexpected end of the program")
+        self._position = position
+        self._trim()
+
+    def reuse(self, node_type: type) -> ASTNode | None:
+        """Returns a node of `node_type` parsed earlier from the next tokens, if any.
+
+        When a node is returned, the cursor has moved past its tokens. The base
+        cursor never reuses nodes: incremental parsing overrides this hook
+        together with `record`.
+
+        Args:
+            node_type: The type of node the parser is about to parse.
+
+        Returns:
+            The reused node, or None if the tokens must be parsed.
+        """
+        return None
+
+    def record(self, node: ASTNode, start: int) -> None:
+        """Records that `node` was parsed from the tokens from `start` to the cursor.
+
+        The base cursor doesn't record anything.
+        """
+
+    def _trim(self) -> None:
+        """Discards the buffered tokens of a lazy stream that can't be reached."""
+        if not self._lazy:
+            return
+        keep_from = min(self._marks, default=self._position)
+        consumed = keep_from - self._offset
+        if consumed >= self._TRIM_THRESHOLD:
+            assert isinstance(self._tokens, list)
+            del self._tokens[:consumed]
+            self._offset = keep_from
@@ -0,0 +1,256 @@
+import re
+
+from compiler.preprocessor.tokens import CHARACTER, IDENTIFIER, NUMBER, PPToken
+
+# Precedence of the binary operators of `#if` expressions
+_BINARY_PRECEDENCE = {
+    "||": 1,
+    "&&": 2,
+    "|": 3,
+    "^": 4,
+    "&": 5,
+    "==": 6,
+    "!=": 6,
+    "<": 7,
+    ">": 7,
+    "<=": 7,
+    ">=": 7,
+    "<<": 8,
+    ">>": 8,
+    "+": 9,
+    "-": 9,
+    "*": 10,
+    "/": 10,
+    "%": 10,
+}
+
+_INTEGER_PATTERN = re.compile(
+    r"(0[xX][0-9a-fA-F]+|0[bB][01]+|[0-9]+)([uU](?:ll|LL|[lL])?|(?:ll|LL|[lL])[uU]?)?"
+)
+
+_ESCAPES = {
+    "n": 10,
+    "t": 9,
+    "r": 13,
+    "a": 7,
+    "b": 8,
+    "f": 12,
+    "v": 11,
+    "e": 27,
+    "\\": 92,
+    "'": 39,
+    '"': 34,
+    "?": 63,
+}
+
+# Values of `#if` expressions are 64-bit integers, signed unless one of their
+# operands is unsigned, as with `intmax_t` and `uintmax_t`
+_BITS = 64
+
+
+def _wrap(value: int, unsigned: bool) -> int:
+    value &= (1 << _BITS) - 1
+    if not unsigned and value >> (_BITS - 1):
+        value -= 1 << _BITS
+    return value
+
+
+class _ExpressionEvaluator:
+    """Evaluates the expression of `#if`, whose macros have been expanded."""
+
+    __slots__ = ("_tokens", "_index", "_line")
+
+    def __init__(self, tokens: list[PPToken], line: int) -> None:
+        self._tokens = tokens
+        self._index = 0
+        self._line = line
+
+    def evaluate(self) -> int:
+        value, _ = self._conditional(True)
+        if self._index < len(self._tokens):
+            self._error(f"Unexpected '{self._tokens[self._index].value}'")
+        return value
+
+    def _error(self, message: str):
+        raise ValueError(f"{message} in #if expression on line {self._line}")
+
+    def _peek(self) -> str | None:
+        if self._index < len(self._tokens):
+            return self._tokens[self._index].value
+        return None
+
+    def _expect(self, value: str) -> None:
+        if self._peek() != value:
+            self._error(f"Expected '{value}'")
+        self._index += 1
+
+    def _conditional(self, evaluated: bool) -> tuple[int, bool]:
+        """Parses a conditional expression. Values aren't computed if not `evaluated`,
+        so that division by zero isn't reported in branches that aren't taken."""
+        condition = self._binary(0, evaluated)
+        if self._peek() != "?":
+            return condition
+        self._index += 1
+        taken = evaluated and condition[0] != 0
+        true = self._conditional(taken)
+        self._expect(":")
+        false = self._conditional(evaluated and not taken)
+        unsigned = true[1] or false[1]
+        value = true[0] if taken or not evaluated else false[0]
+        return _wrap(value, unsigned), unsigned
+
+    def _binary(self, min_precedence: int, evaluated: bool) -> tuple[int, bool]:
+        left = self._unary(evaluated)
+        while (operator := self._peek()) in _BINARY_PRECEDENCE:
+            precedence = _BINARY_PRECEDENCE[operator]
+            if precedence <= min_precedence:
+                break
+            self._index += 1
+            if operator == "&&":
+                right = self._binary(precedence, evaluated and left[0] != 0)
+                left = (int(left[0] != 0 and right[0] != 0), False)
+            elif operator == "||":
+                right = self._binary(precedence, evaluated and left[0] == 0)
+                left = (int(left[0] != 0 or right[0] != 0), False)
+            else:
+                right = self._binary(precedence, evaluated)
+                left = self._apply(operator, left, right, evaluated)
+        return left
+
+    def _apply(
+        self,
+        operator: str,
+        left: tuple[int, bool],
+        right: tuple[int, bool],
+        evaluated: bool,
+    ) -> tuple[int, bool]:
+        if operator in ("<<", ">>"):
+            unsigned = left[1]
+            a, b = left[0], right[0]
+            value = a << b if operator == "<<" else a >> b
+            return _wrap(value if 0 <= b < _BITS else 0, unsigned), unsigned
+
+        unsigned = left[1] or right[1]
+        a, b = _wrap(left[0], unsigned), _wrap(right[0], unsigned)
+        if operator in ("/", "%"):
+            if b == 0:
+                if evaluated:
+                    self._error("Division by zero")
+                return 0, unsigned
+            quotient = abs(a) // abs(b) * (1 if (a < 0) == (b < 0) else -1)
+            value = quotient if operator == "/" else a - quotient * b
+        elif operator == "+":
+            value = a + b
+        elif operator == "-":
+            value = a - b
+        elif operator == "*":
+            value = a * b
+        elif operator == "&":
+            value = a & b
+        elif operator == "|":
+            value = a | b
+        elif operator == "^":
+            value = a ^ b
+        else:
+            comparisons = {
+                "==": a == b,
+                "!=": a != b,
+                "<": a < b,
+                ">": a > b,
+                "<=": a <= b,
+                ">=": a >= b,
+            }
+            return int(comparisons[operator]), False
+        return _wrap(value, unsigned), unsigned
+
+    def _unary(self, evaluated: bool) -> tuple[int, bool]:
+        if self._index >= len(self._tokens):
+            self._error("Missing operand")
+        token = self._tokens[self._index]
+        self._index += 1
+        value = token.value
+        if value in ("+", "-", "~", "!"):
+            operand, unsigned = self._unary(evaluated)
+            if value == "-":
+                return _wrap(-operand, unsigned), unsigned
+            if value == "~":
+                return _wrap(~operand, unsigned), unsigned
+            if value == "!":
+                return int(operand == 0), False
+            return operand, unsigned
+        if value == "(":
+            result = self._conditional(evaluated)
+            self._expect(")")
+            return result
+        if token.kind == NUMBER:
+            return self._integer(value)
+        if token.kind == CHARACTER:
+            return _character_value(value, self._line), False
+        if token.kind == IDENTIFIER:
+            # Identifiers that aren't macros evaluate to 0
+            return 0, False
+        self._error(f"Unexpected '{value}'")
+        raise AssertionError
+
+    def _integer(self, value: str) -> tuple[int, bool]:
+        match = _INTEGER_PATTERN.fullmatch(value)
+        if match is None:
+            self._error(f"Invalid integer constant '{value}'")
+            raise AssertionError
+        digits, suffix = match.groups()
+        if digits[:2] in ("0x", "0X"):
+            number = int(digits[2:], 16)
+        elif digits[:2] in ("0b", "0B"):
+            number = int(digits[2:], 2)
+        elif digits.startswith("0"):
+            number = int(digits, 8)
+        else:
+            number = int(digits)
+        unsigned = suffix is not None and "u" in suffix.lower()
+        if number >= 1 << (_BITS - 1):
+            unsigned = True
+        return _wrap(number, unsigned), unsigned
+
+
+def _character_value(literal: str, line: int) -> int:
+    """Returns the value of a character constant in an `#if` expression.
+
+    As in GCC on x86-64, `char` is signed, so the plain character constants
+    above `'\\177'` are negative.
+    """
+    body = literal[literal.index("'") + 1 : -1]
+    value = None
+    if len(body) == 1 and body.isascii():
+        value = ord(body)
+    elif body.startswith("\\"):
+        escape = body[1:]
+        if escape in _ESCAPES:
+            value = _ESCAPES[escape]
+        elif escape.startswith("x") and len(escape) > 1:
+            value = int(escape[1:], 16)
+        elif escape.isdigit():
+            value = int(escape, 8)
+    if value is None:
+        raise NotImplementedError(
+            f"Character constant {literal} isn't supported in #if on line {line}"
+        )
+    if literal.startswith("'") and 0x80 <= value <= 0xFF:
+        value -= 0x100
+    return value
+
+
+def evaluate_expression(tokens: list[PPToken], line: int) -> int:
+    """Evaluates the expression of an `#if` directive.
+
+    Args:
+        tokens: The tokens of the expression, whose macros have been expanded.
+        line: Number of the line of the directive, for error messages.
+
+    Raises:
+        ValueError: If the expression is invalid, or divides by zero.
+        NotImplementedError: If the expression has a multi-character constant.
+
+    Returns:
+        The value of the expression.
+    """
+    return _ExpressionEvaluator(tokens, line).evaluate()
@@ -0,0 +1,878 @@
+#!/usr/bin/env -S python3
+"""A C preprocessor.
+
+It supports object-like and function-like macros, with stringizing, token
+pasting and variadic arguments, `#include` with include-path search, conditional
+compilation, `#line`, `#error`, `#pragma once` and line markers in the output.
+
+Constructs it doesn't support, such as system headers, `__has_include` or
+`_Pragma`, raise `NotImplementedError`, so that the caller can preprocess the file
+with GCC instead. Only standard predefined macros are defined, not the ones of
+GCC, such as `__GNUC__`: conditions on the macros GCC may predefine that aren't
+defined raise `NotImplementedError` too.
+
+Files are split into logical lines, without comments, and each line is split into
+preprocessing tokens. Consecutive lines of text are expanded together, so that
+macro invocations can span lines, and macros are expanded with hide sets
+(Prosser's algorithm). The tokenized lines of included files are kept in a
+`HeaderCache`, shared by the files preprocessed by a process, and headers
+protected by an include guard are skipped without being read again.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections.abc import Sequence
+from functools import cache
+from io import StringIO
+from typing import TextIO
+
+from loguru import logger
+
+from compiler.preprocessor.expression import evaluate_expression
+from compiler.preprocessor.tokens import (
+    CHARACTER,
+    IDENTIFIER,
+    NUMBER,
+    OTHER,
+    PUNCTUATOR,
+    STRING,
+    PPToken,
+    split_lines,
+    tokenize_line,
+    would_paste,
+)
+
+# Macros defined before preprocessing, as the ones of the C standard
+PREDEFINED_MACROS = {
+    "__STDC__": "1",
+    "__STDC_HOSTED__": "1",
+    "__STDC_VERSION__": "201710L",
+    "__x86_64__": "1",
+    "__linux__": "1",
+    "__LP64__": "1",
+    "__CHAR_BIT__": "8",
+}
+
+# Macros GCC predefines in its default GNU mode whose names aren't reserved
+GNU_PREDEFINED_MACROS = frozenset(("unix", "linux", "i386"))
+
+# Maximum nesting of included files, as in GCC
+MAX_INCLUDE_DEPTH = 200
+
+# Blank lines written at most between two lines of output, as GCC does with `-P`.
+# With line markers, longer gaps are replaced by a marker.
+MAX_BLANK_LINES = 8
+
+
+class SourceFile:
+    """
+    A C source file split into lines of preprocessing tokens.
+
+    `guard` is the name of the macro of the include guard of the file, if all of
+    its code is within `#ifndef NAME` and `#endif`, without an `#else` or `#elif`
+    branch: the file can be skipped when that macro is defined.
+    """
+
+    __slots__ = ("path", "mtime", "lines", "guard")
+
+    def __init__(self, path: str, mtime: int, lines: list[tuple[int, list[PPToken]]]):
+        self.path = path
+        self.mtime = mtime
+        self.lines = lines
+        self.guard = _find_include_guard(lines)
+
+    @classmethod
+    def read(cls, path: str) -> "SourceFile":
+        """Reads and tokenizes a source file.
+
+        Raises:
+            OSError: If the file can't be read.
+            ValueError: If a block comment isn't terminated.
+        """
+        with open(path) as f:
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+            code = f.read()
+        lines = [
+            (number, tokens)
+            for number, text in split_lines(code)
+            if (tokens := tokenize_line(text, number))
+        ]
+        return cls(path, mtime, lines)
+
+
+def _directive_name(tokens: list[PPToken]) -> str | None:
+    """Returns the name of the directive of a line, or None if it isn't one."""
+    if tokens[0].value != "#" or tokens[0].kind != PUNCTUATOR:
+        return None
+    return tokens[1].value if len(tokens) > 1 else ""
+
+
+def _find_include_guard(lines: list[tuple[int, list[PPToken]]]) -> str | None:
+    """Returns the macro of the include guard of lines of tokens, if any."""
+    if not lines:
+        return None
+    first = lines[0][1]
+    if _directive_name(first) != "ifndef" or len(first) != 3:
+        return None
+    depth = 0
+    for index, (_, tokens) in enumerate(lines):
+        name = _directive_name(tokens)
+        if name in ("if", "ifdef", "ifndef"):
+            depth += 1
+        elif name in ("else", "elif") and depth == 1:
+            # The file has code when the macro is defined
+            return None
+        elif name == "endif":
+            depth -= 1
+            if depth == 0:
+                return first[2].value if index == len(lines) - 1 else None
+    return None
+
+
+class HeaderCache:
+    """
+    A cache of the tokenized included files.
+
+    The cache is shared by the files preprocessed in a process, so the headers
+    they have in common are only read and tokenized once. Files are checked
+    against their modification time, so changed headers are read again.
+    """
+
+    __slots__ = ("_files",)
+
+    def __init__(self) -> None:
+        self._files: dict[str, SourceFile] = {}
+
+    def load(self, path: str) -> SourceFile:
+        """Returns the tokenized file at `path`, reading it if needed.
+
+        Raises:
+            OSError: If the file can't be read.
+            ValueError: If a block comment isn't terminated.
+        """
+        source = self._files.get(path)
+        if source is None or source.mtime != os.stat(path).st_mtime_ns:
+            source = self._files[path] = SourceFile.read(path)
+        return source
+
+
+@cache
+def get_header_cache() -> HeaderCache:
+    """Returns the header cache shared by the files preprocessed in this process."""
+    return HeaderCache()
+
+
+class Macro:
+    """
+    A macro definition.
+
+    `parameters` maps the names of the parameters of a function-like macro to
+    their position, and is None for object-like macros. The variable arguments of
+    a variadic macro are the last parameter, `__VA_ARGS__`.
+    """
+
+    __slots__ = ("parameters", "body", "variadic")
+
+    def __init__(
+        self,
+        parameters: dict[str, int] | None,
+        body: list[PPToken],
+        variadic: bool = False,
+    ) -> None:
+        self.parameters = parameters
+        self.body = body
+        self.variadic = variadic
+
+
+class _OutputWriter:
+    """Writes expanded tokens to a stream, one line of output per source line."""
+
+    __slots__ = ("_stream", "_line_markers", "_line", "_previous")
+
+    def __init__(self, stream: TextIO, line_markers: bool) -> None:
+        self._stream = stream
+        self._line_markers = line_markers
+        # Source line of the current line of output
+        self._line = 0
+        # Last token of the current line of output, if any
+        self._previous: PPToken | None = None
+
+    def start_file(self, name: str, line: int, flag: str = "") -> None:
+        """Starts a new line of output for the code of a file, from `line`."""
+        if self._previous is not None:
+            self._stream.write("\n")
+        if self._line_markers:
+            self._write_marker(name, line, flag)
+        self._line = line
+        self._previous = None
+
+    def _write_marker(self, name: str, line: int, flag: str = "") -> None:
+        self._stream.write(f"# {line} {_quote(name)}{flag}\n")
+
+    def write(self, tokens: list[PPToken], line_offset: int, name: str) -> None:
+        """Writes tokens, shifting their line by `line_offset` as asked by `#line`."""
+        write = self._stream.write
+        previous = self._previous
+        for token in tokens:
+            line = token.line + line_offset
+            if line > self._line:
+                gap = line - self._line
+                if gap > MAX_BLANK_LINES and self._line_markers:
+                    write("\n")
+                    self._write_marker(name, line)
+                else:
+                    write("\n" * min(gap, MAX_BLANK_LINES))
+                self._line = line
+                previous = None
+            elif previous is not None and (
+                token.space_before or would_paste(previous, token)
+            ):
+                write(" ")
+            write(token.value)
+            previous = token
+        self._previous = previous
+
+    def close(self) -> None:
+        if self._previous is not None:
+            self._stream.write("\n")
+            self._previous = None
+
+
+def _quote(text: str) -> str:
+    """Returns a string literal of `text`."""
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class _FileContext:
+    """The state of a file being preprocessed."""
+
+    __slots__ = ("source", "name", "line_offset")
+
+    def __init__(self, source: SourceFile) -> None:
+        self.source = source
+        # Name and line offset of the file, as changed by `#line`
+        self.name = source.path
+        self.line_offset = 0
+
+
+class Preprocessor:
+    """
+    Preprocesses a C source file, writing the preprocessed code to a stream.
+
+    A preprocessor holds the macros defined while preprocessing a file, so a new
+    one is needed for each file.
+    """
+
+    def __init__(
+        self,
+        include_dirs: Sequence[str] = (),
+        header_cache: HeaderCache | None = None,
+        line_markers: bool = False,
+    ) -> None:
+        """
+        Args:
+            include_dirs: Directories searched for included files, in order.
+            header_cache: Cache of the included files. Defaults to the cache shared
+                by the files preprocessed in this process.
+            line_markers: Whether to write line markers telling the file and line
+                the code comes from, as GCC does without `-P`.
+        """
+        self.include_dirs = list(include_dirs)
+        self.header_cache = header_cache or get_header_cache()
+        self.line_markers = line_markers
+        self.macros = {
+            name: Macro(None, tokenize_line(value, 0))
+            for name, value in PREDEFINED_MACROS.items()
+        }
+        now = time.localtime()
+        self._date = time.strftime('"%b %e %Y"', now)
+        self._time = time.strftime('"%H:%M:%S"', now)
+        # Files with `#pragma once`
+        self._once: set[str] = set()
+        self._files: list[_FileContext] = []
+        self._writer: _OutputWriter
+
+    def preprocess(self, path: str, stream: TextIO) -> None:
+        """Preprocesses the C source file at `path`, writing the code to `stream`.
+
+        Raises:
+            OSError: If a file can't be read.
+            ValueError: If the code is invalid, or if it has an `#error` directive.
+            NotImplementedError: If the code uses a construct that isn't supported.
+        """
+        self._writer = _OutputWriter(stream, self.line_markers)
+        source = SourceFile.read(path)
+        self._writer.start_file(path, 1)
+        self._process_file(source)
+        self._writer.close()
+
+    def _process_file(self, source: SourceFile) -> None:
+        if len(self._files) >= MAX_INCLUDE_DEPTH:
+            raise ValueError(f"#include nested too deeply in '{source.path}'")
+        context = _FileContext(source)
+        self._files.append(context)
+
+        # For each open conditional: whether the enclosing code is active, whether
+        # a branch has been taken, and whether `#else` has been seen. Text lines
+        # are expanded together up to the next directive that changes the macros
+        # or writes code.
+        conditions: list[tuple[bool, bool, bool]] = []
+        active = True
+        text: list[PPToken] = []
+        for number, tokens in source.lines:
+            name = _directive_name(tokens)
+            if name is None:
+                if active:
+                    text.extend(tokens)
+                continue
+
+            if name in ("if", "ifdef", "ifndef"):
+                if active:
+                    condition = self._evaluate_condition(name, tokens[2:], number)
+                    conditions.append((True, condition, False))
+                    active = condition
+                else:
+                    conditions.append((False, True, False))
+            elif name in ("elif", "else", "endif"):
+                if not conditions:
+                    raise ValueError(f"#{name} without #if on line {number}")
+                enclosing, taken, seen_else = conditions[-1]
+                if name == "endif":
+                    conditions.pop()
+                    active = enclosing
+                    continue
+                if seen_else:
+                    raise ValueError(f"#{name} after #else on line {number}")
+                if not enclosing or taken:
+                    active = False
+                elif name == "else":
+                    active = True
+                else:
+                    active = self._evaluate_condition("if", tokens[2:], number)
+                conditions[-1] = (enclosing, taken or active, name == "else")
+            elif active:
+                self._write(text)
+                text = []
+                self._run_directive(name, tokens, number)
+
+        if conditions:
+            raise ValueError(f"Unterminated conditional directive in '{source.path}'")
+        self._write(text)
+        self._files.pop()
+
+    def _write(self, tokens: list[PPToken]) -> None:
+        if tokens:
+            context = self._files[-1]
+            self._writer.write(self.expand(tokens), context.line_offset, context.name)
+
+    def _run_directive(self, name: str, tokens: list[PPToken], line: int) -> None:
+        """Runs a directive other than the ones of conditional compilation."""
+        arguments = tokens[2:]
+        if name == "define":
+            self._define(arguments, line)
+        elif name == "undef":
+            if not arguments or arguments[0].kind != IDENTIFIER:
+                raise ValueError(f"Macro names must be identifiers on line {line}")
+            self.macros.pop(arguments[0].value, None)
+        elif name == "include":
+            self._include(arguments, line)
+        elif name == "line":
+            self._line(arguments, line)
+        elif name == "error":
+            raise ValueError(f"#error {_spell(arguments)}")
+        elif name == "warning":
+            logger.warning(f"#warning {_spell(arguments)}")
+        elif name == "pragma":
+            if [token.value for token in arguments] == ["once"]:
+                self._once.add(self._files[-1].source.path)
+            else:
+                # Pragmas are left to the compiler
+                context = self._files[-1]
+                self._writer.write(tokens, context.line_offset, context.name)
+        elif name != "":
+            raise NotImplementedError(f"Unsupported directive '#{name}' on line {line}")
+
+    def _define(self, tokens: list[PPToken], line: int) -> None:
+        if not tokens or tokens[0].kind != IDENTIFIER:
+            raise ValueError(f"Macro names must be identifiers on line {line}")
+        name = tokens[0].value
+        if name == "defined":
+            raise ValueError(f"'defined' can't be used as a macro name on line {line}")
+        if len(tokens) == 1 or tokens[1].value != "(" or tokens[1].space_before:
+            self.macros[name] = Macro(None, tokens[1:])
+            return
+
+        # Function-like macro: read the parameters up to the closing parenthesis
+        parameters: dict[str, int] = {}
+        variadic = False
+        index = 2
+        while index < len(tokens) and tokens[index].value != ")":
+            token = tokens[index]
+            if token.value == "...":
+                variadic = True
+                parameters["__VA_ARGS__"] = len(parameters)
+            elif token.kind == IDENTIFIER and token.value not in parameters:
+                if index + 1 < len(tokens) and tokens[index + 1].value == "...":
+                    raise NotImplementedError(
+                        f"Named variadic parameters aren't supported on line {line}"
+                    )
+                parameters[token.value] = len(parameters)
+            else:
+                raise ValueError(f"Invalid parameter '{token.value}' on line {line}")
+            index += 1
+            if index < len(tokens) and tokens[index].value == "," and not variadic:
+                index += 1
+            elif index >= len(tokens) or tokens[index].value != ")":
+                raise ValueError(f"Expected ')' in the parameters of '{name}'")
+        if index >= len(tokens):
+            raise ValueError(f"Missing ')' in the parameters of '{name}'")
+
+        body = tokens[index + 1 :]
+        for position, token in enumerate(body):
+            if token.value == "#" and (
+                position + 1 == len(body) or body[position + 1].value not in parameters
+            ):
+                raise ValueError(
+                    f"'#' is not followed by a macro parameter in '{name}'"
+                )
+        if body and (body[0].value == "##" or body[-1].value == "##"):
+            raise ValueError(f"'##' can't be at either end of the body of '{name}'")
+        self.macros[name] = Macro(parameters, body, variadic)
+
+    def _include(self, tokens: list[PPToken], line: int) -> None:
+        if tokens and tokens[0].kind == IDENTIFIER:
+            # The name of the file is given by macros
+            tokens = self.expand(tokens)
+        if tokens and tokens[0].kind == STRING and tokens[0].value.startswith('"'):
+            name, quoted = tokens[0].value[1:-1], True
+        elif tokens and tokens[0].value == "<" and tokens[-1].value == ">":
+            name, quoted = _spell(tokens[1:-1]), False
+        else:
+            raise ValueError(
+                f'#include expects "FILENAME" or <FILENAME> on line {line}'
+            )
+
+        current = self._files[-1].source.path
+        directories = self.include_dirs
+        if quoted:
+            directories = [os.path.dirname(current), *directories]
+        for directory in directories:
+            path = os.path.normpath(os.path.join(directory, name))
+            if os.path.isfile(path):
+                break
+        else:
+            raise NotImplementedError(
+                f"Included file '{name}' isn't in the include path, and system "
+                "headers aren't supported"
+            )
+
+        if path in self._once:
+            return
+        source = self.header_cache.load(path)
+        if source.guard is not None and source.guard in self.macros:
+            return
+        self._writer.start_file(path, 1, " 1")
+        self._process_file(source)
+        context = self._files[-1]
+        self._writer.start_file(context.name, line + 1 + context.line_offset, " 2")
+
+    def _line(self, tokens: list[PPToken], line: int) -> None:
+        tokens = self.expand(tokens)
+        if not tokens or not tokens[0].value.isdigit() or len(tokens) > 2:
+            raise ValueError(f"Invalid #line directive on line {line}")
+        context = self._files[-1]
+        # The line after the directive has the given number
+        context.line_offset = int(tokens[0].value) - line - 1
+        if len(tokens) == 2:
+            if tokens[1].kind != STRING:
+                raise ValueError(f"Invalid file name in #line on line {line}")
+            context.name = tokens[1].value[1:-1]
+        if self.line_markers:
+            self._writer.start_file(context.name, line + 1 + context.line_offset)
+
+    def _evaluate_condition(self, name: str, tokens: list[PPToken], line: int) -> bool:
+        """Evaluates the condition of `#if`, `#ifdef` or `#ifndef`."""
+        if name != "if":
+            if not tokens or tokens[0].kind != IDENTIFIER:
+                raise ValueError(f"#{name} expects a macro name on line {line}")
+            return self._is_defined(tokens[0].value) == (name == "ifdef")
+
+        # `defined` is replaced before the macros are expanded
+        replaced = []
+        index = 0
+        while index < len(tokens):
+            token = tokens[index]
+            index += 1
+            if token.kind != IDENTIFIER:
+                replaced.append(token)
+            elif token.value == "defined":
+                parenthesized = index < len(tokens) and tokens[index].value == "("
+                index += parenthesized
+                if index >= len(tokens) or tokens[index].kind != IDENTIFIER:
+                    raise ValueError(f"'defined' expects a macro name on line {line}")
+                value = "1" if self._is_defined(tokens[index].value) else "0"
+                index += 1
+                if parenthesized:
+                    if index >= len(tokens) or tokens[index].value != ")":
+                        raise ValueError(f"Missing ')' after 'defined' on line {line}")
+                    index += 1
+                replaced.append(PPToken(NUMBER, value, token.line, True))
+            elif token.value.startswith("__has_"):
+                raise NotImplementedError(f"'{token.value}' isn't supported")
+            else:
+                replaced.append(token)
+        if not replaced:
+            raise ValueError(f"#if with no expression on line {line}")
+        expanded = self.expand(replaced)
+        for token in expanded:
+            # Identifiers left after expansion evaluate to 0, which is only right
+            # if GCC doesn't predefine them
+            if token.kind == IDENTIFIER:
+                self._is_defined(token.value)
+        return evaluate_expression(expanded, line) != 0
+
+    def _is_defined(self, name: str) -> bool:
+        """Returns whether a macro is defined, for a conditional directive.
+
+        Raises:
+            NotImplementedError: If the macro isn't defined, but GCC may predefine
+                it: its name is reserved, like `__GNUC__` or `_LP64`, or it's one
+                of `GNU_PREDEFINED_MACROS`.
+        """
+        if name in self.macros or name in _DYNAMIC_MACROS:
+            return True
+        if (
+            name[0] == "_" and (name[1:2] == "_" or name[1:2].isupper())
+        ) or name in GNU_PREDEFINED_MACROS:
+            raise NotImplementedError(
+                f"Macro '{name}' isn't defined, but may be predefined by GCC"
+            )
+        return False
+
+    def expand(self, tokens: list[PPToken]) -> list[PPToken]:
+        """Expands the macros in a sequence of tokens.
+
+        Raises:
+            ValueError: If a macro is invoked with invalid arguments.
+            NotImplementedError: If the tokens use a construct that isn't supported.
+        """
+        macros = self.macros
+        output: list[PPToken] = []
+        # Tokens left to expand, in reverse order, so that the next one is popped
+        # and the expansion of a macro is pushed
+        pending = tokens[::-1]
+        while pending:
+            token = pending.pop()
+            if token.kind != IDENTIFIER:
+                output.append(token)
+                continue
+            name = token.value
+            macro = macros.get(name)
+            if macro is None:
+                if name in _DYNAMIC_MACROS:
+                    output.append(self._expand_dynamic(token))
+                else:
+                    output.append(token)
+                continue
+            if name in token.hide_set:
+                output.append(token)
+                continue
+
+            if macro.parameters is None:
+                hide_set = token.hide_set | {name}
+                expansion = self._substitute(macro, [], hide_set, token)
+            else:
+                if not pending or pending[-1].value != "(":
+                    # A function-like macro name not followed by arguments
+                    output.append(token)
+                    continue
+                arguments, closing = _collect_arguments(name, macro, pending)
+                hide_set = (token.hide_set & closing.hide_set) | {name}
+                expansion = self._substitute(macro, arguments, hide_set, token)
+            pending.extend(reversed(expansion))
+        return output
+
+    def _expand_dynamic(self, token: PPToken) -> PPToken:
+        """Expands a macro whose value depends on where, or when, it's expanded."""
+        name = token.value
+        context = self._files[-1]
+        if name == "__LINE__":
+            value, kind = str(token.line + context.line_offset), NUMBER
+        elif name == "__FILE__":
+            value, kind = _quote(context.name), STRING
+        elif name == "__DATE__":
+            value, kind = self._date, STRING
+        elif name == "__TIME__":
+            value, kind = self._time, STRING
+        else:
+            raise NotImplementedError(f"'{name}' isn't supported")
+        return PPToken(kind, value, token.line, token.space_before)
+
+    def _substitute(
+        self,
+        macro: Macro,
+        arguments: list[list[PPToken]],
+        hide_set: frozenset[str],
+        invocation: PPToken,
+    ) -> list[PPToken]:
+        """Replaces a macro invocation by the body of the macro.
+
+        Parameters are replaced by their argument, fully expanded, unless they are
+        operands of `#` or `##`, in which case they are replaced by the argument
+        as written.
+
+        Args:
+            macro: The invoked macro.
+            arguments: The arguments of the invocation, for function-like macros.
+            hide_set: The hide set of the tokens of the expansion.
+            invocation: The name of the macro, where it's invoked.
+
+        Returns:
+            The expansion of the macro, which remains to be rescanned.
+        """
+        parameters = macro.parameters or {}
+        body = macro.body
+        output: list[PPToken] = []
+        expanded: dict[int, list[PPToken]] = {}
+        # Whether the left operand of the next `##` is an empty argument, in which
+        # case the right operand isn't pasted to anything
+        placemarker = False
+        index = 0
+        while index < len(body):
+            token = body[index]
+            value = token.value
+            following = body[index + 1].value if index + 1 < len(body) else None
+
+            if value == "#" and parameters:
+                argument = arguments[parameters[body[index + 1].value]]
+                output.append(_stringize(argument, token))
+                index += 2
+            elif value == "##":
+                operand = body[index + 1]
+                position = parameters.get(operand.value)
+                if (
+                    position is not None
+                    and macro.variadic
+                    and operand.value == "__VA_ARGS__"
+                    and output
+                    and output[-1].value == ","
+                ):
+                    # GNU extension: `, ## __VA_ARGS__` drops the comma if there
+                    # are no variable arguments
+                    if not arguments[position]:
+                        output.pop()
+                    output.extend(arguments[position])
+                elif position is not None:
+                    argument = arguments[position]
+                    if argument and not placemarker:
+                        output[-1] = _paste(output[-1], argument[0])
+                        output.extend(argument[1:])
+                    else:
+                        output.extend(argument)
+                    placemarker = placemarker and not argument
+                elif placemarker:
+                    output.append(operand)
+                    placemarker = False
+                else:
+                    output[-1] = _paste(output[-1], operand)
+                index += 2
+            elif value in parameters and token.kind == IDENTIFIER:
+                position = parameters[value]
+                if following == "##":
+                    output.extend(arguments[position])
+                    placemarker = not arguments[position]
+                else:
+                    if position not in expanded:
+                        expanded[position] = self.expand(arguments[position])
+                    argument = expanded[position]
+                    if argument:
+                        first = argument[0]
+                        output.append(
+                            PPToken(
+                                first.kind,
+                                first.value,
+                                first.line,
+                                token.space_before,
+                                first.hide_set,
+                            )
+                        )
+                        output.extend(argument[1:])
+                index += 1
+            else:
+                output.append(token)
+                index += 1
+
+        line = invocation.line
+        result = [
+            PPToken(
+                token.kind,
+                token.value,
+                line,
+                token.space_before,
+                token.hide_set | hide_set,
+            )
+            for token in output
+        ]
+        if result:
+            result[0].space_before = invocation.space_before
+        return result
+
+
+# Macros expanded by the preprocessor itself, or that it doesn't support
+_DYNAMIC_MACROS = frozenset(
+    ("__LINE__", "__FILE__", "__DATE__", "__TIME__", "__COUNTER__", "_Pragma")
+)
+
+
+def _collect_arguments(
+    name: str, macro: Macro, pending: list[PPToken]
+) -> tuple[list[list[PPToken]], PPToken]:
+    """Pops the arguments of the invocation of a function-like macro.
+
+    Args:
+        name: Name of the macro.
+        macro: The invoked macro.
+        pending: The tokens following the name of the macro, in reverse order,
+            starting with the opening parenthesis.
+
+    Raises:
+        ValueError: If the arguments aren't terminated, or if their number doesn't
+            match the parameters of the macro.
+
+    Returns:
+        The arguments, and the closing parenthesis.
+    """
+    assert macro.parameters is not None
+    count = len(macro.parameters)
+    pending.pop()
+    arguments: list[list[PPToken]] = [[]]
+    depth = 0
+    while pending:
+        token = pending.pop()
+        value = token.value
+        if value == "(":
+            depth += 1
+        elif value == ")":
+            if depth == 0:
+                break
+            depth -= 1
+        elif (
+            value == ","
+            and depth == 0
+            and (not macro.variadic or len(arguments) < count)
+        ):
+            arguments.append([])
+            continue
+        arguments[-1].append(token)
+    else:
+        raise ValueError(f"Unterminated argument list invoking macro '{name}'")
+
+    if count == 0 and arguments == [[]]:
+        arguments = []
+    elif macro.variadic and len(arguments) == count - 1:
+        arguments.append([])
+    if len(arguments) != count:
+        raise ValueError(
+            f"Macro '{name}' expects {count} arguments, but {len(arguments)} given"
+        )
+    return arguments, token
+
+
+def _stringize(argument: list[PPToken], operator: PPToken) -> PPToken:
+    """Returns the string literal of the spelling of a macro argument (`#`)."""
+    parts: list[str] = []
+    for token in argument:
+        if token.space_before and parts:
+            parts.append(" ")
+        value = token.value
+        if token.kind == STRING or token.kind == CHARACTER:
+            value = value.replace("\\", "\\\\").replace('"', '\\"')
+        parts.append(value)
+    return PPToken(
+        STRING, '"' + "".join(parts) + '"', operator.line, operator.space_before
+    )
+
+
+def _paste(left: PPToken, right: PPToken) -> PPToken:
+    """Pastes two tokens into one (`##`).
+
+    Raises:
+        ValueError: If the tokens don't form a single valid token.
+    """
+    tokens = tokenize_line(left.value + right.value, left.line)
+    if len(tokens) != 1 or tokens[0].kind == OTHER:
+        raise ValueError(
+            f"Pasting '{left.value}' and '{right.value}' doesn't give a valid "
+            "preprocessing token"
+        )
+    token = tokens[0]
+    token.space_before = left.space_before
+    token.hide_set = left.hide_set
+    return token
+
+
+def _spell(tokens: list[PPToken]) -> str:
+    """Returns the spelling of tokens, separated by their whitespace."""
+    return "".join(
+        (" " if token.space_before and i else "") + token.value
+        for i, token in enumerate(tokens)
+    )
+
+
+def preprocess_file(
+    path: str, include_dirs: Sequence[str] = (), line_markers: bool = False
+) -> str:
+    """Preprocesses a C source file with a new `Preprocessor`.
+
+    Args:
+        path: Path to the C source file.
+        include_dirs: Directories searched for included files, in order.
+        line_markers: Whether to write line markers, as GCC does without `-P`.
+
+    Raises:
+        OSError: If a file can't be read.
+        ValueError: If the code is invalid, or if it has an `#error` directive.
+        NotImplementedError: If the code uses a construct that isn't supported.
+
+    Returns:
+        The preprocessed C code.
+    """
+    stream = StringIO()
+    Preprocessor(include_dirs, line_markers=line_markers).preprocess(path, stream)
+    return stream.getvalue()
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Preprocess a C source file, writing the code to stdout"
+    )
+    parser.add_argument("input_file", help="Path to the C source file")
+    parser.add_argument(
+        "-I",
+        dest="include_dirs",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help="Search DIR for included files",
+    )
+    parser.add_argument(
+        "-P",
+        dest="line_markers",
+        action="store_false",
+        help="Don't write line markers",
+    )
+    args = parser.parse_args(argv)
+
+    preprocessor = Preprocessor(args.include_dirs, line_markers=args.line_markers)
+    try:
+        preprocessor.preprocess(args.input_file, sys.stdout)
+    except (OSError, ValueError, NotImplementedError) as e:
+        logger.error(e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import re
+
+# Kinds of preprocessing tokens, which are the names of the groups of `_TOKEN_PATTERN`
+IDENTIFIER = "identifier"
+NUMBER = "number"
+STRING = "string"
+CHARACTER = "character"
+PUNCTUATOR = "punctuator"
+OTHER = "other"
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<space>[ \t\f\v\r]+)
+    |(?P<string>(?:u8|[uUL])?"(?:[^"\\]|\\.)*")
+    |(?P<character>[uUL]?'(?:[^'\\]|\\.)*')
+    |(?P<number>\.?[0-9](?:[eEpP][+-]|[\w.])*)
+    |(?P<identifier>[A-Za-z_]\w*)
+    |(?P<punctuator>\.\.\.|<<=|>>=|->|\+\+|--|<<|>>|&&|\|\||\#\#|[-+*/%&|^!=<>]=
+        |[][(){}.&*+\-~!/%<>^|?:;=,\#])
+    |(?P<other>.)
+    """,
+    re.VERBOSE,
+)
+
+# Punctuators of more than one character, and their prefixes, used to tell if two
+# tokens written next to each other would be read back as a single one
+PUNCTUATOR_PREFIXES = frozenset(
+    ("...", "..", "<<=", ">>=", "->", "++", "--", "<<", ">>", "&&", "||", "##")
+    + ("<=", ">=", "==", "!=", "+=", "-=", "*=", "/=", "%=", "&=", "|=", "^=")
+)
+
+# Comments and the literals that may contain comment delimiters
+_COMMENT_PATTERN = re.compile(r"\"(?:[^\"\\]|\\.)*\"?|'(?:[^'\\]|\\.)*'?|//|/\*")
+
+# Hide set of the tokens that don't come from a macro expansion
+_NO_NAMES: frozenset[str] = frozenset()
+
+
+class PPToken:
+    """
+    A preprocessing token.
+
+    Besides its kind and its spelling, a token knows the line it comes from, if
+    it's preceded by whitespace, and its hide set: the names of the macros whose
+    expansion produced it, which aren't expanded again in it.
+    """
+
+    __slots__ = ("kind", "value", "line", "space_before", "hide_set")
+
+    def __init__(
+        self,
+        kind: str,
+        value: str,
+        line: int,
+        space_before: bool = False,
+        hide_set: frozenset[str] = _NO_NAMES,
+    ) -> None:
+        self.kind = kind
+        self.value = value
+        self.line = line
+        self.space_before = space_before
+        self.hide_set = hide_set
+
+    def __repr__(self) -> str:
+        return f"<{self.kind}, '{self.value}'>"
+
+
+def tokenize_line(text: str, line: int) -> list[PPToken]:
+    """Splits a logical line into preprocessing tokens.
+
+    Args:
+        text: The logical line, without comments.
+        line: Number of the line, given to the tokens.
+
+    Returns:
+        The tokens of the line.
+    """
+    tokens = []
+    space_before = False
+    for match in _TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == "space":
+            space_before = True
+            continue
+        assert kind is not None
+        tokens.append(PPToken(kind, match.group(), line, space_before))
+        space_before = False
+    return tokens
+
+
+def split_lines(code: str) -> list[tuple[int, str]]:
+    """Splits C source code into logical lines, without comments.
+
+    A backslash at the end of a line joins it with the next one, and comments are
+    replaced by a space. A block comment spanning lines joins them too.
+
+    Args:
+        code: The C source code.
+
+    Raises:
+        ValueError: If a block comment isn't terminated.
+
+    Returns:
+        Pairs of the number of the first physical line of each logical line, and
+        its text.
+    """
+    physical_lines = code.replace("\r\n", "\n").split("\n")
+    lines = []
+    i = 0
+    while i < len(physical_lines):
+        number = i + 1
+        text = physical_lines[i]
+        i += 1
+        while text.endswith("\\") and i < len(physical_lines):
+            text = text[:-1] + physical_lines[i]
+            i += 1
+
+        if "/" not in text:
+            lines.append((number, text))
+            continue
+        parts = []
+        position = 0
+        while (match := _COMMENT_PATTERN.search(text, position)) is not None:
+            delimiter = match.group()
+            if delimiter == "//":
+                break
+            if delimiter != "/*":
+                parts.append(text[position : match.end()])
+                position = match.end()
+                continue
+            parts.append(text[position : match.start()] + " ")
+            end = text.find("*/", match.end())
+            while end < 0 and i < len(physical_lines):
+                text += "\n" + physical_lines[i]
+                i += 1
+                end = text.find("*/", match.end())
+            if end < 0:
+                raise ValueError(f"Unterminated comment starting on line {number}")
+            position = end + 2
+        else:
+            parts.append(text[position:])
+            lines.append((number, "".join(parts)))
+            continue
+        parts.append(text[position : match.start()])
+        lines.append((number, "".join(parts)))
+    return lines
+
+
+def would_paste(previous: PPToken, token: PPToken) -> bool:
+    """Tells if `token` would be read together with `previous` if written after it."""
+    first = token.value[0]
+    kind = previous.kind
+    if kind in (IDENTIFIER, NUMBER):
+        return (
+            first.isalnum()
+            or first in "_.\"'"
+            or (kind == NUMBER and first in "+-" and previous.value[-1] in "eEpP")
+        )
+    if kind == PUNCTUATOR:
+        value = previous.value
+        return (
+            value + first in PUNCTUATOR_PREFIXES
+            or value + token.value[:2] in PUNCTUATOR_PREFIXES
+            or (value == "/" and first in "/*")
+            or (value == "." and first.isdigit())
+        )
+    return False
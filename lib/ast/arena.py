@@ -0,0 +1,442 @@
+from array import array
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from functools import cache
+from weakref import WeakValueDictionary
+
+from lib.ast.ast import ASTNode
+from lib.tree.node import TreeNode
+from lib.tree.traversal import iter_postorder
+from lib.tree.tree import Tree
+
+# Handle of a missing node in the link columns
+NO_NODE = -1
+
+# Attributes of every node, stored in the link and field columns of the arena
+_LINK_SLOTS = frozenset(TreeNode.__slots__) | frozenset(ASTNode.__slots__)
+
+
+class _SlotSpec:
+    """Where the arena stores the attributes declared by a node class.
+
+    Attributes holding a child node are resolved to the child at a given
+    position. An attribute holding a list of nodes is resolved to the children
+    not held by another attribute. The other attributes make up the payload of
+    the node, in declaration order.
+    """
+
+    __slots__ = ("payload", "payload_positions", "children", "child_list")
+
+    def __init__(
+        self, payload: list[str], children: dict[str, int], child_list: str | None
+    ) -> None:
+        self.payload = payload
+        self.payload_positions = {name: i for i, name in enumerate(payload)}
+        # Attribute -> position of the child holding it
+        self.children = children
+        self.child_list = child_list
+
+    @classmethod
+    def from_node(cls, node: ASTNode) -> "_SlotSpec":
+        """Returns the spec of the class of `node`, from its attributes."""
+        children = list(node.children)
+        payload: list[str] = []
+        positions: dict[str, int] = {}
+        child_list = None
+        for klass in reversed(type(node).__mro__):
+            for name in klass.__dict__.get("__slots__", ()):
+                if name in _LINK_SLOTS:
+                    continue
+                value = getattr(node, name, None)
+                if isinstance(value, ASTNode):
+                    position = next(i for i, c in enumerate(children) if c is value)
+                    positions[name] = position
+                elif isinstance(value, list) and all(
+                    isinstance(item, ASTNode) for item in value
+                ):
+                    child_list = name
+                else:
+                    payload.append(name)
+        return cls(payload, positions, child_list)
+
+    @classmethod
+    def from_attributes(
+        cls, payload: Iterator[str], children: Mapping[str, int | Sequence[int]]
+    ) -> "_SlotSpec":
+        """Returns the spec of the attributes given to `ASTArena.add`.
+
+        Raises:
+            ValueError: If an attribute holding a single child follows the one
+                holding a list of children, as its position would vary.
+        """
+        positions: dict[str, int] = {}
+        child_list = None
+        for name, value in children.items():
+            if not isinstance(value, int):
+                child_list = name
+            elif child_list is not None:
+                raise ValueError(
+                    f"Child '{name}' can't follow the list of children '{child_list}'"
+                )
+            else:
+                positions[name] = len(positions)
+        return cls(list(payload), positions, child_list)
+
+
+class ASTArena:
+    """
+    A struct-of-arrays representation of an abstract syntax tree.
+
+    Nodes are integer handles, numbered in the order they're added, into typed
+    column arrays: the kind of each node (an index in `classes`), its parent, first
+    and last children, previous and next siblings (`NO_NODE` if none), its number
+    of children, the index of its payload and the index of its field name.
+    Payloads are the tuples of the attributes of the nodes that aren't nodes
+    themselves, like the value of a constant, and equal payloads are stored once.
+    A tree of a million nodes thus takes a few arrays and no Python object per
+    node.
+
+    Trees are built bottom-up with `add`, as the parser does with
+    `generate_parse_arena`, so children come before their parent and the root is
+    the last node added. `from_tree` stores an existing tree of node objects.
+
+    `node` returns a read-only façade for a handle: an instance of a subclass of
+    the original node class, whose attributes are resolved from the arena when
+    they're read. Code written against the node classes, such as the assembly
+    generation and the code emission, runs unchanged on the façades. Façades
+    don't keep each other alive: a walk of the arena only holds the façades it
+    is visiting, while `node` keeps returning the same façade for a handle as
+    long as it's in use.
+    """
+
+    __slots__ = (
+        "classes",
+        "_specs",
+        "_kinds_by_class",
+        "_kinds",
+        "_parents",
+        "_first_children",
+        "_last_children",
+        "_prev_siblings",
+        "_next_siblings",
+        "_child_counts",
+        "_payload_indices",
+        "_payloads",
+        "_payloads_by_value",
+        "_fields",
+        "_field_names",
+        "_fields_by_name",
+        "_nodes",
+    )
+
+    def __init__(self) -> None:
+        self.classes: list[type] = []
+        self._specs: list[_SlotSpec] = []
+        self._kinds_by_class: dict[type, int] = {}
+        self._kinds = array("B")
+        self._parents = array("i")
+        self._first_children = array("i")
+        self._last_children = array("i")
+        self._prev_siblings = array("i")
+        self._next_siblings = array("i")
+        self._child_counts = array("i")
+        self._payload_indices = array("i")
+        self._payloads: list[tuple] = []
+        self._payloads_by_value: dict[tuple, int] = {}
+        # Field names are indices into `_field_names`, which has no set size
+        self._fields = array("i")
+        self._field_names: list[str] = []
+        self._fields_by_name: dict[str, int] = {}
+        # Façades in use, by handle
+        self._nodes: WeakValueDictionary[int, ASTNode] = WeakValueDictionary()
+
+    @classmethod
+    def from_tree(cls, tree: Tree) -> "ASTArena":
+        """Stores a tree of AST nodes into a new arena.
+
+        Raises:
+            TypeError: If a node of the tree is not an `ASTNode`.
+
+        Returns:
+            The arena, where the root of the tree is the last node.
+        """
+        arena = cls()
+        if tree.root is None:
+            return arena
+        # Handles and field names of the nodes whose parent isn't added yet. The
+        # children of a node are the last nodes added before it
+        pending: list[int] = []
+        pending_fields: list[str | None] = []
+        for node, _ in iter_postorder(tree.root):
+            if not isinstance(node, ASTNode):
+                raise TypeError(f"Expected ASTNode, but got {type(node).__name__}")
+            kind = arena._kinds_by_class.get(type(node))
+            if kind is None:
+                kind = arena._add_class(type(node), _SlotSpec.from_node(node))
+            spec = arena._specs[kind]
+            payload = tuple(getattr(node, name, None) for name in spec.payload)
+            start = len(pending) - node._child_count
+            handle = arena._append(
+                kind, payload, pending[start:], pending_fields[start:]
+            )
+            del pending[start:], pending_fields[start:]
+            pending.append(handle)
+            pending_fields.append(node.field_name)
+        return arena
+
+    def add(
+        self,
+        node_class: type,
+        payload: Mapping[str, object] | None = None,
+        children: Mapping[str, int | Sequence[int]] | None = None,
+        field_names: Mapping[str, str] | None = None,
+    ) -> int:
+        """Adds a node, whose children are already in the arena.
+
+        The attributes of the first node added of a class tell where the arena
+        stores the attributes of the class: the later nodes of the class must be
+        added with the same attributes.
+
+        Args:
+            node_class: The class of the node, a subclass of `ASTNode`.
+            payload: The attributes of the node that aren't nodes, by slot name.
+            children: The handles of the children, by name of the slot holding
+                them: a handle for a single child, or a sequence of handles for a
+                list of children, which must be the last slot.
+            field_names: The field name of the children held by a slot, if any.
+
+        Raises:
+            ValueError: If a child already has a parent, if the list of children
+                isn't the last slot, or if the arena can't hold another class of
+                nodes.
+
+        Returns:
+            The handle of the node.
+        """
+        payload = payload or {}
+        children = children or {}
+        field_names = field_names or {}
+        kind = self._kinds_by_class.get(node_class)
+        if kind is None:
+            spec = _SlotSpec.from_attributes(iter(payload), children)
+            kind = self._add_class(node_class, spec)
+        spec = self._specs[kind]
+
+        handles: list[int] = []
+        fields: list[str | None] = []
+        for name, value in children.items():
+            held = [value] if isinstance(value, int) else list(value)
+            handles += held
+            fields += [field_names.get(name)] * len(held)
+        values = tuple(payload.get(name) for name in spec.payload)
+        return self._append(kind, values, handles, fields)
+
+    def _add_class(self, node_class: type, spec: _SlotSpec) -> int:
+        """Adds a class of nodes, returning its kind.
+
+        Raises:
+            ValueError: If the arena already has as many classes as kinds fit in
+                the kinds array.
+        """
+        if len(self.classes) > 0xFF:
+            raise ValueError("An arena can't hold more than 256 classes of nodes")
+        kind = self._kinds_by_class[node_class] = len(self.classes)
+        self.classes.append(node_class)
+        self._specs.append(spec)
+        return kind
+
+    def _append(
+        self,
+        kind: int,
+        payload: tuple,
+        children: Sequence[int],
+        fields: Sequence[str | None],
+    ) -> int:
+        """Appends a node and links its children to it, returning its handle."""
+        handle = len(self._kinds)
+        for child in children:
+            if self._parents[child] != NO_NODE:
+                raise ValueError(f"Node {child} already has a parent")
+
+        self._kinds.append(kind)
+        payload_index = self._payloads_by_value.get(payload)
+        if payload_index is None:
+            payload_index = self._payloads_by_value[payload] = len(self._payloads)
+            self._payloads.append(payload)
+        self._payload_indices.append(payload_index)
+        self._parents.append(NO_NODE)
+        self._fields.append(NO_NODE)
+        self._first_children.append(children[0] if children else NO_NODE)
+        self._last_children.append(children[-1] if children else NO_NODE)
+        self._prev_siblings.append(NO_NODE)
+        self._next_siblings.append(NO_NODE)
+        self._child_counts.append(len(children))
+
+        previous = NO_NODE
+        for child, field_name in zip(children, fields, strict=True):
+            self._parents[child] = handle
+            if field_name is not None:
+                field = self._fields_by_name.get(field_name)
+                if field is None:
+                    field = self._fields_by_name[field_name] = len(self._field_names)
+                    self._field_names.append(field_name)
+                self._fields[child] = field
+            self._prev_siblings[child] = previous
+            if previous != NO_NODE:
+                self._next_siblings[previous] = child
+            previous = child
+        return handle
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    @property
+    def root(self) -> int:
+        """The handle of the last node added, or `NO_NODE` if the arena is empty."""
+        return len(self._kinds) - 1 if self._kinds else NO_NODE
+
+    def kind(self, handle: int) -> type:
+        """Returns the class of the node `handle`."""
+        return self.classes[self._kinds[handle]]
+
+    def parent(self, handle: int) -> int:
+        return self._parents[handle]
+
+    def first_child(self, handle: int) -> int:
+        return self._first_children[handle]
+
+    def last_child(self, handle: int) -> int:
+        return self._last_children[handle]
+
+    def prev_sibling(self, handle: int) -> int:
+        return self._prev_siblings[handle]
+
+    def next_sibling(self, handle: int) -> int:
+        return self._next_siblings[handle]
+
+    def child_count(self, handle: int) -> int:
+        return self._child_counts[handle]
+
+    def children(self, handle: int) -> Iterator[int]:
+        """Yields the handles of the children of the node `handle`, in order."""
+        child = self._first_children[handle]
+        while child != NO_NODE:
+            yield child
+            child = self._next_siblings[child]
+
+    def payload(self, handle: int) -> tuple:
+        """Returns the payload of the node `handle`."""
+        return self._payloads[self._payload_indices[handle]]
+
+    def field_name(self, handle: int) -> str | None:
+        field = self._fields[handle]
+        return None if field == NO_NODE else self._field_names[field]
+
+    def node(self, handle: int) -> ASTNode | None:
+        """Returns the façade of the node `handle`, or None for `NO_NODE`."""
+        if handle == NO_NODE:
+            return None
+        node = self._nodes.get(handle)
+        if node is None:
+            facade_class = _get_facade_class(self.kind(handle))
+            node = object.__new__(facade_class)
+            object.__setattr__(node, "_arena", self)
+            object.__setattr__(node, "_handle", handle)
+            self._nodes[handle] = node
+        return node
+
+    def to_tree(self) -> Tree:
+        """Returns a tree of façades rooted at the root of the arena."""
+        return Tree(self.node(self.root))
+
+
+class ArenaNode:
+    """Mixin of the façades of arena nodes.
+
+    The slots of a façade are left unset: `__getattr__` resolves them from the
+    arena when they're read. Payloads are then cached in the slot, but nodes
+    aren't, so that a façade doesn't keep its neighbors alive. Façades are
+    read-only, as the arena can't be changed through them.
+    """
+
+    __slots__ = ()
+
+    _arena: ASTArena
+    _handle: int
+
+    def __getattr__(self, name: str):
+        resolve = _LINK_RESOLVERS.get(name)
+        if resolve is not None:
+            return resolve(self._arena, self._handle)
+        value = self._resolve_slot(name)
+        if not isinstance(value, ASTNode | list):
+            object.__setattr__(self, name, value)
+        return value
+
+    def _resolve_slot(self, name: str):
+        arena = self._arena
+        handle = self._handle
+        spec = arena._specs[arena._kinds[handle]]
+        position = spec.payload_positions.get(name)
+        if position is not None:
+            return arena.payload(handle)[position]
+        position = spec.children.get(name)
+        if position is not None:
+            child = arena.first_child(handle)
+            for _ in range(position):
+                child = arena.next_sibling(child)
+            return arena.node(child)
+        if name == spec.child_list:
+            children = arena.children(handle)
+            for _ in spec.children:
+                next(children)
+            return [arena.node(child) for child in children]
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+    def __setattr__(self, name: str, value) -> None:
+        # Trees index their nodes: that's the only state façades can hold
+        if name != "_index":
+            raise AttributeError(f"Arena node {self!r} is read-only")
+        object.__setattr__(self, name, value)
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @parent.setter
+    def parent(self, parent) -> None:
+        raise AttributeError(f"Arena node {self!r} is read-only")
+
+    def insert_before(self, node) -> None:
+        raise AttributeError(f"Arena node {self!r} is read-only")
+
+    def insert_after(self, node) -> None:
+        raise AttributeError(f"Arena node {self!r} is read-only")
+
+
+# Resolvers of the attributes every node has, from the arena and a handle
+_LINK_RESOLVERS: dict[str, Callable[[ASTArena, int], object]] = {
+    "_parent": lambda arena, handle: arena.node(arena._parents[handle]),
+    "_first_child": lambda arena, handle: arena.node(arena._first_children[handle]),
+    "_last_child": lambda arena, handle: arena.node(arena._last_children[handle]),
+    "_prev_sibling": lambda arena, handle: arena.node(arena._prev_siblings[handle]),
+    "_next_sibling": lambda arena, handle: arena.node(arena._next_siblings[handle]),
+    "_child_count": lambda arena, handle: arena._child_counts[handle],
+    "_index": lambda arena, handle: None,
+    "field_name": lambda arena, handle: arena.field_name(handle),
+}
+
+
+@cache
+def _get_facade_class(node_class: type) -> type:
+    """Returns the façade class of `node_class`, with the same name."""
+    return type(
+        node_class.__name__,
+        (ArenaNode, node_class),
+        {
+            "__slots__": ("_arena", "_handle", "__weakref__"),
+            "__module__": node_class.__module__,
+            "__qualname__": node_class.__qualname__,
+        },
+    )
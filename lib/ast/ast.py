@@ -1,5 +1,7 @@
+import io
+import sys
 from abc import abstractmethod
-from typing import Optional
+from typing import Optional, TextIO
 
 from lib.tree.node import TreeNode
 from lib.tree.tree import Tree
@@ -12,6 +14,8 @@ class ASTNode(TreeNode):
     representation rooted at `self`.
     """
 
+    __slots__ = ("field_name",)
+
     @abstractmethod
     def __init__(self, parent: Optional["ASTNode"] = None, **kwargs):
         super().__init__(parent, **kwargs)
@@ -32,27 +36,178 @@ class ASTNode(TreeNode):
         Returns:
             The pretty string representation.
         """
+        stream = io.StringIO()
+        _write_node_repr(self, stream, level, fill, pre, end)
+        return stream.getvalue()
+
+
+# A node with its level, prefix and suffix, a line, or a closing parenthesis
+_StackEntry = tuple[ASTNode | str | None, int, str, str]
+
+# Number of pieces of a representation buffered before writing them
+_BUFFERED_PIECES = 4096
+
+# Written in place of the nodes left out of a representation
+ELISION = "..."
+
+
+def _write_node_repr(
+    root: ASTNode,
+    stream: TextIO,
+    level: int,
+    fill: str,
+    pre: str = "",
+    end: str = "",
+    max_depth: int | None = None,
+    max_nodes: int | None = None,
+    elide_repeats: bool = False,
+) -> None:
+    """Writes the representation of the subtree rooted at `root` to `stream`.
 
-        first_row = fill * level + pre + (f"{self!r}")
-        if self.is_leaf():
-            # Don't open parenthesis
-            return first_row + end
-
-        children_repr = ""
-        for child in self.children:
-            if isinstance(child, ASTNode):
-                pre_child = ""
-                end_child = ",\n" if id(child) != id(self.children[-1]) else ""
-                # Field names are like "name" and "body" in the Function node.
-                if child.field_name is not None:
-                    pre_child = child.field_name + "="
-                child_repr = child.get_node_repr(level + 1, fill, pre_child, end_child)
-                children_repr += child_repr
+    The subtree is walked with an explicit stack holding the nodes to write, each
+    with its level, prefix and suffix, the lines counting elided nodes, and the
+    closing parenthesis of the nodes whose children are being written, marked by
+    None.
+
+    See `write_pretty_ast_repr` for the other arguments.
+
+    Raises:
+        TypeError: If a node of the subtree is not an instance of `ASTNode`.
+    """
+    pieces: list[str] = []
+    written = 0
+    # Limits of the number of nodes and level written, if any
+    last_node = sys.maxsize if max_nodes is None else max_nodes - 1
+    last_level = sys.maxsize if max_depth is None else level + max_depth
+    stack: list[_StackEntry] = [(root, level, pre, end)]
+    while stack:
+        node, node_level, node_pre, node_end = stack.pop()
+        indent = fill * node_level
+        if node is None:
+            pieces.append(f"\n{indent}){node_end}")
+        elif isinstance(node, str):
+            pieces.append(f"{indent}{node}{node_end}")
+        elif written > last_node:
+            # Leave out the node and its next siblings, up to the closing parenthesis
+            pieces.append(indent + ELISION)
+            while stack and stack[-1][0] is not None:
+                stack.pop()
+        else:
+            written += 1
+            if node.is_leaf():
+                # Don't open parenthesis
+                pieces.append(f"{indent}{node_pre}{node!r}{node_end}")
+            elif node_level >= last_level:
+                pieces.append(
+                    f"{indent}{node_pre}{node!r}(\n{indent}{fill}{ELISION}\n"
+                    f"{indent}){node_end}"
+                )
             else:
-                raise TypeError(f"Expected ASTNode, but got {type(child).__name__}")
+                pieces.append(f"{indent}{node_pre}{node!r}(\n")
+                stack.append((None, node_level, "", node_end))
+                _push_children(node, node_level + 1, stack, elide_repeats)
+        if len(pieces) >= _BUFFERED_PIECES:
+            stream.write("".join(pieces))
+            pieces.clear()
+    stream.write("".join(pieces))
+
+
+def _push_children(
+    node: ASTNode,
+    level: int,
+    stack: list[_StackEntry],
+    elide_repeats: bool,
+) -> None:
+    """Pushes the children of `node` on the stack, so the first one is on top.
+
+    With `elide_repeats`, a run of leaves following a leaf with the same field
+    name and representation is replaced by a single line counting them.
+    """
+    if elide_repeats:
+        stack.extend(reversed(_elide_repeats(node, level)))
+        return
+    end = ""
+    child: TreeNode | None = node.children[-1]
+    while child is not None:
+        if not isinstance(child, ASTNode):
+            raise TypeError(f"Expected ASTNode, but got {type(child).__name__}")
+        # Field names are like "name" and "body" in the Function node.
+        field_name = child.field_name
+        pre = "" if field_name is None else field_name + "="
+        stack.append((child, level, pre, end))
+        end = ",\n"
+        child = child.previous_sibling
+
+
+def _elide_repeats(node: ASTNode, level: int) -> list[_StackEntry]:
+    """Returns the stack entries of the children of `node`, in order, where the
+    repeated leaves are replaced by a line counting them."""
+    children: list[_StackEntry] = []
+    previous: tuple[str | None, str] | None = None
+    repeats = 0
+    for child in node.children:
+        if not isinstance(child, ASTNode):
+            raise TypeError(f"Expected ASTNode, but got {type(child).__name__}")
+        key = (child.field_name, repr(child)) if child.is_leaf() else None
+        if key is not None and key == previous:
+            repeats += 1
+            continue
+        if repeats:
+            children.append(_elision(repeats, level))
+            repeats = 0
+        previous = key
+        pre = "" if child.field_name is None else child.field_name + "="
+        children.append((child, level, pre, ",\n"))
+    if repeats:
+        children.append(_elision(repeats, level))
+    last, last_level, last_pre, _ = children[-1]
+    children[-1] = (last, last_level, last_pre, "")
+    return children
+
+
+def _elision(repeats: int, level: int) -> _StackEntry:
+    """Returns a stack entry writing a line counting `repeats` elided siblings."""
+    return (f"{ELISION} ({repeats} more)", level, "", ",\n")
+
+
+def write_pretty_ast_repr(
+    tree: Tree,
+    stream: TextIO,
+    max_depth: int | None = None,
+    max_nodes: int | None = None,
+    elide_repeats: bool = False,
+) -> None:
+    """Writes the pretty string representation of an abstract syntax tree.
+
+    The representation is the one of `generate_pretty_ast_repr`, written to
+    `stream` as it's generated, in linear time and without recursion, so trees of
+    any size and depth can be written. It can be truncated, writing "..." in place
+    of the nodes left out.
+
+    Args:
+        tree: A tree of AST nodes.
+        stream: The text stream to write the representation to.
+        max_depth: The depth of the deepest nodes written, the root being at 0.
+        max_nodes: The number of nodes written.
+        elide_repeats: Whether to replace the repeated leaves following a leaf with
+            the same field name and representation by a line counting them.
 
-        last_row = fill * level + ")" + end
-        return f"{first_row}(\n{children_repr}\n{last_row}"
+    Raises:
+        TypeError: If the root of the tree is not an `ASTNode`.
+    """
+    if not isinstance(tree.root, ASTNode):
+        raise TypeError("Tree root must be an ASTNode.")
+
+    fill = "   "
+    _write_node_repr(
+        tree.root,
+        stream,
+        0,
+        fill,
+        max_depth=max_depth,
+        max_nodes=max_nodes,
+        elide_repeats=elide_repeats,
+    )
 
 
 def generate_pretty_ast_repr(tree: Tree) -> str:
@@ -67,9 +222,6 @@ def generate_pretty_ast_repr(tree: Tree) -> str:
     Returns:
         A formatted string representation of the tree.
     """
-    if not isinstance(tree.root, ASTNode):
-        raise TypeError("Tree root must be an ASTNode.")
-
-    fill = "   "
-    root: ASTNode = tree.root
-    return root.get_node_repr(0, fill)
+    stream = io.StringIO()
+    write_pretty_ast_repr(tree, stream)
+    return stream.getvalue()
@@ -0,0 +1,80 @@
+from collections.abc import Callable
+from typing import Any, ClassVar
+
+from lib.tree.builder import TreeBuilder
+from lib.tree.node import TreeNode
+from lib.tree.tree import Tree
+
+Handler = Callable[[Any, TreeNode], Any]
+
+
+class NodeVisitor:
+    """
+    A base class dispatching nodes to handlers named after their classes.
+
+    `visit` calls the method `visit_<Class>` of the visitor for the first class in
+    the method resolution order of the node that has one, so a handler for an
+    abstract class like `Statement` handles every statement without a handler of
+    its own. Nodes without any handler go to `generic_visit`.
+
+    The handler of a node class is resolved the first time a node of that class
+    is visited, then cached per visitor class: dispatching a node is a single
+    dictionary lookup, however many node classes the visitor handles.
+
+    Example:
+        class ConstantCounter(NodeVisitor):
+            def __init__(self) -> None:
+                self.count = 0
+
+            def visit_Constant(self, node: Constant) -> None:
+                self.count += 1
+    """
+
+    # Handlers by node class, shared by the instances of each visitor class
+    _handlers: ClassVar[dict[type, Handler]] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._handlers = {}
+
+    def visit(self, node: TreeNode) -> Any:
+        """Calls the handler of `node` and returns its result."""
+        handler = self._handlers.get(type(node))
+        if handler is None:
+            handler = self._handlers[type(node)] = self._resolve_handler(type(node))
+        return handler(self, node)
+
+    @classmethod
+    def _resolve_handler(cls, node_class: type) -> Handler:
+        for klass in node_class.__mro__:
+            handler = getattr(cls, f"visit_{klass.__name__}", None)
+            if handler is not None:
+                return handler
+        return cls.generic_visit
+
+    def generic_visit(self, node: TreeNode) -> Any:
+        """Visits the children of `node`, which has no handler."""
+        for child in node.children:
+            self.visit(child)
+
+
+class NodeTransformer(NodeVisitor):
+    """
+    A visitor building a new tree from the nodes returned by its handlers.
+
+    Handlers return the nodes of the new tree, usually after visiting the
+    children of the node they handle. The new tree is built within a
+    `TreeBuilder`, as its nodes are fresh, and the visited tree is left as is.
+    """
+
+    def transform(self, tree: Tree) -> Tree:
+        """Returns the tree rooted at the node returned for the root of `tree`."""
+        with TreeBuilder():
+            root = self.visit(tree.root)
+        return Tree(root)
+
+    def generic_visit(self, node: TreeNode) -> Any:
+        """Raises a RuntimeError, as `node` has no handler to transform it."""
+        raise RuntimeError(
+            f"Node '{node}' cannot be transformed by {type(self).__name__}"
+        )
@@ -0,0 +1,76 @@
+from contextvars import ContextVar, Token
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .node import TreeNode
+
+# The builder in which nodes are currently linked, if any
+active_builder: ContextVar[Optional["TreeBuilder"]] = ContextVar(
+    "active_tree_builder", default=None
+)
+
+
+class TreeBuilder:
+    """
+    A context manager for the trusted bulk construction of trees.
+
+    Setting the parent of a node normally checks that the new parent isn't a
+    descendant of the node, walking up from the parent to its root. Within a
+    builder, the check is skipped and nodes are linked in constant time: the code
+    building the tree is trusted not to create cycles, as when a tree is built
+    bottom-up from fresh nodes.
+
+    With `validate`, the builder records the nodes linked in its context, and
+    checks that none of them is its own ancestor in a single linear pass when the
+    context exits without an exception.
+
+    Example:
+        with TreeBuilder(validate=True):
+            func = Function(parent=None, name=name, body=body)
+    """
+
+    __slots__ = ("_validate", "_linked", "_context_token")
+
+    def __init__(self, validate: bool = False) -> None:
+        self._validate = validate
+        self._linked: list[TreeNode] = []
+        self._context_token: Token | None = None
+
+    def __enter__(self) -> "TreeBuilder":
+        self._context_token = active_builder.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        assert self._context_token is not None
+        active_builder.reset(self._context_token)
+        self._context_token = None
+        linked, self._linked = self._linked, []
+        if exc_type is None and self._validate:
+            self.validate(linked)
+
+    def link(self, node: "TreeNode") -> None:
+        """Records that the parent of `node` is set within the builder."""
+        if self._validate:
+            self._linked.append(node)
+
+    @staticmethod
+    def validate(nodes: list["TreeNode"]) -> None:
+        """Checks that none of `nodes` is its own ancestor.
+
+        Each node is visited once: walking up from a node stops at the first
+        ancestor already known not to be part of a cycle.
+
+        Raises:
+            RuntimeError: If one of the nodes is its own ancestor.
+        """
+        # Ids of the nodes whose ancestors are known to end at a root
+        acyclic: set[int] = set()
+        for node in nodes:
+            path: set[int] = set()
+            v: TreeNode | None = node
+            while v is not None and id(v) not in acyclic:
+                if id(v) in path:
+                    raise RuntimeError(f"{v!r} is its own ancestor")
+                path.add(id(v))
+                v = v.parent
+            acyclic |= path
@@ -0,0 +1,61 @@
+from typing import TYPE_CHECKING
+
+from .traversal import iter_preorder
+
+if TYPE_CHECKING:
+    from .node import TreeNode
+
+
+class TreeIndex:
+    """
+    The number of nodes of a tree and its nodes by class.
+
+    An index belongs to the root of a tree, and every node of the tree points to
+    it. It's built the first time a `Tree` is queried, then kept up to date by
+    `TreeNode` as subtrees are attached to the tree or detached from it, at a
+    cost proportional to the size of the subtree.
+    """
+
+    __slots__ = ("count", "by_type")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.by_type: dict[type, set[TreeNode]] = {}
+
+    @classmethod
+    def build(cls, root: "TreeNode") -> "TreeIndex":
+        """Indexes the tree rooted at `root`, which must not be indexed yet."""
+        index = cls()
+        reindex(root, index)
+        return index
+
+    def nodes_of_type(self, node_type: type | tuple[type, ...]) -> set["TreeNode"]:
+        """Returns the nodes that are instances of `node_type`.
+
+        The cost is proportional to the number of classes in the tree and to the
+        number of nodes returned.
+        """
+        nodes: set[TreeNode] = set()
+        for cls, instances in self.by_type.items():
+            if issubclass(cls, node_type):
+                nodes |= instances
+        return nodes
+
+
+def reindex(root: "TreeNode", index: TreeIndex | None) -> None:
+    """Moves the nodes of the subtree rooted at `root` to `index`.
+
+    The nodes are removed from the index they currently belong to, if any.
+    """
+    old_index = root._index
+    for node, _ in iter_preorder(root):
+        if old_index is not None:
+            old_index.count -= 1
+            instances = old_index.by_type[type(node)]
+            instances.discard(node)
+            if not instances:
+                del old_index.by_type[type(node)]
+        if index is not None:
+            index.count += 1
+            index.by_type.setdefault(type(node), set()).add(node)
+        node._index = index
@@ -1,24 +1,122 @@
-from enum import Enum
-from typing import Optional
+from collections.abc import Iterator, Sequence
+from typing import Optional, overload
 
+from .builder import active_builder
+from .index import TreeIndex, reindex
+from .traversal import Prune, TraversalMode, walk
 
-class TraversalMode(Enum):
-    DEPTH_FIRST = 0
-    BREADTH_FIRST = 1
+
+class ChildrenView(Sequence["TreeNode"]):
+    """A read-only view of the children of a node, in order.
+
+    The length of the view, its first and last children, and membership tests
+    take constant time. Other indices are reached by walking the siblings from the
+    nearest end.
+    """
+
+    __slots__ = ("_node",)
+
+    def __init__(self, node: "TreeNode") -> None:
+        self._node = node
+
+    def __len__(self) -> int:
+        return self._node._child_count
+
+    def __iter__(self) -> Iterator["TreeNode"]:
+        child = self._node._first_child
+        while child is not None:
+            yield child
+            child = child._next_sibling
+
+    def __reversed__(self) -> Iterator["TreeNode"]:
+        child = self._node._last_child
+        while child is not None:
+            yield child
+            child = child._prev_sibling
+
+    def __contains__(self, node: object) -> bool:
+        return isinstance(node, TreeNode) and node._parent is self._node
+
+    @overload
+    def __getitem__(self, index: int) -> "TreeNode": ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list["TreeNode"]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        count = self._node._child_count
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("children index out of range")
+        if index < count // 2:
+            child = self._node._first_child
+            for _ in range(index):
+                child = child._next_sibling
+        else:
+            child = self._node._last_child
+            for _ in range(count - 1 - index):
+                child = child._prev_sibling
+        return child
+
+    def __repr__(self) -> str:
+        return f"ChildrenView({list(self)!r})"
 
 
 class TreeNode:
+    """A node of a tree, linked to its parent and its children.
+
+    Nodes have no instance dictionary: every subclass declares the attributes of
+    its instances in `__slots__`, which keeps large trees compact and attribute
+    access fast. Keyword arguments of the constructor initialize those declared
+    attributes.
+
+    The children of a node form a doubly linked list threaded through the
+    children themselves, so that a node is detached, inserted next to a sibling
+    or moved to its next or previous sibling in constant time.
+
+    Nodes also point to the index of their tree (see `TreeIndex`), once a `Tree`
+    has built it, so that it's updated as subtrees are moved in and out.
+    """
+
+    __slots__ = (
+        "_parent",
+        "_first_child",
+        "_last_child",
+        "_prev_sibling",
+        "_next_sibling",
+        "_child_count",
+        "_index",
+    )
+
     def __init__(self, parent: Optional["TreeNode"] = None, **kwargs) -> None:
-        self.__dict__.update(kwargs)
-        self._children: list[TreeNode] = []
-        self._parent = None
+        for name, value in kwargs.items():
+            setattr(self, name, value)
+        self._parent: TreeNode | None = None
+        self._first_child: TreeNode | None = None
+        self._last_child: TreeNode | None = None
+        self._prev_sibling: TreeNode | None = None
+        self._next_sibling: TreeNode | None = None
+        self._child_count = 0
+        # Index of the tree containing the node, if it's maintained
+        self._index: TreeIndex | None = None
         # Use the property setter for further checks
         if parent is not None:
             self.parent = parent
 
     @property
-    def children(self) -> list["TreeNode"]:
-        return self._children
+    def children(self) -> ChildrenView:
+        return ChildrenView(self)
+
+    @property
+    def next_sibling(self) -> Optional["TreeNode"]:
+        return self._next_sibling
+
+    @property
+    def previous_sibling(self) -> Optional["TreeNode"]:
+        return self._prev_sibling
 
     def iter_path_root(self):
         v = self
@@ -31,51 +129,118 @@ class TreeNode:
         return self._parent
 
     @parent.setter
-    def parent(self, parent: "TreeNode"):
+    def parent(self, parent: Optional["TreeNode"]):
         if parent and not isinstance(parent, TreeNode):
             raise ValueError("Parent must be instance of TreeNode")
-        # Make sure we don't set the parent to a descendant of self
-        self.__check_loop(parent)
+        self.__check_link(parent)
+        self.__move(parent, None)
+
+    def insert_before(self, node: "TreeNode") -> None:
+        """Moves `node` right before `self`, among the children of its parent.
+
+        Raises:
+            ValueError: If `self` has no parent.
+            RuntimeError: If `node` is an ancestor of `self`.
+        """
+        self.__insert_sibling(node, self)
+
+    def insert_after(self, node: "TreeNode") -> None:
+        """Moves `node` right after `self`, among the children of its parent.
+
+        Raises:
+            ValueError: If `self` has no parent.
+            RuntimeError: If `node` is an ancestor of `self`.
+        """
+        self.__insert_sibling(node, self._next_sibling)
+
+    def __insert_sibling(self, node: "TreeNode", before: Optional["TreeNode"]):
+        parent = self._parent
+        if parent is None:
+            raise ValueError(f"{self!r} has no parent to insert {node!r} into")
+        if node is self:
+            return
+        node.__check_link(parent)
+        if before is node:
+            before = node._next_sibling
+        node.__move(parent, before)
+
+    def __check_link(self, parent: Optional["TreeNode"]):
+        builder = active_builder.get()
+        if builder is None:
+            # Make sure we don't set the parent to a descendant of self
+            self.__check_loop(parent)
+        else:
+            # Trusted construction, validated at once by the builder if needed
+            builder.link(self)
+
+    def __move(self, parent: Optional["TreeNode"], before: Optional["TreeNode"]):
         # Update pointers
-        self.__detach(self.parent)
-        self.__attach(parent)
+        old_index = self._index
+        self.__detach()
+        self.__attach(parent, before)
+        # Update the index of the trees the subtree leaves and joins
+        index = parent._index if parent is not None else None
+        if index is not old_index:
+            reindex(self, index)
 
-    def __detach(self, parent: "TreeNode"):
+    def __detach(self):
+        parent = self._parent
         if parent is not None:
-            parent.children.remove(self)
-        self._parent = None
+            prev_sibling, next_sibling = self._prev_sibling, self._next_sibling
+            if prev_sibling is None:
+                parent._first_child = next_sibling
+            else:
+                prev_sibling._next_sibling = next_sibling
+            if next_sibling is None:
+                parent._last_child = prev_sibling
+            else:
+                next_sibling._prev_sibling = prev_sibling
+            parent._child_count -= 1
+        self._parent = self._prev_sibling = self._next_sibling = None
 
-    def __attach(self, parent: "TreeNode"):
+    def __attach(self, parent: Optional["TreeNode"], before: Optional["TreeNode"]):
+        # Links `self` as the child of `parent` before `before`, or last if None
         if parent is not None:
-            parent.children.append(self)
+            if before is None:
+                prev_sibling = parent._last_child
+                parent._last_child = self
+            else:
+                prev_sibling = before._prev_sibling
+                before._prev_sibling = self
+            if prev_sibling is None:
+                parent._first_child = self
+            else:
+                prev_sibling._next_sibling = self
+            self._prev_sibling = prev_sibling
+            self._next_sibling = before
+            parent._child_count += 1
         self._parent = parent
 
-    def __check_loop(self, node: "TreeNode"):
+    def __check_loop(self, node: Optional["TreeNode"]):
         if node is None:
             return
         elif any(v is self for v in node.iter_path_root()):
             raise RuntimeError(f"{self!r} is ancestor of {node!r}")
 
     def is_leaf(self) -> bool:
-        return len(self._children) == 0
+        return self._first_child is None
 
-    def traverse(self, mode: TraversalMode = TraversalMode.DEPTH_FIRST):
+    def traverse(
+        self,
+        mode: TraversalMode = TraversalMode.DEPTH_FIRST,
+        prune: Prune | None = None,
+        node_type: type | tuple[type, ...] | None = None,
+    ) -> Iterator["TreeNode"]:
         """Traverse the tree rooted at `self` using `mode` as traversal mode.
         This is a generator.
 
         Args:
             mode: The traversal mode employed to visit nodes.
+            prune: Tells whether to skip the descendants of a node, given the node
+                and its depth.
+            node_type: Only visit the nodes that are instances of this type.
 
         Returns:
             The next node to be visited.
         """
-        # Generator that yields all the nodes of the tree based on a traversal mode.
-        yield self
-        queue = list(self.children)
-        while queue:
-            yield queue[0]
-            next_nodes = list(queue[0].children)
-            if mode == TraversalMode.DEPTH_FIRST:
-                queue = next_nodes + queue[1:]
-            else:
-                queue = queue[1:] + next_nodes
+        return walk(self, mode, prune, node_type)
@@ -0,0 +1,131 @@
+from collections import deque
+from collections.abc import Callable, Iterator
+from enum import Enum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .node import TreeNode
+
+# Called with a node and its depth before visiting its children. Returning True
+# prunes the subtree: the node itself is still visited, but not its descendants.
+Prune = Callable[["TreeNode", int], bool]
+
+
+class TraversalMode(Enum):
+    DEPTH_FIRST = 0
+    BREADTH_FIRST = 1
+    POST_ORDER = 2
+
+
+def iter_preorder(
+    root: "TreeNode", prune: Prune | None = None
+) -> Iterator[tuple["TreeNode", int]]:
+    """Visits the tree rooted at `root` depth-first, parents before their children.
+
+    Args:
+        root: The root of the tree to visit.
+        prune: Tells whether to skip the descendants of a node.
+
+    Yields:
+        Tuples `(node, depth)`, where the depth of `root` is 0.
+    """
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        yield node, depth
+        if prune is not None and prune(node, depth):
+            continue
+        child = node._last_child
+        while child is not None:
+            stack.append((child, depth + 1))
+            child = child._prev_sibling
+
+
+def iter_postorder(
+    root: "TreeNode", prune: Prune | None = None
+) -> Iterator[tuple["TreeNode", int]]:
+    """Visits the tree rooted at `root` depth-first, children before their parents.
+
+    Args:
+        root: The root of the tree to visit.
+        prune: Tells whether to skip the descendants of a node. It's called when
+            the node is reached, before its descendants would be visited.
+
+    Yields:
+        Tuples `(node, depth)`, where the depth of `root` is 0.
+    """
+    # Nodes are pushed twice: first to expand their children, then to be visited
+    stack = [(root, 0, False)]
+    while stack:
+        node, depth, expanded = stack.pop()
+        if expanded or node._first_child is None:
+            yield node, depth
+            continue
+        if prune is not None and prune(node, depth):
+            yield node, depth
+            continue
+        stack.append((node, depth, True))
+        child = node._last_child
+        while child is not None:
+            stack.append((child, depth + 1, False))
+            child = child._prev_sibling
+
+
+def iter_level_order(
+    root: "TreeNode", prune: Prune | None = None
+) -> Iterator[tuple["TreeNode", int]]:
+    """Visits the tree rooted at `root` breadth-first, one level after the other.
+
+    Args:
+        root: The root of the tree to visit.
+        prune: Tells whether to skip the descendants of a node.
+
+    Yields:
+        Tuples `(node, depth)`, where the depth of `root` is 0.
+    """
+    queue = deque([(root, 0)])
+    while queue:
+        node, depth = queue.popleft()
+        yield node, depth
+        if prune is not None and prune(node, depth):
+            continue
+        child = node._first_child
+        while child is not None:
+            queue.append((child, depth + 1))
+            child = child._next_sibling
+
+
+_ITERATORS = {
+    TraversalMode.DEPTH_FIRST: iter_preorder,
+    TraversalMode.BREADTH_FIRST: iter_level_order,
+    TraversalMode.POST_ORDER: iter_postorder,
+}
+
+
+def walk(
+    root: "TreeNode",
+    mode: TraversalMode = TraversalMode.DEPTH_FIRST,
+    prune: Prune | None = None,
+    node_type: type | tuple[type, ...] | None = None,
+) -> Iterator["TreeNode"]:
+    """Visits the nodes of the tree rooted at `root` in linear time.
+
+    Args:
+        root: The root of the tree to visit.
+        mode: The order in which nodes are visited.
+        prune: Tells whether to skip the descendants of a node.
+        node_type: Only yield the nodes that are instances of this type, or of
+            one of these types. The descendants of the other nodes are still
+            visited.
+
+    Yields:
+        The visited nodes.
+    """
+    nodes = _ITERATORS[mode](root, prune)
+    if node_type is None:
+        for node, _ in nodes:
+            yield node
+    else:
+        for node, _ in nodes:
+            if isinstance(node, node_type):
+                yield node
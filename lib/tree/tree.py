@@ -1,7 +1,19 @@
-from .node import TraversalMode, TreeNode
+from collections.abc import Iterator
+
+from .index import TreeIndex
+from .node import TreeNode
+from .traversal import Prune, TraversalMode, iter_preorder, walk
 
 
 class Tree:
+    """A tree, given by its root node.
+
+    The size of the tree and its nodes by type are answered from an index built
+    at the first query and maintained as nodes are attached and detached (see
+    `TreeIndex`). A tree rooted at a node that has a parent is a view of a
+    subtree: it has no index, and its queries walk the subtree.
+    """
+
     def __init__(self, root: TreeNode | None) -> None:
         self._root = root
 
@@ -13,12 +25,45 @@ class Tree:
     def root(self, value: TreeNode):
         self._root = value
 
+    def _get_index(self) -> TreeIndex | None:
+        """Returns the index of the tree, building it if needed, unless it's a view."""
+        root = self._root
+        if root is None or root.parent is not None:
+            return None
+        if root._index is None:
+            TreeIndex.build(root)
+        return root._index
+
     def __len__(self):
         if self._root is None:
             return 0
-        return len(list(self.traverse()))
+        index = self._get_index()
+        if index is None:
+            return sum(1 for _ in iter_preorder(self._root))
+        return index.count
+
+    def nodes_of_type(self, node_type: type | tuple[type, ...]) -> set[TreeNode]:
+        """Returns the nodes of the tree that are instances of `node_type`.
+
+        Args:
+            node_type: A type, or a tuple of types.
+
+        Returns:
+            The set of matching nodes, in no particular order.
+        """
+        if self._root is None:
+            return set()
+        index = self._get_index()
+        if index is None:
+            return set(walk(self._root, node_type=node_type))
+        return index.nodes_of_type(node_type)
 
-    def traverse(self, mode: TraversalMode = TraversalMode.DEPTH_FIRST):
+    def traverse(
+        self,
+        mode: TraversalMode = TraversalMode.DEPTH_FIRST,
+        prune: Prune | None = None,
+        node_type: type | tuple[type, ...] | None = None,
+    ) -> Iterator[TreeNode]:
         if self._root is None:
             raise RuntimeError("Tree is empty")
-        return self._root.traverse(mode)
+        return self._root.traverse(mode, prune, node_type)
@@ -0,0 +1,174 @@
+import gc
+import unittest
+
+from loguru import logger
+
+from compiler.assembly_generation import assembly_ast
+from compiler.assembly_generation.assembly_generation import generate_assembly_ast
+from compiler.code_emission.code_emission import emit_assembly_code
+from compiler.lexer.lexer import tokenize_code
+from compiler.parser.parser import generate_parse_arena, generate_parse_tree
+from compiler.parser.parser_ast import Binary, Constant, Function, Program, Unary
+from lib.ast.arena import NO_NODE, ASTArena
+from lib.ast.ast import generate_pretty_ast_repr
+from lib.tree.node import TreeNode
+from lib.tree.tree import Tree
+
+logger.remove()
+
+
+class TestASTArena(unittest.TestCase):
+    def setUp(self) -> None:
+        code = "int main(void) { return -(1 - ~2) - 1; }"
+        self.parse_tree = generate_parse_tree(tokenize_code(code))
+        self.arena = ASTArena.from_tree(self.parse_tree)
+
+    def test_columns(self):
+        arena = self.arena
+        self.assertEqual(len(arena), 11)
+        root = arena.root
+        self.assertEqual(root, 10)
+        self.assertIs(arena.kind(root), Program)
+        self.assertEqual(arena.parent(root), NO_NODE)
+        self.assertListEqual(list(arena.children(root)), [9])
+        self.assertIs(arena.kind(9), Function)
+        self.assertListEqual(
+            [arena.field_name(child) for child in arena.children(9)], ["name", "body"]
+        )
+        self.assertEqual(arena.child_count(9), 2)
+        name, body = arena.children(9)
+        self.assertEqual(arena.last_child(9), body)
+        self.assertEqual(arena.prev_sibling(body), name)
+        self.assertEqual(arena.next_sibling(name), body)
+
+        constants = [h for h in range(len(arena)) if arena.kind(h) is Constant]
+        self.assertListEqual(
+            [arena.payload(h) for h in constants], [("1",), ("2",), ("1",)]
+        )
+        # Equal payloads are stored once
+        self.assertIs(arena.payload(constants[0]), arena.payload(constants[2]))
+
+    def test_facades(self):
+        tree = self.arena.to_tree()
+        self.assertEqual(
+            generate_pretty_ast_repr(tree), generate_pretty_ast_repr(self.parse_tree)
+        )
+
+        root = tree.root
+        self.assertIsInstance(root, Program)
+        self.assertIs(root, self.arena.node(self.arena.root))
+        self.assertIsNone(root.parent)
+        binary = root.function_definition.body.exp
+        self.assertIsInstance(binary, Binary)
+        self.assertIsInstance(binary.left, Unary)
+        self.assertIs(binary.left.parent, binary)
+        self.assertIs(binary.left.next_sibling, binary.right)
+        self.assertIs(binary.right.previous_sibling, binary.left)
+        self.assertEqual(binary.right.value, "1")
+        self.assertEqual(len(tree), 11)
+        self.assertEqual(len(tree.nodes_of_type(Constant)), 3)
+
+    def test_parse_arena(self):
+        code = "int main(void) { return -(1 - ~2) - 1; }"
+        arena = generate_parse_arena(tokenize_code(code))
+        self.assertEqual(len(arena), len(self.arena))
+        for handle in range(len(arena)):
+            self.assertIs(arena.kind(handle), self.arena.kind(handle))
+            self.assertEqual(arena.payload(handle), self.arena.payload(handle))
+            self.assertEqual(arena.field_name(handle), self.arena.field_name(handle))
+            self.assertListEqual(
+                list(arena.children(handle)), list(self.arena.children(handle))
+            )
+        self.assertEqual(
+            generate_pretty_ast_repr(arena.to_tree()),
+            generate_pretty_ast_repr(self.parse_tree),
+        )
+
+    def test_facades_are_not_retained(self):
+        tree = self.arena.to_tree()
+        self.assertEqual(sum(1 for _ in tree.traverse()), 11)
+        gc.collect()
+        # Only the root is still in use
+        self.assertEqual(len(self.arena._nodes), 1)
+
+    def test_wide_node(self):
+        arena = ASTArena()
+        name = arena.add(assembly_ast.Identifier, payload={"_value": "main"})
+        body = [arena.add(assembly_ast.Return) for _ in range(1000)]
+        with self.assertRaises(ValueError):
+            arena.add(assembly_ast.Function, children={"_body": body, "_name": name})
+        function = arena.add(
+            assembly_ast.Function,
+            children={"_name": name, "_body": body},
+            field_names={"_name": "name"},
+        )
+        arena.add(assembly_ast.Program, children={"_func_def": function})
+        self.assertEqual(arena.child_count(function), 1001)
+        self.assertEqual(arena.last_child(function), body[-1])
+        with self.assertRaises(ValueError):
+            arena.add(assembly_ast.Program, children={"_func_def": function})
+
+        tree = arena.to_tree()
+        facade = tree.root.function_definition
+        self.assertEqual(facade.name.value, "main")
+        self.assertEqual(len(facade.body), 1000)
+        self.assertIs(facade.children[-1].previous_sibling, facade.children[-2])
+        self.assertEqual(emit_assembly_code(tree).count("ret"), 1000)
+
+    def test_many_field_names(self):
+        arena = ASTArena()
+        for i in range(300):
+            leaf = arena.add(assembly_ast.Return)
+            arena.add(
+                assembly_ast.Program,
+                children={"_func_def": leaf},
+                field_names={"_func_def": f"field{i}"},
+            )
+        self.assertEqual(arena.field_name(leaf), "field299")
+
+    def test_many_classes(self):
+        arena = ASTArena()
+        for i in range(256):
+            node_class = type(f"Return{i}", (assembly_ast.Return,), {"__slots__": ()})
+            arena.add(node_class)
+        with self.assertRaises(ValueError):
+            arena.add(type("Return", (assembly_ast.Return,), {"__slots__": ()}))
+        self.assertEqual(len(arena), 256)
+
+    def test_read_only(self):
+        constant = next(iter(self.arena.to_tree().nodes_of_type(Constant)))
+        with self.assertRaises(AttributeError):
+            constant.value = "3"
+        with self.assertRaises(AttributeError):
+            constant.parent = None
+        with self.assertRaises(AttributeError):
+            constant.insert_after(Constant(None, "3"))
+
+    def test_code_generation(self):
+        code = "int main(void) { return 2; }"
+        parse_tree = generate_parse_tree(tokenize_code(code))
+        assembly_tree = generate_assembly_ast(parse_tree)
+        arena_assembly_tree = generate_assembly_ast(
+            ASTArena.from_tree(parse_tree).to_tree()
+        )
+        self.assertEqual(
+            generate_pretty_ast_repr(arena_assembly_tree),
+            generate_pretty_ast_repr(assembly_tree),
+        )
+        self.assertEqual(
+            emit_assembly_code(ASTArena.from_tree(assembly_tree).to_tree()),
+            emit_assembly_code(assembly_tree),
+        )
+
+    def test_empty_tree(self):
+        arena = ASTArena.from_tree(Tree(None))
+        self.assertEqual(len(arena), 0)
+        self.assertIsNone(arena.to_tree().root)
+
+    def test_not_ast_node(self):
+        with self.assertRaises(TypeError):
+            ASTArena.from_tree(Tree(TreeNode()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,14 @@
+import io
 import unittest
 
 from loguru import logger
 
+from compiler.assembly_generation import assembly_ast
 from compiler.assembly_generation.assembly_generation import generate_assembly_ast
-from compiler.lexer.lexer import Token
+from compiler.lexer.lexer import Token, tokenize_code
 from compiler.parser.parser import generate_parse_tree
-from lib.ast.ast import generate_pretty_ast_repr
+from lib.ast.ast import generate_pretty_ast_repr, write_pretty_ast_repr
+from lib.tree.tree import Tree
 
 logger.remove()
 
@@ -57,5 +60,57 @@ class TestAstChapter01(unittest.TestCase):
         self.assertEqual(expected, actual)
 
 
+class TestWritePrettyAstRepr(unittest.TestCase):
+    def write(self, tree: Tree, **kwargs) -> str:
+        stream = io.StringIO()
+        write_pretty_ast_repr(tree, stream, **kwargs)
+        return stream.getvalue()
+
+    def test_truncation(self):
+        tree = generate_parse_tree(tokenize_code("int main(void) { return -1 - 2; }"))
+        self.assertEqual(self.write(tree), generate_pretty_ast_repr(tree))
+        self.assertEqual(
+            self.write(tree, max_depth=1),
+            "Program(\n   Function(\n      ...\n   )\n)",
+        )
+        self.assertEqual(
+            self.write(tree, max_nodes=4),
+            "Program(\n"
+            "   Function(\n"
+            "      name=Identifier(main),\n"
+            "      body=Return(\n"
+            "         ...\n"
+            "      )\n"
+            "   )\n"
+            ")",
+        )
+        self.assertEqual(self.write(tree, max_nodes=0), "...")
+
+    def test_elide_repeats(self):
+        instructions = [assembly_ast.Return(parent=None) for _ in range(5)]
+        name = assembly_ast.Identifier(parent=None, value="main")
+        function = assembly_ast.Function(
+            parent=None, identifier=name, body=instructions
+        )
+        expected = (
+            "Function(\n   name=Identifier(main),\n   Return,\n   ... (4 more)\n)"
+        )
+        self.assertEqual(self.write(Tree(function), elide_repeats=True), expected)
+
+    def test_deep_tree(self):
+        # Lines are indented by their depth, so the size of the representation
+        # grows with the square of the depth
+        depth = 3_000
+        code = f"int main(void) {{ return {'- ' * depth}1; }}"
+        representation = self.write(generate_parse_tree(tokenize_code(code)))
+        self.assertEqual(representation.count("Unary(Negate)"), depth)
+        self.assertEqual(representation.count("\n"), 2 * depth + 7)
+
+        code = f"int main(void) {{ return {'- ' * 100_000}1; }}"
+        tree = generate_parse_tree(tokenize_code(code))
+        representation = self.write(tree, max_depth=10)
+        self.assertEqual(representation.count("Unary(Negate)"), 8)
+
+
 if __name__ == "__main__":
     unittest.main()
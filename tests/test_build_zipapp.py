@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from compiler.build_zipapp import build_zipapp
+
+
+class TestBuildZipapp(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.archive = os.path.join(self.directory.name, "c-compiler.pyz")
+        build_zipapp(self.archive)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def run_archive(self, code: str, *args: str) -> subprocess.CompletedProcess:
+        """Runs the archive on a source file containing `code`."""
+        source_file = os.path.join(self.directory.name, "prog.c")
+        with open(source_file, "w") as f:
+            f.write(code)
+        return subprocess.run(
+            [sys.executable, self.archive, source_file, *args],
+            # The archive mustn't import the compiler from the repository
+            cwd=self.directory.name,
+            env={k: v for k, v in os.environ.items() if k != "PYTHONPATH"},
+            capture_output=True,
+            text=True,
+        )
+
+    def test_build_zipapp(self):
+        process = self.run_archive(
+            "int main(void) { return 2; }", "--parse", "--dump=parse"
+        )
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, "prog.parse")))
+
+    def test_exit_status(self):
+        process = self.run_archive("int main(void) { return; }", "--parse")
+        self.assertNotEqual(process.returncode, 0)
+
+    def test_missing_package(self):
+        with tempfile.TemporaryDirectory() as directory, self.assertRaises(ValueError):
+            build_zipapp(os.path.join(directory, "a.pyz"), ["no_such_package"])
+
+
+if __name__ == "__main__":
+    unittest.main()
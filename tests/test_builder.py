@@ -0,0 +1,69 @@
+import unittest
+
+from loguru import logger
+
+from lib.tree.builder import TreeBuilder, active_builder
+from tests.tree_fixture import DataNode
+
+logger.remove()
+
+
+class TestTreeBuilder(unittest.TestCase):
+    def test_links_children(self):
+        with TreeBuilder(validate=True):
+            root = DataNode(data="r")
+            child = DataNode(parent=root, data="r-1")
+            grandchild = DataNode(parent=child, data="1-2")
+
+        self.assertListEqual(list(root.children), [child])
+        self.assertListEqual(list(child.children), [grandchild])
+        self.assertIs(grandchild.parent, child)
+
+    def test_bottom_up_construction(self):
+        with TreeBuilder(validate=True):
+            leaf = DataNode(data="leaf")
+            for depth in range(10_000):
+                node = DataNode(data=depth)
+                leaf.parent = node
+                leaf = node
+
+        self.assertIsNone(leaf.parent)
+
+    def test_skips_loop_check(self):
+        with TreeBuilder():
+            a = DataNode(data="a")
+            b = DataNode(parent=a, data="b")
+            # Trusted: the cycle isn't detected
+            a.parent = b
+
+        self.assertIs(a.parent, b)
+        self.assertIs(b.parent, a)
+
+    def test_validate_detects_cycle(self):
+        with (
+            self.assertRaisesRegex(RuntimeError, "is its own ancestor"),
+            TreeBuilder(validate=True),
+        ):
+            a = DataNode(data="a")
+            b = DataNode(parent=a, data="b")
+            c = DataNode(parent=b, data="c")
+            a.parent = c
+
+    def test_restores_checks_on_exit(self):
+        with TreeBuilder():
+            self.assertIsNotNone(active_builder.get())
+            a = DataNode(data="a")
+            b = DataNode(parent=a, data="b")
+        self.assertIsNone(active_builder.get())
+
+        with self.assertRaises(RuntimeError):
+            a.parent = b
+
+    def test_restores_checks_on_exception(self):
+        with self.assertRaises(ValueError), TreeBuilder():
+            raise ValueError
+        self.assertIsNone(active_builder.get())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import io
+import unittest
+
+from loguru import logger
+
+from compiler.assembly_generation.assembly_generation import generate_assembly_ast
+from compiler.code_emission.code_emission import emit_assembly_code, write_assembly_code
+from compiler.lexer.lexer import tokenize_code
+from compiler.parser.parser import generate_parse_tree
+from lib.tree.tree import Tree
+
+logger.remove()
+
+
+class RecordingStream(io.StringIO):
+    """A text stream recording the size of every write."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes: list[int] = []
+
+    def write(self, s: str) -> int:
+        self.writes.append(len(s))
+        return super().write(s)
+
+
+class TestCodeEmission(unittest.TestCase):
+    def setUp(self) -> None:
+        parse_tree = generate_parse_tree(tokenize_code("int main(void) { return 2; }"))
+        self.assembly_tree = generate_assembly_ast(parse_tree)
+
+    def test_emit_assembly_code(self):
+        self.assertEqual(
+            emit_assembly_code(self.assembly_tree),
+            "\t.intel_syntax noprefix\n"
+            "\t.global main\n"
+            "main:\n"
+            "\tmov\teax, 2\n"
+            "\tret\n"
+            '\t.section .note.GNU-stack,"",@progbits\n',
+        )
+
+    def test_write_assembly_code(self):
+        expected = emit_assembly_code(self.assembly_tree)
+
+        stream = RecordingStream()
+        write_assembly_code(self.assembly_tree, stream)
+        self.assertEqual(stream.getvalue(), expected)
+        # The code is small enough to be written at once
+        self.assertListEqual(stream.writes, [len(expected)])
+
+        stream = RecordingStream()
+        write_assembly_code(self.assembly_tree, stream, buffer_size=20)
+        self.assertEqual(stream.getvalue(), expected)
+        self.assertGreater(len(stream.writes), 1)
+        self.assertTrue(all(size < 20 + 40 for size in stream.writes))
+
+    def test_not_program(self):
+        with self.assertRaises(TypeError):
+            write_assembly_code(
+                Tree(self.assembly_tree.root.children[0]), io.StringIO()
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
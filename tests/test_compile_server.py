@@ -0,0 +1,205 @@
+import os
+import socket
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from loguru import logger
+
+from compiler import compile_client
+from compiler.compile_client import SOCKET_ENV_VAR, connect, send_request
+from compiler.compile_server import CompileServer, remove_stale_socket
+
+logger.remove()
+
+
+class TestCompileServer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.directory.name, "server.sock")
+        self.files = []
+        for i, code in enumerate(("return 1;", "return;")):
+            path = os.path.join(self.directory.name, f"prog{i}.c")
+            with open(path, "w") as f:
+                f.write(f"int main(void) {{ {code} }}")
+            self.files.append(path)
+
+        # Worker threads stand for the worker processes of the server
+        self.executors = [ThreadPoolExecutor(max_workers=1)]
+        self.server = CompileServer(self.socket_path, self.executors.pop)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        environment = mock.patch.dict(os.environ, {SOCKET_ENV_VAR: self.socket_path})
+        environment.start()
+        self.addCleanup(environment.stop)
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def request(self, **kwargs) -> dict:
+        request = {
+            "input_files": self.files[:1],
+            "stage": "codegen",
+            "dumps": [],
+            "preprocessor": "builtin",
+            "include_dirs": [],
+            "assembler": "builtin",
+            "jobs": 1,
+            "log_level": "INFO",
+        }
+        request.update(kwargs)
+        with connect(self.socket_path) as client:
+            return send_request(client, request)
+
+    def test_socket_permissions(self):
+        status = os.stat(self.socket_path)
+        self.assertEqual(stat.S_IMODE(status.st_mode), 0o600)
+
+    def test_compile(self):
+        response = self.request()
+        self.assertEqual(response["status"], 0)
+        self.assertIn("Running lexer", response["log"])
+
+        response = self.request(input_files=self.files, dumps=["parse"])
+        self.assertEqual(response["status"], 1)
+        self.assertIn(f"Failed to compile '{self.files[1]}'", response["log"])
+        self.assertIn("1 of 2 files failed to compile", response["log"])
+        self.assertTrue(os.path.exists(self.files[0].removesuffix(".c") + ".parse"))
+
+    def test_invalid_request(self):
+        with connect(self.socket_path) as client:
+            response = send_request(client, {"input_files": self.files})
+        self.assertEqual(response["status"], 2)
+
+    def test_jobs(self):
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def compile_file(*args) -> tuple[int, str]:
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return 0, ""
+
+        self.server.executor.shutdown()
+        self.server.executor = ThreadPoolExecutor(max_workers=4)
+        with mock.patch("compiler.compile_server.compile_file_with_log", compile_file):
+            for jobs in (1, 2):
+                with self.subTest(jobs=jobs):
+                    peak = 0
+                    response = self.request(input_files=self.files[:1] * 4, jobs=jobs)
+                    self.assertEqual(response["status"], 0)
+                    self.assertLessEqual(peak, jobs)
+
+    def test_client(self):
+        with mock.patch("sys.stderr"):
+            self.assertEqual(compile_client.main([self.files[0], "--parse"]), 0)
+            self.assertEqual(compile_client.main([*self.files, "--parse"]), 1)
+
+    def test_client_without_server(self):
+        os.environ[SOCKET_ENV_VAR] = self.socket_path + ".missing"
+        with mock.patch(
+            "compiler.compiler_driver.compile_files", return_value=0
+        ) as compile_files:
+            self.assertEqual(compile_client.main([self.files[0], "--lex"]), 0)
+        compile_files.assert_called_once_with(
+            [self.files[0]], "lex", frozenset(), 1, "builtin", [], "builtin"
+        )
+
+    def test_broken_executor(self):
+        # The pool of the server breaks when its worker fails to start, like
+        # when a worker process is killed
+        def fail() -> None:
+            raise RuntimeError
+
+        self.server.executor.shutdown()
+        self.server.executor = ThreadPoolExecutor(max_workers=1, initializer=fail)
+        self.executors.append(ThreadPoolExecutor(max_workers=1))
+        response = self.request()
+        self.assertEqual(response["status"], 1)
+        self.assertIn(f"Failed to compile '{self.files[0]}'", response["log"])
+        self.assertEqual(self.request()["status"], 0)
+        self.assertListEqual(self.executors, [])
+
+    def test_client_request_fails(self):
+        with (
+            mock.patch.object(compile_client, "send_request", side_effect=OSError),
+            mock.patch("compiler.compiler_driver.compile_files") as compile_files,
+            mock.patch("sys.stderr"),
+        ):
+            self.assertEqual(compile_client.main([self.files[0], "--lex"]), 1)
+        compile_files.assert_not_called()
+
+    def test_socket_path(self):
+        self.assertEqual(compile_client.get_socket_path(), self.socket_path)
+        del os.environ[SOCKET_ENV_VAR]
+        with mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": self.directory.name}):
+            self.assertEqual(
+                compile_client.get_socket_path(),
+                os.path.join(self.directory.name, "c-compiler.sock"),
+            )
+
+        private_dir = os.path.join(self.directory.name, f"c-compiler-{os.getuid()}")
+        with (
+            mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": ""}),
+            mock.patch("tempfile.tempdir", self.directory.name),
+        ):
+            self.assertEqual(
+                compile_client.get_socket_path(),
+                os.path.join(private_dir, "server.sock"),
+            )
+            self.assertEqual(stat.S_IMODE(os.stat(private_dir).st_mode), 0o700)
+
+            # Other users could replace the socket of a shared directory
+            os.chmod(private_dir, 0o777)
+            with self.assertRaises(RuntimeError):
+                compile_client.get_socket_path()
+
+    def test_remove_stale_socket(self):
+        with self.assertRaises(RuntimeError):
+            remove_stale_socket(self.socket_path)
+
+        # Closing a bound socket leaves its file behind
+        stale_path = os.path.join(self.directory.name, "stale.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(stale_path)
+        with (
+            mock.patch("os.unlink", side_effect=PermissionError),
+            self.assertRaises(RuntimeError),
+        ):
+            remove_stale_socket(stale_path)
+        remove_stale_socket(stale_path)
+        self.assertFalse(os.path.exists(stale_path))
+        remove_stale_socket(stale_path)
+
+    def test_remove_stale_socket_not_socket(self):
+        with self.assertRaises(RuntimeError):
+            remove_stale_socket(self.files[0])
+        self.assertTrue(os.path.exists(self.files[0]))
+
+    def test_remove_stale_socket_of_other_user(self):
+        stale_path = os.path.join(self.directory.name, "stale.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(stale_path)
+        with (
+            mock.patch("os.getuid", return_value=os.getuid() + 1),
+            self.assertRaises(RuntimeError),
+        ):
+            remove_stale_socket(stale_path)
+        self.assertTrue(os.path.exists(stale_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
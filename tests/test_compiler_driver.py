@@ -0,0 +1,187 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from loguru import logger
+
+from compiler.code_emission.code_emission import write_assembly_code
+from compiler.compiler_driver import (
+    STAGE_MODULES,
+    compile_files,
+    dump_tree,
+    gcc_assemble_and_link,
+    gcc_compile_code,
+    get_dump_file,
+    main,
+    preprocess,
+)
+from compiler.driver_arguments import dump_stages_type, jobs_type
+from compiler.lexer.lexer import tokenize_code
+from compiler.parser.parser import generate_parse_tree
+from lib.ast.ast import generate_pretty_ast_repr
+
+logger.remove()
+
+
+class TestDumps(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tree = generate_parse_tree(tokenize_code("int main(void) { return 2; }"))
+
+    def test_dump_stages_type(self):
+        self.assertEqual(dump_stages_type("parse, asm"), {"parse", "asm"})
+        self.assertEqual(dump_stages_type(""), set())
+        with self.assertRaises(argparse.ArgumentTypeError):
+            dump_stages_type("parse,lex")
+
+    def test_get_dump_file(self):
+        self.assertEqual(get_dump_file("prog", {"parse"}, "parse"), "prog.parse")
+        self.assertIsNone(get_dump_file("prog", {"parse"}, "codegen"))
+        self.assertIsNone(get_dump_file(None, {"parse"}, "parse"))
+        self.assertEqual(get_dump_file("prog", {"preprocess"}, "preprocess"), "prog.i")
+        self.assertEqual(get_dump_file("prog", {"asm"}, "asm"), "prog.s")
+
+    def test_dump_is_lazy(self):
+        expected = generate_pretty_ast_repr(self.tree)
+        with mock.patch(
+            "lib.ast.ast.generate_pretty_ast_repr", wraps=lambda tree: "repr"
+        ) as pretty_repr:
+            # No sink handles debug logs
+            dump_tree(self.tree, "parse")
+            pretty_repr.assert_not_called()
+
+            messages: list[str] = []
+            handler = logger.add(messages.append, level="DEBUG", format="{message}")
+            try:
+                with tempfile.TemporaryDirectory() as directory:
+                    dump_file = os.path.join(directory, "prog.parse")
+                    dump_tree(self.tree, "parse", dump_file)
+                    with open(dump_file) as f:
+                        self.assertEqual(f.read(), f"{expected}\n")
+            finally:
+                logger.remove(handler)
+            # The log reads the representation back from the file
+            pretty_repr.assert_not_called()
+            self.assertIn(f"Parse tree:\n{expected}\n", messages)
+
+
+class TestBatchCompilation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.files = []
+        for i in range(4):
+            code = "return;" if i == 2 else f"return {i};"
+            self.files.append(self.write(f"prog{i}.c", f"int main(void) {{ {code} }}"))
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_jobs_type(self):
+        self.assertEqual(jobs_type("3"), 3)
+        self.assertGreaterEqual(jobs_type("0"), 1)
+        for invalid in ("-1", "many"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                jobs_type(invalid)
+
+    def test_compile_files(self):
+        valid = [file for i, file in enumerate(self.files) if i != 2]
+        self.assertEqual(compile_files(valid, "codegen", jobs=2), 0)
+        self.assertEqual(compile_files(self.files, "codegen", jobs=2), 1)
+        self.assertEqual(compile_files(self.files, "lex"), 0)
+
+    def test_response_file(self):
+        response_file = self.write("files.txt", "\n".join(self.files[:2]) + "\n")
+        dumps = [file.removesuffix(".c") + ".parse" for file in self.files]
+
+        status = main([f"@{response_file}", self.files[3], "--parse", "--dump=parse"])
+
+        self.assertEqual(status, 0)
+        self.assertListEqual(
+            [os.path.exists(dump) for dump in dumps], [True, True, False, True]
+        )
+
+    def test_build_without_intermediate_files(self):
+        executable = self.files[1].removesuffix(".c")
+        self.assertEqual(main([self.files[1]]), 0)
+        self.assertEqual(subprocess.run([executable]).returncode, 1)
+        self.assertListEqual(
+            sorted(os.listdir(self.directory.name)),
+            ["prog0.c", "prog1", "prog1.c", "prog2.c", "prog3.c"],
+        )
+
+    def test_save_temps(self):
+        executable = self.files[3].removesuffix(".c")
+        self.assertEqual(main([self.files[3], "--save-temps"]), 0)
+        self.assertEqual(subprocess.run([executable]).returncode, 3)
+        with open(f"{executable}.i") as f:
+            self.assertEqual(f.read().strip(), "int main(void) { return 3; }")
+        with open(f"{executable}.s") as f:
+            self.assertIn("mov\teax, 3", f.read())
+        self.assertTrue(os.path.exists(f"{executable}.o"))
+
+    def test_save_temps_encoding_error(self):
+        path = self.write("big.c", "int main(void) { return 4294967296; }")
+        self.assertEqual(main([path, "--save-temps"]), 1)
+        self.assertFalse(os.path.exists(path.removesuffix(".c") + ".o"))
+
+    def test_gcc_assembler_emission_error(self):
+        def fail_after_writing(tree, stream):
+            write_assembly_code(tree, stream)
+            raise RuntimeError("Emission failed")
+
+        executable = self.files[3].removesuffix(".c")
+        with mock.patch(
+            "compiler.code_emission.code_emission.write_assembly_code",
+            fail_after_writing,
+        ):
+            self.assertEqual(main([self.files[3], "--assembler=gcc"]), 1)
+        self.assertFalse(os.path.exists(executable))
+
+    def test_gcc_compile_code(self):
+        assembly_file = self.files[3].removesuffix(".c") + ".s"
+        executable = self.files[3].removesuffix(".c")
+        gcc_compile_code(preprocess(self.files[3]), assembly_file)
+        gcc_assemble_and_link(assembly_file, executable)
+        self.assertEqual(subprocess.run([executable]).returncode, 3)
+
+    def test_assemblers(self):
+        executable = self.files[3].removesuffix(".c")
+        for assembler in ("builtin", "gcc"):
+            with self.subTest(assembler=assembler):
+                self.assertEqual(main([self.files[3], f"--assembler={assembler}"]), 0)
+                self.assertEqual(subprocess.run([executable]).returncode, 3)
+                self.assertFalse(os.path.exists(f"{executable}.o"))
+
+
+class TestStartup(unittest.TestCase):
+    def test_stages_are_imported_lazily(self):
+        code = "import sys, compiler.compiler_driver; print(*sys.modules, sep='\\n')"
+        process = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        modules = set(process.stdout.splitlines())
+        for module in STAGE_MODULES:
+            self.assertNotIn(module, modules)
+        # Startup time is checked by the modules imported, which, unlike the
+        # time taken, doesn't depend on the machine
+        self.assertSetEqual(
+            {
+                module
+                for module in modules
+                if module.split(".")[0] in ("compiler", "lib")
+            },
+            {"compiler", "compiler.compiler_driver", "compiler.driver_arguments"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import random
+import unittest
+
+from loguru import logger
+
+from compiler.lexer.symbol_table import SymbolTable
+from compiler.lexer.token_stream import TokenStream
+from compiler.parser.incremental import IncrementalDocument
+from compiler.parser.parser import generate_parse_tree
+from lib.ast.ast import generate_pretty_ast_repr
+
+logger.remove()
+
+
+class TestIncrementalDocument(unittest.TestCase):
+    code = "int main(void) {\n    return -(1 - ~2) - 3;\n}\n"
+
+    def assertMatchesFullParse(self, document: IncrementalDocument):
+        expected_tokens = TokenStream.from_code(document.code)
+        tokens = document.tokens
+        self.assertListEqual(
+            [(token.type, token.value) for token in tokens],
+            [(token.type, token.value) for token in expected_tokens],
+        )
+        self.assertListEqual(
+            [tokens.span(i) for i in range(len(tokens))],
+            [expected_tokens.span(i) for i in range(len(expected_tokens))],
+        )
+        assert document.tree is not None
+        self.assertEqual(
+            generate_pretty_ast_repr(document.tree),
+            generate_pretty_ast_repr(generate_parse_tree(expected_tokens)),
+        )
+
+    def test_symbols(self):
+        symbols = SymbolTable()
+        code = "int main(void) { return 1; }"
+        document = IncrementalDocument(code, symbols)
+        main = symbols.lookup("main")
+        self.assertIsNotNone(main)
+
+        document.edit(code.index("1"), 1, "2")
+        self.assertEqual(document.tokens[1].symbol, main)
+        document.edit(code.index("main"), 4, "start")
+        self.assertEqual(document.tokens[1].symbol, symbols.lookup("start"))
+        self.assertNotEqual(document.tokens[1].symbol, main)
+
+    def test_edit_expression(self):
+        document = IncrementalDocument(self.code)
+        offset = self.code.index("3")
+
+        document.edit(offset, 1, "(4 - 5)")
+
+        self.assertEqual(document.code, self.code.replace("3", "(4 - 5)"))
+        self.assertMatchesFullParse(document)
+
+    def test_edit_name_reuses_body(self):
+        document = IncrementalDocument(self.code)
+        assert document.tree is not None
+        body = document.tree.root.function_definition.body
+
+        tree = document.edit(self.code.index("main") + 4, 0, "2")
+
+        function = tree.root.function_definition
+        self.assertEqual(function.name.value, "main2")
+        self.assertIs(function.body, body)
+        self.assertIs(body.parent, function)
+        self.assertMatchesFullParse(document)
+
+    def test_reused_nodes_stay_reusable(self):
+        document = IncrementalDocument(self.code)
+        assert document.tree is not None
+        body = document.tree.root.function_definition.body
+
+        for i, char in enumerate("_name"):
+            document.edit(self.code.index("main") + 4 + i, 0, char)
+
+        assert document.tree is not None
+        self.assertIs(document.tree.root.function_definition.body, body)
+        self.assertMatchesFullParse(document)
+
+    def test_edit_whitespace_keeps_tree(self):
+        document = IncrementalDocument(self.code)
+        tree = document.tree
+
+        output = document.edit(self.code.index("return") + 6, 1, "  \n\t")
+
+        self.assertIs(output, tree)
+        self.assertMatchesFullParse(document)
+
+    def test_edit_merges_tokens(self):
+        document = IncrementalDocument(self.code)
+        offset = self.code.index("- 3")
+
+        # "- 3" becomes "-- 3", which isn't a valid expression
+        with self.assertRaises(SyntaxError):
+            document.edit(offset, 0, "-")
+        self.assertIsNone(document.tree)
+
+        document.edit(offset, 1, "")
+        self.assertMatchesFullParse(document)
+
+    def test_edit_unrecognized_sequence(self):
+        document = IncrementalDocument(self.code)
+        tree = document.tree
+
+        with self.assertRaises(ValueError):
+            document.edit(self.code.index("3"), 0, "@")
+
+        self.assertEqual(document.code, self.code)
+        self.assertIs(document.tree, tree)
+
+    def test_edit_out_of_code(self):
+        document = IncrementalDocument(self.code)
+
+        with self.assertRaises(ValueError):
+            document.edit(len(self.code), 1, "")
+
+    def test_random_edits(self):
+        rnd = random.Random(0)
+        pieces = ["-", "~", "(", ")", " ", "\n", "1", "23", "x", "main", "--"]
+        for _ in range(200):
+            document = IncrementalDocument(self.code)
+            for _ in range(10):
+                code = document.code
+                offset = rnd.randrange(len(code) + 1)
+                removed = rnd.randrange(min(3, len(code) - offset) + 1)
+                inserted = "".join(rnd.choices(pieces, k=rnd.randrange(3)))
+                try:
+                    document.edit(offset, removed, inserted)
+                except ValueError:
+                    self.assertEqual(document.code, code)
+                    continue
+                except SyntaxError:
+                    with self.assertRaises(SyntaxError):
+                        generate_parse_tree(TokenStream.from_code(document.code))
+                    continue
+                self.assertMatchesFullParse(document)
+
+
+if __name__ == "__main__":
+    unittest.main()
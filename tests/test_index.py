@@ -0,0 +1,97 @@
+import random
+import unittest
+from typing import cast
+
+from loguru import logger
+
+from lib.tree.traversal import walk
+from lib.tree.tree import Tree
+from tests.tree_fixture import DataNode, LeafNode, TreeTestCase
+
+logger.remove()
+
+
+class TestTreeIndex(TreeTestCase):
+    def data_of_type(self, tree: Tree, node_type: type[DataNode]) -> list[str]:
+        return sorted(
+            cast(DataNode, node).data for node in tree.nodes_of_type(node_type)
+        )
+
+    def test_queries(self):
+        self.assertEqual(len(self.tree), 7)
+        self.assertListEqual(
+            self.data_of_type(self.tree, LeafNode), ["1-4", "1-5", "3-6", "r-2"]
+        )
+        self.assertEqual(len(self.tree.nodes_of_type(DataNode)), 7)
+        self.assertEqual(len(self.tree.nodes_of_type((LeafNode, int))), 4)
+
+    def test_index_follows_attach_and_detach(self):
+        self.assertEqual(len(self.tree), 7)
+
+        added = LeafNode(parent=self.child_r_3, data="added")
+        self.assertEqual(len(self.tree), 8)
+        self.assertIn(added, self.tree.nodes_of_type(LeafNode))
+
+        self.child_r_1.parent = None
+        self.assertEqual(len(self.tree), 5)
+        self.assertListEqual(
+            self.data_of_type(self.tree, LeafNode), ["3-6", "added", "r-2"]
+        )
+        self.assertEqual(len(Tree(self.child_r_1)), 3)
+
+        # Attaching an indexed tree moves its nodes to the index of the new tree
+        self.child_r_3.insert_after(self.child_r_1)
+        self.assertEqual(len(self.tree), 8)
+        self.assertListEqual(
+            self.data_of_type(self.tree, LeafNode),
+            ["1-4", "1-5", "3-6", "added", "r-2"],
+        )
+
+    def test_subtree_view(self):
+        self.assertEqual(len(self.tree), 7)
+        view = Tree(self.child_r_1)
+
+        self.assertEqual(len(view), 3)
+        self.assertListEqual(self.data_of_type(view, LeafNode), ["1-4", "1-5"])
+        LeafNode(parent=self.child_r_1, data="added")
+        self.assertEqual(len(view), 4)
+        self.assertEqual(len(self.tree), 8)
+
+    def test_root_attached_to_another_tree(self):
+        other = DataNode(data="other")
+        self.assertEqual(len(self.tree), 7)
+        self.assertEqual(len(Tree(other)), 1)
+
+        self.root.parent = other
+
+        self.assertEqual(len(Tree(other)), 8)
+        # The tree became a view of a subtree
+        self.assertEqual(len(self.tree), 7)
+
+    def test_random_moves(self):
+        rnd = random.Random(0)
+        nodes = [self.root] + list(self.root.traverse())[1:]
+        for i in range(200):
+            nodes.append(rnd.choice([DataNode, LeafNode])(data=i))
+        self.assertEqual(len(self.tree), 7)
+
+        for _ in range(2000):
+            node, target = rnd.sample(nodes, 2)
+            if node is self.root:
+                continue
+            try:
+                if rnd.random() < 0.5 or target.parent is None:
+                    node.parent = target
+                else:
+                    target.insert_before(node)
+            except RuntimeError:
+                continue
+            self.assertEqual(len(self.tree), sum(1 for _ in walk(self.root)))
+            self.assertSetEqual(
+                self.tree.nodes_of_type(LeafNode),
+                set(walk(self.root, node_type=LeafNode)),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
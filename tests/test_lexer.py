@@ -1,13 +1,17 @@
 import os
+import random
 import subprocess
 import unittest
-from tempfile import NamedTemporaryFile
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from unittest.mock import patch
 
 from loguru import logger
 
 import compiler.lexer.lexer as lexer
 from compiler.compiler_driver import gcc_preprocess
+from compiler.lexer import dfa
 from compiler.lexer.lexer import Token
+from compiler.lexer.symbol_table import SymbolTable
 
 logger.remove()
 
@@ -283,5 +287,226 @@ class TestLexerChapter02(unittest.TestCase):
         self.assertListEqual(tokens, expected_list)
 
 
+class TestLexerScanner(unittest.TestCase):
+    def test_tokenize_code_matches_tokenize(self):
+        path = os.path.join("tests/test_samples/chapter_2", "valid", "nested_ops_2.c")
+        with NamedTemporaryFile(suffix=".i") as preprocessed_file:
+            gcc_preprocess(path, preprocessed_file.name)
+            tokens = lexer.tokenize(preprocessed_file.name)
+            with open(preprocessed_file.name) as file:
+                code = file.read()
+        self.assertListEqual(lexer.tokenize_code(code), tokens)
+
+    def test_scan_tokens_offsets(self):
+        code = "  int main\n(--x);"
+        expected = [
+            (Token.TokenType.IntKeyword, 2, 5),
+            (Token.TokenType.Identifier, 6, 10),
+            (Token.TokenType.OpenParenthesis, 11, 12),
+            (Token.TokenType.MinusMinus, 12, 14),
+            (Token.TokenType.Identifier, 14, 15),
+            (Token.TokenType.CloseParenthesis, 15, 16),
+            (Token.TokenType.Semicolon, 16, 17),
+        ]
+        self.assertListEqual(list(lexer.scan_tokens(code)), expected)
+
+    def test_scan_tokens_keyword_prefix_is_identifier(self):
+        tokens = lexer.tokenize_code("integer returns voids int")
+        self.assertListEqual(
+            [token.type for token in tokens],
+            [
+                Token.TokenType.Identifier,
+                Token.TokenType.Identifier,
+                Token.TokenType.Identifier,
+                Token.TokenType.IntKeyword,
+            ],
+        )
+
+    def test_scan_tokens_unrecognized_sequence(self):
+        with self.assertRaisesRegex(ValueError, "Unrecognized sequence: '@b;"):
+            lexer.tokenize_code("return @b;")
+
+
+class TestLexerEngines(unittest.TestCase):
+    # Pieces of code the corpus is generated from, including invalid sequences
+    # and characters on the edge of the token patterns
+    fragments = [
+        "int", "void", "return", "main", "integer", "_x1", "ré", "x٣", "0", "42",
+        "007", "1foo", "3٣", "(", ")", "{", "}", ";", "-", "--", "~", " ", "\n",
+        "\t", "\u3000", "\x1c", "@", "\\", "`", "$",
+    ]  # fmt: skip
+
+    def generate_corpus(self, seed: int, size: int) -> list[str]:
+        rng = random.Random(seed)
+        corpus = []
+        for _ in range(size):
+            length = rng.randint(0, 30)
+            corpus.append("".join(rng.choices(self.fragments, k=length)))
+        return corpus
+
+    def tokenize_or_error(self, code: str, engine: str) -> list[Token] | str:
+        try:
+            return lexer.tokenize_code(code, engine=engine)
+        except ValueError as e:
+            return str(e)
+
+    def test_dispatch_engine_matches_regex_engine(self):
+        for code in self.generate_corpus(seed=0, size=2000):
+            with self.subTest(code=code):
+                self.assertEqual(
+                    self.tokenize_or_error(code, "dispatch"),
+                    self.tokenize_or_error(code, "regex"),
+                )
+
+    def test_dfa_engine_matches_regex_engine(self):
+        # Generate the tables into a cache of the test, not the user's one
+        cache_dir = TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        environ = patch.dict(os.environ, {"C_COMPILER_CACHE_DIR": cache_dir.name})
+        environ.start()
+        self.addCleanup(environ.stop)
+        dfa.get_tables.cache_clear()
+        self.addCleanup(dfa.get_tables.cache_clear)
+
+        for code in self.generate_corpus(seed=1, size=2000):
+            with self.subTest(code=code):
+                self.assertEqual(
+                    self.tokenize_or_error(code, "dfa"),
+                    self.tokenize_or_error(code, "regex"),
+                )
+        self.assertEqual(len(os.listdir(cache_dir.name)), 1)
+
+    def test_dispatch_engine_on_samples(self):
+        path = os.path.join(
+            "tests/test_samples/chapter_2", "valid", "redundant_parens.c"
+        )
+        with NamedTemporaryFile(suffix=".i") as preprocessed_file:
+            gcc_preprocess(path, preprocessed_file.name)
+            self.assertListEqual(
+                lexer.tokenize(preprocessed_file.name, engine="dispatch"),
+                lexer.tokenize(preprocessed_file.name),
+            )
+
+    def test_invalid_engine(self):
+        with self.assertRaises(ValueError):
+            lexer.tokenize_code("int", engine="unknown")
+
+
+class TestLexerDFA(unittest.TestCase):
+    def test_minimized_dfa(self):
+        # Both patterns match any non-empty sequence of 'a' and 'b', which a
+        # single accepting state can recognize after the start state.
+        for pattern in ("(a|b)+", "[ab][ab]*|(a|b)(a|b)+"):
+            with self.subTest(pattern=pattern):
+                tables = dfa.build_tables([("X", pattern)])
+                self.assertEqual(tables.num_states, 2)
+                self.assertEqual(tables.accepts, [-1, 0])
+
+    def test_first_rule_wins(self):
+        tables = dfa.build_tables([("Keyword", "if"), ("Name", "[a-z]+")])
+        state = 0
+        for char in "if":
+            column = tables.symbol_classes[dfa.classify_char(char)]
+            state = tables.transitions[state * tables.num_classes + column]
+        self.assertEqual(tables.rules[tables.accepts[state]], "Keyword")
+
+    def test_unsupported_patterns(self):
+        for pattern in ("a\\bc", "(a", "a|*", "[z-a]", "é", "a*"):
+            with self.subTest(pattern=pattern), self.assertRaises(ValueError):
+                dfa.build_tables([("X", pattern)])
+
+    def test_tables_are_cached_by_specification(self):
+        specification = dfa.token_specification()
+        with TemporaryDirectory() as cache_dir:
+            tables = dfa.load_tables(specification, cache_dir)
+            (cached_file,) = os.listdir(cache_dir)
+            self.assertIn(dfa.specification_hash(specification)[:16], cached_file)
+            self.assertEqual(dfa.load_tables(specification, cache_dir), tables)
+
+            changed = specification + [("Plus", "\\+")]
+            dfa.load_tables(changed, cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_corrupted_cache_is_rebuilt(self):
+        specification = dfa.token_specification()
+        with TemporaryDirectory() as cache_dir:
+            tables = dfa.load_tables(specification, cache_dir)
+            (cached_file,) = os.listdir(cache_dir)
+            with open(os.path.join(cache_dir, cached_file), "w") as file:
+                file.write("{")
+            self.assertEqual(dfa.load_tables(specification, cache_dir), tables)
+
+
+class TestLexerSymbols(unittest.TestCase):
+    def test_identifiers_are_interned(self):
+        symbols = SymbolTable()
+        tokens = lexer.tokenize_code("foo bar foo int foo", symbols)
+        foo_tokens = [token for token in tokens if token.value == "foo"]
+
+        self.assertEqual(len(symbols), 2)
+        self.assertEqual(symbols.spelling(foo_tokens[0].symbol), "foo")
+        self.assertEqual({token.symbol for token in foo_tokens}, {0})
+        self.assertTrue(all(token.value is foo_tokens[0].value for token in foo_tokens))
+        self.assertEqual(tokens[1].symbol, symbols.lookup("bar"))
+
+    def test_keywords_are_not_interned(self):
+        symbols = SymbolTable()
+        tokens = lexer.tokenize_code("int void return", symbols)
+        self.assertEqual(len(symbols), 0)
+        self.assertTrue(all(token.symbol is None for token in tokens))
+
+    def test_symbol_table_is_shared_across_files(self):
+        symbols = SymbolTable()
+        lexer.tokenize_code("main", symbols)
+        tokens = list(lexer.iter_tokens_from_chunks(["other main"], symbols))
+        self.assertListEqual([token.symbol for token in tokens], [1, 0])
+
+
+class TestLexerStreaming(unittest.TestCase):
+    code = "int main(void)\n{\n    return -(~(--counter_10 - 123));\n}\n" * 8
+
+    def test_iter_tokens_small_chunks(self):
+        expected = lexer.tokenize_code(self.code)
+        with NamedTemporaryFile("w", suffix=".i") as source_file:
+            source_file.write(self.code)
+            source_file.flush()
+            # Small chunks make most tokens straddle a chunk boundary
+            for chunk_size in (1, 2, 3, 7, 64, 1 << 16):
+                with self.subTest(chunk_size=chunk_size):
+                    tokens = list(lexer.iter_tokens(source_file.name, chunk_size))
+                    self.assertListEqual(tokens, expected)
+
+    def test_iter_tokens_empty_file(self):
+        with NamedTemporaryFile(suffix=".i") as source_file:
+            self.assertListEqual(list(lexer.iter_tokens(source_file.name)), [])
+
+    def test_iter_tokens_from_chunks_without_whitespace(self):
+        chunks = ["int", "main", "(", "void", "){", "return", "--", "1;}"]
+        self.assertListEqual(
+            list(lexer.iter_tokens_from_chunks(chunks)),
+            lexer.tokenize_code("".join(chunks)),
+        )
+
+    def test_iter_tokens_from_chunks_other_whitespace(self):
+        chunks = ["int\rmain", "(void)\f{", "\vreturn", "\r\n1;}"]
+        self.assertListEqual(
+            list(lexer.iter_tokens_from_chunks(chunks)),
+            lexer.tokenize_code("".join(chunks)),
+        )
+
+    def test_iter_tokens_carries_over_at_most_a_token(self):
+        code = "-(~(--counter_10-123));" * 1000
+        chunks = [code[i : i + 7] for i in range(0, len(code), 7)]
+        with patch.object(lexer, "scan_tokens", wraps=lexer.scan_tokens) as scan:
+            tokens = list(lexer.iter_tokens_from_chunks(chunks))
+        self.assertListEqual(tokens, lexer.tokenize_code(code))
+        longest = max(len(call.args[0]) for call in scan.call_args_list)
+        self.assertLessEqual(longest, 7 + len("counter_10"))
+
+    def test_iter_tokens_unrecognized_sequence(self):
+        with self.assertRaises(ValueError):
+            list(lexer.iter_tokens_from_chunks(["return 1", "foo;"]))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,158 @@
+import io
+import os
+import struct
+import subprocess
+import tempfile
+import unittest
+
+from loguru import logger
+
+import compiler.assembly_generation.assembly_ast as assembly_ast
+from compiler.assembly_generation.assembly_generation import generate_assembly_ast
+from compiler.code_emission.code_emission import emit_assembly_code
+from compiler.code_emission.elf_object import write_object_file
+from compiler.code_emission.machine_code import (
+    REGISTERS,
+    FunctionSymbol,
+    encode_machine_code,
+)
+from compiler.lexer.lexer import tokenize_code
+from compiler.parser.parser import generate_parse_tree
+from lib.tree.tree import Tree
+
+logger.remove()
+
+
+def build_program(instructions: list[assembly_ast.Instruction]) -> Tree:
+    """Builds the assembly AST of a `main` function with the given instructions."""
+    name = assembly_ast.Identifier(parent=None, value="main")
+    function = assembly_ast.Function(parent=None, identifier=name, body=instructions)
+    return Tree(assembly_ast.Program(function))
+
+
+def mov(source: assembly_ast.Operand, destination: str) -> assembly_ast.Mov:
+    """Builds a Mov instruction into the register named `destination`."""
+    destination_register = assembly_ast.Register(parent=None, name=destination)
+    return assembly_ast.Mov(
+        parent=None, source=source, destination=destination_register
+    )
+
+
+def read_sections(data: bytes) -> dict[str, bytes]:
+    """Returns the content of the sections of an ELF64 object file, by name."""
+    section_headers_offset = struct.unpack_from("<Q", data, 40)[0]
+    num_sections, names_index = struct.unpack_from("<HH", data, 60)
+    headers = [
+        struct.unpack_from("<IIQQQQIIQQ", data, section_headers_offset + 64 * index)
+        for index in range(num_sections)
+    ]
+    names_offset = headers[names_index][4]
+    sections = {}
+    for name, _, _, _, offset, size, *_ in headers[1:]:
+        start = names_offset + name
+        section_name = data[start : data.index(b"\0", start)].decode()
+        sections[section_name] = data[offset : offset + size]
+    return sections
+
+
+def gcc_assemble(tree: Tree) -> bytes:
+    """Assembles the code emitted from an assembly AST with GCC."""
+    with tempfile.TemporaryDirectory() as directory:
+        object_file = os.path.join(directory, "prog.o")
+        subprocess.run(
+            ["gcc", "-c", "-masm=intel", "-x", "assembler", "-", "-o", object_file],
+            input=emit_assembly_code(tree),
+            text=True,
+            check=True,
+        )
+        with open(object_file, "rb") as f:
+            return f.read()
+
+
+class TestMachineCode(unittest.TestCase):
+    def test_same_as_gcc(self):
+        instructions: list[assembly_ast.Instruction] = []
+        for register in REGISTERS:
+            for value in ("0", "1", "2147483647", "4294967295", "017"):
+                immediate = assembly_ast.Immediate(parent=None, value=value)
+                instructions.append(mov(immediate, register))
+            for source in ("eax", "r9d", "rcx", "r15"):
+                if REGISTERS[source][1] == REGISTERS[register][1]:
+                    instructions.append(
+                        mov(assembly_ast.Register(parent=None, name=source), register)
+                    )
+        instructions.append(assembly_ast.Return(parent=None))
+        tree = build_program(instructions)
+
+        machine_code = encode_machine_code(tree)
+        expected = read_sections(gcc_assemble(tree))[".text"]
+        self.assertEqual(machine_code.text.hex(" "), expected.hex(" "))
+        self.assertListEqual(
+            machine_code.symbols, [FunctionSymbol("main", 0, len(expected))]
+        )
+
+    def test_errors(self):
+        immediate = assembly_ast.Immediate(parent=None, value="4294967296")
+        with self.assertRaises(ValueError):
+            encode_machine_code(build_program([mov(immediate, "eax")]))
+
+        register = assembly_ast.Register(parent=None, name="rax")
+        with self.assertRaises(SyntaxError):
+            encode_machine_code(build_program([mov(register, "eax")]))
+
+        with self.assertRaises(RuntimeError):
+            encode_machine_code(build_program([mov(immediate, "xmm0")]))
+
+        destination = assembly_ast.Immediate(parent=None, value="1")
+        instruction = assembly_ast.Mov(
+            parent=None, source=immediate, destination=destination
+        )
+        with self.assertRaises(SyntaxError):
+            encode_machine_code(build_program([instruction]))
+
+    def test_not_program(self):
+        tree = build_program([assembly_ast.Return(parent=None)])
+        with self.assertRaises(TypeError):
+            encode_machine_code(Tree(tree.root.children[0]))
+
+
+class TestElfObject(unittest.TestCase):
+    def setUp(self) -> None:
+        parse_tree = generate_parse_tree(tokenize_code("int main(void) { return 7; }"))
+        self.assembly_tree = generate_assembly_ast(parse_tree)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_sections(self):
+        stream = io.BytesIO()
+        write_object_file(self.assembly_tree, stream)
+        sections = read_sections(stream.getvalue())
+        expected = read_sections(gcc_assemble(self.assembly_tree))
+        self.assertEqual(sections[".text"], expected[".text"])
+        self.assertEqual(sections[".note.GNU-stack"], b"")
+        self.assertListEqual(sections[".strtab"].split(b"\0"), [b"", b"main", b""])
+
+    def test_link(self):
+        object_file = os.path.join(self.directory.name, "prog.o")
+        executable = os.path.join(self.directory.name, "prog")
+        with open(object_file, "wb") as f:
+            write_object_file(self.assembly_tree, f)
+
+        symbols = subprocess.run(
+            ["nm", object_file], capture_output=True, text=True, check=True
+        )
+        self.assertEqual(symbols.stdout, "0000000000000000 T main\n")
+        # The linker warns about objects without a .note.GNU-stack section
+        link = subprocess.run(
+            ["gcc", "-Wl,--fatal-warnings", object_file, "-o", executable],
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(link.returncode, 0, link.stderr)
+        self.assertEqual(subprocess.run([executable]).returncode, 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
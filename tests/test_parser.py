@@ -13,13 +13,18 @@ from compiler.parser.parser import (
     parse_return_statement,
 )
 from compiler.parser.parser_ast import (
+    Binary,
+    BinaryOperator,
     Constant,
     Function,
     Identifier,
     Program,
     Return,
     Statement,
+    Unary,
+    UnaryOperator,
 )
+from compiler.parser.token_cursor import TokenCursor
 from lib.tree.tree import Tree
 
 logger.remove()
@@ -44,13 +49,24 @@ class TestParserChapter01(unittest.TestCase):
 
         self.assertIsInstance(output, Tree)
 
+    def test_run_does_not_modify_token_list(self):
+        tokens = self.valid_return_program_token_list.copy()
+        generate_parse_tree(tokens)
+
+        self.assertListEqual(tokens, self.valid_return_program_token_list)
+
+    def test_run_token_iterator(self):
+        output = generate_parse_tree(iter(self.valid_return_program_token_list))
+
+        self.assertIsInstance(output.root, Program)
+
     def test_parse_program_valid_token_list(self):
-        output = parse_program(self.valid_return_program_token_list.copy())
+        output = parse_program(TokenCursor(self.valid_return_program_token_list))
 
         self.assertIsInstance(output, Program)
 
     def test_parse_program_child_check(self):
-        output = parse_program(self.valid_return_program_token_list.copy())
+        output = parse_program(TokenCursor(self.valid_return_program_token_list))
 
         self.assertTrue(
             any(isinstance(child, Function) for child in output.children),
@@ -61,17 +77,17 @@ class TestParserChapter01(unittest.TestCase):
         with self.assertRaises(SyntaxError):
             list_with_junk = self.valid_return_program_token_list.copy()
             list_with_junk.append(Token(Token.TokenType.CloseBrace))
-            parse_program(list_with_junk)
+            parse_program(TokenCursor(list_with_junk))
 
     def test_parse_function_valid_token_list(self):
-        output = parse_function(self.valid_return_program_token_list.copy())
+        output = parse_function(TokenCursor(self.valid_return_program_token_list))
 
         self.assertIsInstance(output, Function)
         self.assertIsInstance(output.name, Identifier)
         self.assertIsInstance(output.body, Return)
 
     def test_parse_function_child_check(self):
-        output = parse_function(self.valid_return_program_token_list.copy())
+        output = parse_function(TokenCursor(self.valid_return_program_token_list))
 
         self.assertTrue(
             any(isinstance(child, Statement) for child in output.children),
@@ -93,7 +109,7 @@ class TestParserChapter01(unittest.TestCase):
         ]
 
         with self.assertRaises(SyntaxError):
-            parse_function(tokens)
+            parse_function(TokenCursor(tokens))
 
     def test_parse_function_invalid_identifier(self):
         tokens = [
@@ -110,7 +126,7 @@ class TestParserChapter01(unittest.TestCase):
         ]
 
         with self.assertRaises(SyntaxError):
-            parse_function(tokens)
+            parse_function(TokenCursor(tokens))
 
     def test_parse_function_invalid_expression(self):
         tokens = [
@@ -127,7 +143,7 @@ class TestParserChapter01(unittest.TestCase):
         ]
 
         with self.assertRaises(SyntaxError):
-            parse_function(tokens)
+            parse_function(TokenCursor(tokens))
 
     def test_parse_return_statement_valid_token_list(self):
         tokens = [
@@ -136,7 +152,7 @@ class TestParserChapter01(unittest.TestCase):
             Token(Token.TokenType.Semicolon),
         ]
 
-        output = parse_return_statement(tokens)
+        output = parse_return_statement(TokenCursor(tokens))
 
         self.assertIsInstance(output, Return)
         self.assertEqual(output.parent, None)
@@ -148,7 +164,7 @@ class TestParserChapter01(unittest.TestCase):
             Token(Token.TokenType.Semicolon),
         ]
 
-        output = parse_return_statement(tokens)
+        output = parse_return_statement(TokenCursor(tokens))
 
         self.assertTrue(
             any(isinstance(child, Constant) for child in output.children),
@@ -167,29 +183,36 @@ class TestParserChapter01(unittest.TestCase):
         ]
 
         with self.assertRaises(SyntaxError):
-            parse_return_statement(tokens)
+            parse_return_statement(TokenCursor(tokens))
 
     def test_parse_identifier_valid_token_type(self):
         token = Token(Token.TokenType.Identifier, "test_value")
         tokens = [token]
 
-        output = parse_identifier(tokens)
+        output = parse_identifier(TokenCursor(tokens))
 
         self.assertIsInstance(output, Identifier)
         self.assertEqual(output.parent, None)
         self.assertEqual(output.value, "test_value")
 
+    def test_parse_identifier_keeps_symbol(self):
+        tokens = [Token(Token.TokenType.Identifier, "main", 3)]
+
+        output = parse_identifier(TokenCursor(tokens))
+
+        self.assertEqual(output.symbol, 3)
+
     def test_parse_identifier_invalid_token_type(self):
         tokens = [Token(Token.TokenType.Constant)]
 
         with self.assertRaises(SyntaxError):
-            parse_identifier(tokens)
+            parse_identifier(TokenCursor(tokens))
 
     def test_parse_expression_valid_token_type(self):
         token = Token(Token.TokenType.Constant, 1)
         tokens = [token]
 
-        output = parse_expression(tokens)
+        output = parse_expression(TokenCursor(tokens))
 
         self.assertIsInstance(output, Constant)
         self.assertEqual(output.parent, None)
@@ -199,12 +222,12 @@ class TestParserChapter01(unittest.TestCase):
         tokens = [Token(Token.TokenType.Identifier)]
 
         with self.assertRaises(SyntaxError):
-            parse_expression(tokens)
+            parse_expression(TokenCursor(tokens))
 
     def test_expect_token_type_valid_token(self):
         tokens = [Token(Token.TokenType.IntKeyword)]
 
-        output = expect_token_type(Token.TokenType.IntKeyword, tokens)
+        output = expect_token_type(Token.TokenType.IntKeyword, TokenCursor(tokens))
 
         self.assertIsInstance(output, Token)
         self.assertEqual(output.type, Token.TokenType.IntKeyword)
@@ -215,11 +238,142 @@ class TestParserChapter01(unittest.TestCase):
         ]
 
         with self.assertRaises(SyntaxError):
-            expect_token_type(Token.TokenType.IntKeyword, tokens)
+            expect_token_type(Token.TokenType.IntKeyword, TokenCursor(tokens))
 
     def test_expect_token_type_empty_list(self):
         with self.assertRaises(SyntaxError):
-            expect_token_type(Token.TokenType.IntKeyword, [])
+            expect_token_type(Token.TokenType.IntKeyword, TokenCursor([]))
+
+
+class TestParserExpressions(unittest.TestCase):
+    constant = Token(Token.TokenType.Constant, 1)
+    minus = Token(Token.TokenType.Minus, "-")
+    complement = Token(Token.TokenType.Complement, "~")
+    open_parenthesis = Token(Token.TokenType.OpenParenthesis, "(")
+    close_parenthesis = Token(Token.TokenType.CloseParenthesis, ")")
+
+    def test_parse_unary_chain(self):
+        tokens = [self.minus, self.complement, self.constant]
+
+        output = parse_expression(TokenCursor(tokens))
+
+        self.assertIsInstance(output, Unary)
+        self.assertEqual(output.operator, UnaryOperator.Negate)
+        self.assertIsInstance(output.exp, Unary)
+        self.assertEqual(output.exp.operator, UnaryOperator.Complement)
+        self.assertIsInstance(output.exp.exp, Constant)
+
+    def test_parse_binary_left_associative(self):
+        tokens = [self.constant, self.minus, self.constant, self.minus, self.constant]
+
+        output = parse_expression(TokenCursor(tokens))
+
+        self.assertIsInstance(output, Binary)
+        self.assertEqual(output.operator, BinaryOperator.Subtract)
+        self.assertIsInstance(output.left, Binary)
+        self.assertIsInstance(output.right, Constant)
+
+    def test_parse_parenthesized_binary(self):
+        # 1 - (1 - 1)
+        tokens = [
+            self.constant,
+            self.minus,
+            self.open_parenthesis,
+            self.constant,
+            self.minus,
+            self.constant,
+            self.close_parenthesis,
+        ]
+
+        output = parse_expression(TokenCursor(tokens))
+
+        self.assertIsInstance(output, Binary)
+        self.assertIsInstance(output.left, Constant)
+        self.assertIsInstance(output.right, Binary)
+
+    def test_parse_unary_binds_tighter_than_binary(self):
+        # -1 - ~(1)
+        tokens = [
+            self.minus,
+            self.constant,
+            self.minus,
+            self.complement,
+            self.open_parenthesis,
+            self.constant,
+            self.close_parenthesis,
+        ]
+
+        output = parse_expression(TokenCursor(tokens))
+
+        self.assertIsInstance(output, Binary)
+        self.assertIsInstance(output.left, Unary)
+        self.assertIsInstance(output.right, Unary)
+        self.assertIsInstance(output.right.exp, Constant)
+
+    def test_parse_expression_stops_before_unmatched_parenthesis(self):
+        cursor = TokenCursor([self.constant, self.close_parenthesis])
+
+        output = parse_expression(cursor)
+
+        self.assertIsInstance(output, Constant)
+        self.assertEqual(cursor.position, 1)
+
+    def test_parse_expression_unclosed_parenthesis(self):
+        tokens = [self.open_parenthesis, self.constant]
+
+        with self.assertRaises(SyntaxError):
+            parse_expression(TokenCursor(tokens))
+
+    def test_parse_expression_missing_operand(self):
+        with self.assertRaises(SyntaxError):
+            parse_expression(TokenCursor([self.constant, self.minus]))
+        with self.assertRaises(SyntaxError):
+            parse_expression(
+                TokenCursor([self.open_parenthesis, self.close_parenthesis])
+            )
+
+    def test_parse_deeply_nested_unary(self):
+        depth = 100_000
+        tokens = [self.minus, self.complement] * (depth // 2) + [self.constant]
+
+        output = parse_expression(TokenCursor(tokens))
+
+        self.assertEqual(sum(1 for _ in output.iter_path_root()), 1)
+        node = output
+        for _ in range(depth):
+            self.assertIsInstance(node, Unary)
+            node = node.exp
+        self.assertIsInstance(node, Constant)
+
+    def test_parse_deeply_nested_parentheses(self):
+        depth = 100_000
+        tokens = (
+            [self.minus, self.open_parenthesis] * depth
+            + [self.constant]
+            + [self.close_parenthesis] * depth
+        )
+
+        cursor = TokenCursor(tokens)
+        output = parse_expression(cursor)
+
+        self.assertTrue(cursor.at_end())
+        node = output
+        for _ in range(depth):
+            self.assertIsInstance(node, Unary)
+            node = node.exp
+        self.assertIsInstance(node, Constant)
+
+    def test_parse_long_binary_chain(self):
+        length = 100_000
+        tokens = [self.constant] + [self.minus, self.constant] * length
+
+        output = parse_expression(TokenCursor(tokens))
+
+        node = output
+        for _ in range(length):
+            self.assertIsInstance(node, Binary)
+            node = node.left
+        self.assertIsInstance(node, Constant)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,205 @@
+import glob
+import os
+import subprocess
+import tempfile
+import unittest
+
+from loguru import logger
+
+from compiler.compiler_driver import preprocess
+from compiler.preprocessor.preprocessor import HeaderCache, preprocess_file
+from compiler.preprocessor.tokens import split_lines, tokenize_line
+
+logger.remove()
+
+HEADER = """\
+#ifndef DEFS_H
+#define DEFS_H
+#define SQUARE(x) ((x) * (x))
+#define CAT(a, b) a ## b
+#define STR(x) #x
+#define XSTR(x) STR(x)
+#define LOG(fmt, ...) printf(fmt, ## __VA_ARGS__)
+#define VA(...) f(__VA_ARGS__)
+#endif
+"""
+
+SOURCE = """\
+#include "defs.h"
+#include <defs.h>
+#include "once.h"
+#include "once.h"
+/* comment
+   spanning lines */ int x = SQUARE(1 + 2); // comment
+int CAT(foo, bar) = CAT(1, 2);
+const char *s = STR(a "b\\n" 'c');
+const char *t = XSTR(__LINE__);
+#define EMPTY
+#define F(a) [a]
+F(EMPTY) F() CAT(,x) CAT(y,) CAT(,)
+LOG("a"); LOG("a", 1, 2);
+VA() VA(1) VA(1, 2 ,3)
+#if defined(DEFS_H) && !defined UNDEFINED && (1 ? 2 : 1/0) == 2 && -1 < 0u
+int unsigned_comparison;
+#elif 'a' == 97 && 0x10 == 16 && 010 == 8 && (2 || 1/0)
+int constants;
+#else
+int none;
+#endif
+#if 0
+#error not reached
+#endif
+#if defined(__LINE__) && defined __FILE__ && '\\377' < 0 && L'\\377' > 0
+int dynamic_macros_and_signed_char;
+#endif
+#define f(x) x * g
+#define g f
+f(2)(9)
+#define obj (obj + 1)
+obj
+#define h(x) h(x) + 1
+h(h(2))
+#define max(a, b) ((a) > (b) ? (a) : (b))
+max(max(1, 2),
+    3) -x - -y a+++b
+#define neg -
+neg-1 neg neg 1
+int line = __LINE__;
+#line 100
+int line100 = __LINE__;
+#undef SQUARE
+SQUARE(2)
+"""
+
+
+def pp_tokens(code: str) -> list[str]:
+    """Returns the spelling of the preprocessing tokens of a code."""
+    return [
+        token.value
+        for number, line in split_lines(code)
+        for token in tokenize_line(line, number)
+    ]
+
+
+class TestPreprocessor(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.include_dir = self.path("include")
+        os.mkdir(self.include_dir)
+        self.write("include/defs.h", HEADER)
+        self.write("once.h", "#pragma once\nint once;\n")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def write(self, name: str, content: str) -> str:
+        with open(self.path(name), "w") as f:
+            f.write(content)
+        return self.path(name)
+
+    def assert_same_as_gcc(self, path: str, include_dirs: list[str]) -> None:
+        options = [f"-I{directory}" for directory in include_dirs]
+        gcc = subprocess.run(
+            ["gcc", "-E", "-P", *options, path],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        code = preprocess_file(path, include_dirs)
+        self.assertListEqual(pp_tokens(code), pp_tokens(gcc.stdout))
+
+    def test_same_as_gcc(self):
+        path = self.write("prog.c", SOURCE)
+        self.assert_same_as_gcc(path, [self.include_dir])
+
+    def test_samples_same_as_gcc(self):
+        for path in glob.glob("tests/test_samples/**/*.c", recursive=True):
+            with self.subTest(path=path):
+                self.assert_same_as_gcc(path, [])
+
+    def test_not_include_guard(self):
+        # The header has code when its first macro is defined, so it isn't skipped
+        self.write("mode.h", "#ifndef MODE\nint a;\n#else\nint b;\n#endif\n")
+        path = self.write("prog.c", '#define MODE\n#include "mode.h"\n')
+        self.assert_same_as_gcc(path, [])
+        self.assertIsNone(HeaderCache().load(self.path("mode.h")).guard)
+
+    def test_lines(self):
+        path = self.write("prog.c", "int a;\n#define A\n\n/* a\n */ int b;\nA int c;\n")
+        self.assertEqual(preprocess_file(path), "int a;\n\n\nint b;\n\nint c;\n")
+
+    def test_line_markers(self):
+        path = self.write("prog.c", '#include "once.h"\nint main;\n')
+        code = preprocess_file(path, line_markers=True)
+        self.assertEqual(
+            code,
+            f'# 1 "{path}"\n# 1 "{self.path("once.h")}" 1\n\nint once;\n'
+            f'# 2 "{path}" 2\nint main;\n',
+        )
+
+    def test_errors(self):
+        for code in (
+            "#error message\n",
+            "#if 1\n",
+            "#endif\n",
+            "#else\n",
+            "#if 1\n#else\n#else\n#endif\n",
+            "#define F(a) #b\n",
+            "#define F(x) x\nF(1, 2)\n",
+            "#define F(x) x\nF(1\n",
+            "#define CAT(a, b) a ## b\nCAT(+, /)\n",
+            "#if 1 / 0\n#endif\n",
+            "#if 1 +\n#endif\n",
+            "/* unterminated",
+        ):
+            with self.subTest(code=code), self.assertRaises(ValueError):
+                preprocess_file(self.write("prog.c", code))
+
+    def test_unsupported(self):
+        for code in (
+            "#include <stdio.h>\n",
+            '#include "missing.h"\n',
+            "#if __has_include(<stdio.h>)\n#endif\n",
+            '_Pragma("once")\n',
+            "#include_next <defs.h>\n",
+            "#define F(args...) args\n",
+            "#ifdef __GNUC__\n#endif\n",
+            "#if defined(__GNUC__)\n#endif\n",
+            "#if __SIZEOF_INT__ == 4\n#endif\n",
+            "#ifdef _LP64\n#endif\n",
+            "#if linux\n#endif\n",
+            "#ifdef unix\n#endif\n",
+            "#if defined(i386)\n#endif\n",
+        ):
+            with self.subTest(code=code), self.assertRaises(NotImplementedError):
+                preprocess_file(self.write("prog.c", code))
+
+    def test_header_cache(self):
+        cache = HeaderCache()
+        header = self.path("once.h")
+        source = cache.load(header)
+        self.assertIs(cache.load(header), source)
+
+        self.write("once.h", "int changed;\n")
+        os.utime(header, ns=(0, source.mtime + 1))
+        self.assertIsNot(cache.load(header), source)
+        self.assertEqual(
+            cache.load(os.path.join(self.include_dir, "defs.h")).guard, "DEFS_H"
+        )
+
+    def test_gcc_fallback(self):
+        path = self.write("prog.c", "#include <limits.h>\nint x = CHAR_BIT;\n")
+        self.assertEqual(pp_tokens(preprocess(path)), ["int", "x", "=", "8", ";"])
+        for name in ("_LP64", "linux", "unix"):
+            with self.subTest(name=name):
+                path = self.write("prog.c", f"#if {name}\nint x;\n#endif\n")
+                self.assertEqual(pp_tokens(preprocess(path)), ["int", "x", ";"])
+        path = self.write("prog.c", f'#include "{self.path("include/defs.h")}"\n')
+        self.assertEqual(preprocess(path, preprocessor="gcc"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+from loguru import logger
+
+from compiler.lexer.lexer import Token, tokenize_code
+from compiler.parser.token_cursor import TokenCursor
+
+logger.remove()
+
+
+class TestTokenCursor(unittest.TestCase):
+    code = "int main(void) { return 2; }"
+
+    def setUp(self) -> None:
+        self.tokens = tokenize_code(self.code)
+
+    def test_peek_and_advance(self):
+        cursor = TokenCursor(self.tokens)
+        self.assertEqual(cursor.peek(), self.tokens[0])
+        self.assertEqual(cursor.peek(2), self.tokens[2])
+        self.assertEqual(cursor.advance(), self.tokens[0])
+        self.assertEqual(cursor.position, 1)
+        self.assertIsNone(cursor.peek(len(self.tokens)))
+
+    def test_expect(self):
+        cursor = TokenCursor(self.tokens)
+        self.assertEqual(cursor.expect(Token.TokenType.IntKeyword), self.tokens[0])
+        with self.assertRaisesRegex(SyntaxError, "Expected OpenParenthesis but found"):
+            cursor.expect(Token.TokenType.OpenParenthesis)
+        # A failed expectation doesn't consume the token
+        self.assertEqual(cursor.position, 1)
+
+    def test_end_of_tokens(self):
+        cursor = TokenCursor([])
+        self.assertTrue(cursor.at_end())
+        with self.assertRaises(SyntaxError):
+            cursor.advance()
+        with self.assertRaises(SyntaxError):
+            cursor.expect(Token.TokenType.Semicolon)
+
+    def test_tokens_are_not_modified(self):
+        tokens = list(self.tokens)
+        cursor = TokenCursor(tokens)
+        while not cursor.at_end():
+            cursor.advance()
+        self.assertListEqual(tokens, self.tokens)
+
+    def test_mark_and_rewind(self):
+        cursor = TokenCursor(iter(self.tokens))
+        cursor.advance()
+        mark = cursor.mark()
+        cursor.advance()
+        cursor.advance()
+        cursor.rewind(mark)
+        self.assertEqual(cursor.advance(), self.tokens[1])
+        cursor.release(mark)
+        with self.assertRaises(ValueError):
+            cursor.rewind(mark)
+
+    def test_seek(self):
+        cursor = TokenCursor(self.tokens)
+        cursor.seek(3)
+        self.assertEqual(cursor.peek(), self.tokens[3])
+        with self.assertRaises(ValueError):
+            cursor.seek(2)
+        with self.assertRaises(SyntaxError):
+            cursor.seek(len(self.tokens) + 1)
+
+    def test_lazy_stream_is_trimmed(self):
+        count = 10 * TokenCursor._TRIM_THRESHOLD
+        consumed = []
+        stream = (Token(Token.TokenType.Semicolon, str(i)) for i in range(count))
+        cursor = TokenCursor(stream)
+        while not cursor.at_end():
+            consumed.append(cursor.advance().value)
+            self.assertLessEqual(len(cursor._tokens), TokenCursor._TRIM_THRESHOLD + 1)
+        self.assertListEqual(consumed, [str(i) for i in range(count)])
+
+    def test_marks_keep_tokens_of_lazy_stream(self):
+        count = 3 * TokenCursor._TRIM_THRESHOLD
+        stream = (Token(Token.TokenType.Semicolon, str(i)) for i in range(count))
+        cursor = TokenCursor(stream)
+        mark = cursor.mark()
+        for _ in range(count):
+            cursor.advance()
+        cursor.rewind(mark)
+        self.assertEqual(cursor.advance().value, "0")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+from loguru import logger
+
+from compiler.lexer.lexer import Token, tokenize_code
+from compiler.lexer.symbol_table import SymbolTable
+from compiler.lexer.token_stream import TokenStream
+from compiler.parser.parser import generate_parse_tree
+from lib.ast.ast import generate_pretty_ast_repr
+
+logger.remove()
+
+
+class TestTokenStream(unittest.TestCase):
+    code = "int main(void) {\n    return -(~(--x));\n}\n"
+
+    def setUp(self) -> None:
+        self.stream = TokenStream.from_code(self.code)
+        self.tokens = tokenize_code(self.code)
+
+    def test_same_tokens_as_tokenize(self):
+        self.assertEqual(len(self.stream), len(self.tokens))
+        self.assertListEqual(list(self.stream), self.tokens)
+        self.assertListEqual(
+            [self.stream[i] for i in range(-len(self.tokens), 0)], self.tokens
+        )
+
+    def test_same_symbols_as_tokenize(self):
+        code = "int main(void) { return foo - bar - foo; }"
+        symbols = SymbolTable()
+        tokens = tokenize_code(code, symbols)
+        stream = TokenStream.from_code(code)
+        self.assertListEqual(
+            [token.symbol for token in reversed(stream)],
+            [token.symbol for token in reversed(tokens)],
+        )
+        self.assertEqual(stream[1].value, "main")
+        self.assertEqual(stream[1].symbol, symbols.lookup("main"))
+        self.assertIs(stream[2:].symbols, stream.symbols)
+
+    def test_accessors_do_not_need_tokens(self):
+        self.assertEqual(self.stream.kind(1), Token.TokenType.Identifier)
+        self.assertEqual(self.stream.value(1), "main")
+        self.assertEqual(self.stream.span(1), (4, 8))
+        self.assertEqual(self.stream.kind(-1), Token.TokenType.CloseBrace)
+
+    def test_index_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.stream[len(self.tokens)]
+        with self.assertRaises(IndexError):
+            self.stream.value(-len(self.tokens) - 1)
+
+    def test_slices_are_views(self):
+        view = self.stream[6:-2]
+        self.assertListEqual(list(view), self.tokens[6:-2])
+        self.assertListEqual(list(view[1:3]), self.tokens[7:9])
+        self.assertEqual(len(self.stream[5:2]), 0)
+        with self.assertRaises(ValueError):
+            self.stream[::2]
+
+    def test_pop_only_shrinks_the_view(self):
+        view = self.stream[:]
+        self.assertEqual(view.pop(0), self.tokens[0])
+        self.assertEqual(view.pop(), self.tokens[-1])
+        self.assertListEqual(list(view), self.tokens[1:-1])
+        self.assertListEqual(list(self.stream), self.tokens)
+        with self.assertRaises(ValueError):
+            view.pop(1)
+        with self.assertRaises(IndexError):
+            TokenStream.from_code("").pop(0)
+
+    def test_parse_token_stream(self):
+        code = "int main(void) { return 42; }"
+        expected = generate_pretty_ast_repr(generate_parse_tree(tokenize_code(code)))
+        actual = generate_pretty_ast_repr(
+            generate_parse_tree(TokenStream.from_code(code))
+        )
+        self.assertEqual(actual, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+from loguru import logger
+
+from lib.tree.builder import TreeBuilder
+from lib.tree.traversal import (
+    TraversalMode,
+    iter_level_order,
+    iter_postorder,
+    iter_preorder,
+    walk,
+)
+from lib.tree.tree import Tree
+from tests.tree_fixture import DataNode, LeafNode, TreeTestCase
+
+logger.remove()
+
+
+class TestTraversal(TreeTestCase):
+    def test_preorder(self):
+        visited = [(node.data, depth) for node, depth in iter_preorder(self.root)]
+        self.assertListEqual(
+            visited,
+            [("r", 0), ("r-1", 1), ("1-4", 2), ("1-5", 2), ("r-2", 1), ("r-3", 1)]
+            + [("3-6", 2)],
+        )
+
+    def test_postorder(self):
+        visited = [(node.data, depth) for node, depth in iter_postorder(self.root)]
+        self.assertListEqual(
+            visited,
+            [("1-4", 2), ("1-5", 2), ("r-1", 1), ("r-2", 1), ("3-6", 2), ("r-3", 1)]
+            + [("r", 0)],
+        )
+
+    def test_level_order(self):
+        visited = [(node.data, depth) for node, depth in iter_level_order(self.root)]
+        self.assertListEqual(
+            visited,
+            [("r", 0), ("r-1", 1), ("r-2", 1), ("r-3", 1), ("1-4", 2), ("1-5", 2)]
+            + [("3-6", 2)],
+        )
+
+    def test_prune(self):
+        def prune(node, depth):
+            return node.data == "r-1"
+
+        for mode, expected in (
+            (TraversalMode.DEPTH_FIRST, ["r", "r-1", "r-2", "r-3", "3-6"]),
+            (TraversalMode.BREADTH_FIRST, ["r", "r-1", "r-2", "r-3", "3-6"]),
+            (TraversalMode.POST_ORDER, ["r-1", "r-2", "3-6", "r-3", "r"]),
+        ):
+            visited = [node.data for node in walk(self.root, mode, prune)]
+            self.assertListEqual(visited, expected, msg=mode)
+
+    def test_prune_by_depth(self):
+        visited = [
+            node.data for node in walk(self.root, prune=lambda node, depth: depth >= 1)
+        ]
+        self.assertListEqual(visited, ["r", "r-1", "r-2", "r-3"])
+
+    def test_node_type(self):
+        for mode in TraversalMode:
+            visited = [node.data for node in walk(self.root, mode, node_type=LeafNode)]
+            self.assertCountEqual(visited, ["r-2", "1-4", "1-5", "3-6"])
+
+    def test_tree_traverse(self):
+        tree = Tree(self.root)
+        visited = [
+            node.data
+            for node in tree.traverse(TraversalMode.POST_ORDER, node_type=LeafNode)
+        ]
+        self.assertListEqual(visited, ["1-4", "1-5", "r-2", "3-6"])
+        self.assertEqual(len(tree), 7)
+
+    def test_deep_tree(self):
+        depth = 100_000
+        with TreeBuilder():
+            root = node = DataNode(data=0)
+            for i in range(1, depth):
+                node = DataNode(parent=node, data=i)
+
+        for mode in TraversalMode:
+            self.assertEqual(sum(1 for _ in walk(root, mode)), depth, msg=mode)
+        deepest, deepest_depth = next(iter_postorder(root))
+        self.assertIs(deepest, node)
+        self.assertEqual(deepest_depth, depth - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,39 +3,18 @@ import unittest
 from loguru import logger
 
 import lib.tree.tree as tree
+from tests.tree_fixture import DataNode, TreeTestCase
 
 logger.remove()
 
 
-class TestTreeOperations(unittest.TestCase):
-    def setUp(self) -> None:
-        # r
-        # |__ 1
-        # |   |__ 4
-        # |   |__ 5
-        # |__ 2
-        # |__ 3
-        #     |__ 6
-
-        root = tree.TreeNode(data="r")
-        child_r_1 = tree.TreeNode(parent=root, data="r-1")
-        tree.TreeNode(parent=root, data="r-2")
-        child_r_3 = tree.TreeNode(parent=root, data="r-3")
-        child_1_4 = tree.TreeNode(parent=child_r_1, data="1-4")
-        tree.TreeNode(parent=child_r_1, data="1-5")
-        tree.TreeNode(parent=child_r_3, data="3-6")
-        self.t = tree.Tree(root=root)
-        self.child_r_3 = child_r_3
-        self.child_r_1 = child_r_1
-        self.child_1_4 = child_1_4
-        self.root = root
-
+class TestTreeOperations(TreeTestCase):
     def test_tree_length(self):
-        self.assertEqual(len(self.t), 7)
+        self.assertEqual(len(self.tree), 7)
 
     def test_traverse_tree_depth_first(self):
         # Collect from 1
-        collected_root = [v.data for v in self.t.traverse()]
+        collected_root = [v.data for v in self.tree.traverse()]
         self.assertListEqual(
             collected_root, ["r", "r-1", "1-4", "1-5", "r-2", "r-3", "3-6"]
         )
@@ -47,7 +26,7 @@ class TestTreeOperations(unittest.TestCase):
     def test_traverse_tree_breadth_first(self):
         # Collect from 1
         collected_root = [
-            v.data for v in self.t.traverse(mode=tree.TraversalMode.BREADTH_FIRST)
+            v.data for v in self.tree.traverse(mode=tree.TraversalMode.BREADTH_FIRST)
         ]
         self.assertListEqual(
             collected_root, ["r", "r-1", "r-2", "r-3", "1-4", "1-5", "3-6"]
@@ -58,11 +37,11 @@ class TestTreeOperations(unittest.TestCase):
         self.assertListEqual(collected_r_3, ["r-3", "3-6"])
 
     def test_insert_remove_node(self):
-        current_size = len(self.t)
-        added = tree.TreeNode(data="added", parent=self.root)
-        self.assertEqual(current_size + 1, len(self.t))
+        current_size = len(self.tree)
+        added = DataNode(data="added", parent=self.root)
+        self.assertEqual(current_size + 1, len(self.tree))
         added.parent = None
-        self.assertEqual(current_size, len(self.t))
+        self.assertEqual(current_size, len(self.tree))
 
     def test_get_children(self):
         children_r_1 = [v.data for v in self.child_r_1.children]
@@ -76,6 +55,70 @@ class TestTreeOperations(unittest.TestCase):
     def test_is_leaf(self):
         self.assertTrue(self.child_1_4.is_leaf())
 
+    def test_children_view(self):
+        children = self.root.children
+        self.assertEqual(len(children), 3)
+        self.assertEqual(children[0].data, "r-1")
+        self.assertEqual(children[-1].data, "r-3")
+        self.assertEqual(children[1].data, "r-2")
+        self.assertListEqual([v.data for v in children[1:]], ["r-2", "r-3"])
+        self.assertListEqual(
+            [v.data for v in reversed(children)], ["r-3", "r-2", "r-1"]
+        )
+        self.assertIn(self.child_r_3, children)
+        self.assertNotIn(self.child_1_4, children)
+        with self.assertRaises(IndexError):
+            children[3]
+
+    def test_sibling_navigation(self):
+        self.assertIsNone(self.child_r_1.previous_sibling)
+        self.assertEqual(self.child_r_1.next_sibling.data, "r-2")
+        self.assertEqual(self.child_r_3.previous_sibling.data, "r-2")
+        self.assertIsNone(self.child_r_3.next_sibling)
+
+    def test_detach_middle_child(self):
+        child_r_2 = self.child_r_1.next_sibling
+        child_r_2.parent = None
+
+        self.assertListEqual([v.data for v in self.root.children], ["r-1", "r-3"])
+        self.assertIs(self.child_r_1.next_sibling, self.child_r_3)
+        self.assertIs(self.child_r_3.previous_sibling, self.child_r_1)
+        self.assertIsNone(child_r_2.next_sibling)
+        self.assertIsNone(child_r_2.previous_sibling)
+
+    def test_insert_before_after(self):
+        added = DataNode(data="added")
+        self.child_r_3.insert_before(added)
+        self.assertListEqual(
+            [v.data for v in self.root.children], ["r-1", "r-2", "added", "r-3"]
+        )
+        self.assertIs(added.parent, self.root)
+
+        # Move a node of another parent after the last child
+        self.child_r_3.insert_after(self.child_1_4)
+        self.assertListEqual(
+            [v.data for v in self.root.children], ["r-1", "r-2", "added", "r-3", "1-4"]
+        )
+        self.assertListEqual([v.data for v in self.child_r_1.children], ["1-5"])
+
+        # Move a child before its previous sibling
+        added.insert_before(self.child_r_3)
+        self.assertListEqual(
+            [v.data for v in self.root.children], ["r-1", "r-2", "r-3", "added", "1-4"]
+        )
+        self.assertEqual(len(self.tree), 8)
+
+    def test_insert_sibling_loop(self):
+        with self.assertRaises(RuntimeError):
+            self.child_1_4.insert_after(self.child_r_1)
+        with self.assertRaises(ValueError):
+            self.root.insert_before(DataNode(data="added"))
+
+    def test_undeclared_attribute(self):
+        self.assertFalse(hasattr(self.root, "__dict__"))
+        with self.assertRaises(AttributeError):
+            DataNode(parent=self.root, undeclared="value")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,117 @@
+import io
+import unittest
+
+from loguru import logger
+
+from compiler.assembly_generation import assembly_ast
+from compiler.assembly_generation.assembly_generation import AssemblyGenerator
+from compiler.code_emission.code_emission import AssemblyEmitter
+from compiler.lexer.lexer import tokenize_code
+from compiler.parser.parser import generate_parse_tree
+from compiler.parser.parser_ast import Constant, Unary, UnaryOperator
+from lib.ast.visitor import NodeTransformer, NodeVisitor
+from lib.tree.node import TreeNode
+from lib.tree.tree import Tree
+from tests.tree_fixture import DataNode, LeafNode, TreeTestCase
+
+logger.remove()
+
+
+class DataCollector(NodeVisitor):
+    def __init__(self) -> None:
+        self.visited: list[str] = []
+
+    def visit_DataNode(self, node: DataNode) -> None:
+        self.visited.append(node.data)
+        self.generic_visit(node)
+
+    def visit_LeafNode(self, node: LeafNode) -> None:
+        self.visited.append(node.data.upper())
+
+
+class TestNodeVisitor(TreeTestCase):
+    def test_dispatch(self):
+        collector = DataCollector()
+        collector.visit(self.root)
+        self.assertListEqual(
+            collector.visited, ["r", "r-1", "1-4", "1-5", "R-2", "r-3", "3-6"]
+        )
+
+    def test_handlers_are_cached_per_class(self):
+        class LeafCollector(DataCollector):
+            def visit_LeafNode(self, node: LeafNode) -> None:
+                self.visited.append("leaf")
+
+        DataCollector().visit(self.root)
+        collector = LeafCollector()
+        collector.visit(self.root)
+        self.assertListEqual(
+            collector.visited, ["r", "r-1", "leaf", "leaf", "leaf", "r-3", "leaf"]
+        )
+        self.assertIs(DataCollector._handlers[LeafNode], DataCollector.visit_LeafNode)
+        self.assertIs(LeafCollector._handlers[DataNode], DataCollector.visit_DataNode)
+        self.assertNotIn(DataNode, NodeVisitor._handlers)
+
+    def test_generic_visit(self):
+        class LeafCounter(NodeVisitor):
+            count = 0
+
+            def visit_LeafNode(self, node: LeafNode) -> None:
+                self.count += 1
+
+        counter = LeafCounter()
+        counter.visit(self.root)
+        self.assertEqual(counter.count, 4)
+
+    def test_transformer(self):
+        class Copier(NodeTransformer):
+            def visit_DataNode(self, node: DataNode) -> DataNode:
+                copy = type(node)(data=node.data)
+                for child in node.children:
+                    self.visit(child).parent = copy
+                return copy
+
+        copy = Copier().transform(self.tree)
+        self.assertIsNot(copy.root, self.root)
+        self.assertListEqual(
+            [node.data for node in copy.traverse()],
+            [node.data for node in self.tree.traverse()],
+        )
+
+        with self.assertRaisesRegex(RuntimeError, "cannot be transformed by Copier"):
+            Copier().transform(Tree(TreeNode()))
+
+
+class TestCodeGenerationVisitors(unittest.TestCase):
+    def test_abstract_class_handlers(self):
+        constant = Constant(None, "2")
+        unary = Unary(None, UnaryOperator.Negate, Constant(None, "1"))
+        generator = AssemblyGenerator()
+        self.assertIsInstance(generator.visit(constant), assembly_ast.Immediate)
+        with self.assertRaisesRegex(RuntimeError, "Assembly Operand"):
+            generator.visit(unary)
+        self.assertIs(generator._handlers[Unary], AssemblyGenerator.visit_Exp)
+        self.assertIs(generator._handlers[Constant], AssemblyGenerator.visit_Constant)
+
+    def test_emitter(self):
+        tree = generate_parse_tree(tokenize_code("int main(void) { return 2; }"))
+        assembly_tree = AssemblyGenerator().transform(tree)
+        stream = io.StringIO()
+        emitter = AssemblyEmitter(stream)
+        emitter.visit(assembly_tree.root)
+        emitter.flush()
+        self.assertIn("\tmov\teax, 2\n\tret\n", stream.getvalue())
+
+        mov = assembly_ast.Mov(
+            None,
+            source=assembly_ast.Register(None, name="eax"),
+            destination=assembly_ast.Immediate(None, value="1"),
+        )
+        with self.assertRaises(SyntaxError):
+            AssemblyEmitter(stream).visit(mov)
+        with self.assertRaisesRegex(RuntimeError, "Failed to translate node"):
+            AssemblyEmitter(stream).visit(Constant(None, "1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
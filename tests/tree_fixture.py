@@ -0,0 +1,33 @@
+import unittest
+
+from lib.tree.node import TreeNode
+from lib.tree.tree import Tree
+
+
+class DataNode(TreeNode):
+    __slots__ = ("data",)
+    data: str
+
+
+class LeafNode(DataNode):
+    __slots__ = ()
+
+
+class TreeTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        # r
+        # |__ 1
+        # |   |__ 4
+        # |   |__ 5
+        # |__ 2
+        # |__ 3
+        #     |__ 6
+
+        self.root = DataNode(data="r")
+        self.child_r_1 = DataNode(parent=self.root, data="r-1")
+        LeafNode(parent=self.root, data="r-2")
+        self.child_r_3 = DataNode(parent=self.root, data="r-3")
+        self.child_1_4 = LeafNode(parent=self.child_r_1, data="1-4")
+        LeafNode(parent=self.child_r_1, data="1-5")
+        LeafNode(parent=self.child_r_3, data="3-6")
+        self.tree = Tree(self.root)